@@ -29,9 +29,13 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
+def get_url() -> str:
+    """DATABASE_URL from the environment wins over alembic.ini, so migrations target the app's database."""
+    return os.getenv("DATABASE_URL") or config.get_main_option("sqlalchemy.url")
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
-    url = config.get_main_option("sqlalchemy.url")
+    url = get_url()
     context.configure(
         url=url,
         target_metadata=target_metadata,
@@ -45,18 +49,19 @@ def run_migrations_offline() -> None:
 
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode."""
-    # Create SQLite engine (use regular engine for migrations)
+    # Use a regular (sync) engine for migrations, SQLite or PostgreSQL
+    url = get_url()
     engine = create_engine(
-        config.get_main_option("sqlalchemy.url"),
+        url,
         echo=True,
-        connect_args={"check_same_thread": False} if "sqlite" in config.get_main_option("sqlalchemy.url") else {}
+        connect_args={"check_same_thread": False} if url.startswith("sqlite") else {}
     )
 
     with engine.connect() as connection:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
-            render_as_batch=True  # Enable batch mode for SQLite
+            render_as_batch=connection.dialect.name == "sqlite"  # Batch mode is only needed for SQLite
         )
 
         with context.begin_transaction():
@@ -0,0 +1,48 @@
+"""Overhaul annotation and message indexes for the hot access paths
+
+Adds (project_id, annotator_id, created_at) on annotations and
+(chat_room_id, created_at, id) on chat_messages. Drops indexes that duplicate
+a unique constraint (ix_annotations_message_annotator, ix_chat_messages_chatroom_turn)
+or that no query uses on its own (ix_annotations_thread, superseded by
+ix_annotations_annotator_thread).
+
+Revision ID: 0b9e5d7c3a21
+Revises: f7c3d9a2b618
+Create Date: 2026-10-18 21:12:37.904415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b9e5d7c3a21'
+down_revision: Union[str, None] = 'f7c3d9a2b618'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('annotations', schema=None) as batch_op:
+        batch_op.create_index('ix_annotations_project_annotator', ['project_id', 'annotator_id', 'created_at'], unique=False)
+        batch_op.drop_index('ix_annotations_message_annotator')
+        batch_op.drop_index('ix_annotations_thread')
+
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.create_index('ix_chat_messages_chatroom_created', ['chat_room_id', 'created_at', 'id'], unique=False)
+        batch_op.drop_index('ix_chat_messages_chatroom_turn')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.create_index('ix_chat_messages_chatroom_turn', ['chat_room_id', 'turn_id'], unique=False)
+        batch_op.drop_index('ix_chat_messages_chatroom_created')
+
+    with op.batch_alter_table('annotations', schema=None) as batch_op:
+        batch_op.create_index('ix_annotations_thread', ['thread_id'], unique=False)
+        batch_op.create_index('ix_annotations_message_annotator', ['message_id', 'annotator_id'], unique=False)
+        batch_op.drop_index('ix_annotations_project_annotator')
@@ -0,0 +1,41 @@
+"""Add IAA result cache
+
+Revision ID: 3f1a9c2d7b45
+Revises: 8cb8f2292bfe
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a9c2d7b45'
+down_revision: Union[str, None] = '8cb8f2292bfe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('chat_rooms', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('annotation_version', sa.Integer(), server_default='0', nullable=False))
+
+    op.create_table('chat_room_iaa_cache',
+    sa.Column('chat_room_id', sa.Integer(), nullable=False),
+    sa.Column('annotation_version', sa.Integer(), nullable=False),
+    sa.Column('result_json', sa.Text(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['chat_room_id'], ['chat_rooms.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('chat_room_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('chat_room_iaa_cache')
+
+    with op.batch_alter_table('chat_rooms', schema=None) as batch_op:
+        batch_op.drop_column('annotation_version')
@@ -0,0 +1,83 @@
+"""Add a denormalized chat_room_id to annotations
+
+Room-scoped annotation reads and thread operations filter on the annotation's
+own chat_room_id instead of joining chat_messages. The column is backfilled from
+the annotated message and indexed as (chat_room_id, annotator_id, thread_id, message_id).
+Annotations whose message no longer exists cannot be backfilled and are not
+visible in any room. If there are any, the upgrade stops before changing anything
+and reports how many, so the operator can copy them out and delete them first.
+Setting DELETE_ORPHAN_ANNOTATIONS=1 lets the migration delete them instead,
+logging the count as a warning.
+
+Revision ID: 5d2e8f4a1c69
+Revises: 0b9e5d7c3a21
+Create Date: 2026-10-18 22:03:51.217406
+
+"""
+import logging
+import os
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2e8f4a1c69'
+down_revision: Union[str, None] = '0b9e5d7c3a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+ORPHAN_ANNOTATIONS = (
+    "FROM annotations WHERE NOT EXISTS (SELECT 1 FROM chat_messages m WHERE m.id = annotations.message_id)"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Orphaned annotations have no room to take. They are only deleted on request, and
+    # checked before any schema change so an aborted upgrade leaves the database as it was.
+    delete_orphans = os.environ.get("DELETE_ORPHAN_ANNOTATIONS", "").lower() in ("1", "true", "yes")
+    if not context.is_offline_mode():
+        orphans = op.get_bind().scalar(sa.text(f"SELECT COUNT(*) {ORPHAN_ANNOTATIONS}"))
+        if orphans and not delete_orphans:
+            raise RuntimeError(
+                f"{orphans} annotation(s) belong to a chat message that no longer exists and cannot be "
+                "assigned a chat room. Copy them out and delete them before upgrading (see "
+                "docs/query_plans.md), or set DELETE_ORPHAN_ANNOTATIONS=1 to have this migration delete them."
+            )
+        if orphans:
+            logger.warning(
+                f"Deleting {orphans} annotation(s) whose message no longer exists: "
+                "they cannot be assigned a chat room"
+            )
+
+    with op.batch_alter_table('annotations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('chat_room_id', sa.Integer(), nullable=True))
+
+    # Backfill from the annotated messages
+    if delete_orphans:
+        op.execute(f"DELETE {ORPHAN_ANNOTATIONS}")
+    op.execute("""
+        UPDATE annotations
+        SET chat_room_id = (SELECT m.chat_room_id FROM chat_messages m WHERE m.id = annotations.message_id)
+    """)
+
+    with op.batch_alter_table('annotations', schema=None) as batch_op:
+        batch_op.alter_column('chat_room_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key(
+            'fk_annotations_chat_room_id_chat_rooms', 'chat_rooms', ['chat_room_id'], ['id'], ondelete='CASCADE'
+        )
+        batch_op.create_index(
+            'ix_annotations_chatroom_annotator', ['chat_room_id', 'annotator_id', 'thread_id', 'message_id'], unique=False
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('annotations', schema=None) as batch_op:
+        batch_op.drop_index('ix_annotations_chatroom_annotator')
+        batch_op.drop_constraint('fk_annotations_chat_room_id_chat_rooms', type_='foreignkey')
+        batch_op.drop_column('chat_room_id')
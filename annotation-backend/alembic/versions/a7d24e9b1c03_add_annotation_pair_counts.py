@@ -0,0 +1,51 @@
+"""Add annotation pair counts
+
+Revision ID: a7d24e9b1c03
+Revises: 3f1a9c2d7b45
+Create Date: 2026-10-18 11:40:05.532871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d24e9b1c03'
+down_revision: Union[str, None] = '3f1a9c2d7b45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('annotation_pair_counts',
+    sa.Column('chat_room_id', sa.Integer(), nullable=False),
+    sa.Column('annotator_1_id', sa.Integer(), nullable=False),
+    sa.Column('annotator_2_id', sa.Integer(), nullable=False),
+    sa.Column('thread_1', sa.String(), nullable=False),
+    sa.Column('thread_2', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['annotator_1_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['annotator_2_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['chat_room_id'], ['chat_rooms.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('chat_room_id', 'annotator_1_id', 'annotator_2_id', 'thread_1', 'thread_2')
+    )
+
+    # Backfill from existing annotations
+    op.execute("""
+        INSERT INTO annotation_pair_counts
+            (chat_room_id, annotator_1_id, annotator_2_id, thread_1, thread_2, count)
+        SELECT m.chat_room_id, a1.annotator_id, a2.annotator_id, a1.thread_id, a2.thread_id, COUNT(*)
+        FROM annotations a1
+        JOIN annotations a2
+            ON a2.message_id = a1.message_id AND a2.annotator_id >= a1.annotator_id
+        JOIN chat_messages m ON m.id = a1.message_id
+        GROUP BY m.chat_room_id, a1.annotator_id, a2.annotator_id, a1.thread_id, a2.thread_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('annotation_pair_counts')
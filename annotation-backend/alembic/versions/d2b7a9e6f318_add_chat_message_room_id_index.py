@@ -0,0 +1,30 @@
+"""Add (chat_room_id, id) index on chat_messages
+
+Revision ID: d2b7a9e6f318
+Revises: c5e8f1a40d92
+Create Date: 2026-10-18 15:21:48.102934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b7a9e6f318'
+down_revision: Union[str, None] = 'c5e8f1a40d92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.create_index('ix_chat_messages_chatroom_id', ['chat_room_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_chat_messages_chatroom_id')
@@ -0,0 +1,30 @@
+"""Add result column to jobs
+
+Revision ID: e4b6c81d2f57
+Revises: d2b7a9e6f318
+Create Date: 2026-10-18 17:02:11.538204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b6c81d2f57'
+down_revision: Union[str, None] = 'd2b7a9e6f318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('result', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_column('result')
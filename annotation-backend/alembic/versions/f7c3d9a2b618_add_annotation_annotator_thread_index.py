@@ -0,0 +1,30 @@
+"""Add (annotator_id, thread_id, message_id) index on annotations
+
+Revision ID: f7c3d9a2b618
+Revises: e4b6c81d2f57
+Create Date: 2026-10-18 19:44:03.271590
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c3d9a2b618'
+down_revision: Union[str, None] = 'e4b6c81d2f57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('annotations', schema=None) as batch_op:
+        batch_op.create_index('ix_annotations_annotator_thread', ['annotator_id', 'thread_id', 'message_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('annotations', schema=None) as batch_op:
+        batch_op.drop_index('ix_annotations_annotator_thread')
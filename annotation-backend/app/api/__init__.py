@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 from . import auth, admin, projects
-from .annotations import message_annotation_router, project_annotation_router
+from .annotations import message_annotation_router, project_annotation_router, chat_room_annotation_router
 
 api_router = APIRouter()
 
@@ -9,6 +9,7 @@ api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
 api_router.include_router(projects.router, prefix="/projects", tags=["projects", "chat rooms"])
 api_router.include_router(message_annotation_router, tags=["annotations"])
 api_router.include_router(project_annotation_router, tags=["annotations"])
+api_router.include_router(chat_room_annotation_router, tags=["annotations"])
 
 __all__ = [
     "auth", 
@@ -16,4 +17,5 @@ __all__ = [
     "projects", 
     "message_annotation_router",
     "project_annotation_router",
+    "chat_room_annotation_router",
 ] 
\ No newline at end of file
@@ -1,36 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks
+from fastapi.responses import Response, StreamingResponse, FileResponse
 from sqlalchemy.orm import Session
-from typing import List
-import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import BinaryIO, Callable, Iterator, List, Optional
 import io
 import os
 import json
+import shutil
+import uuid
+import zlib
 from datetime import datetime
 
-from .. import crud, models, schemas
+from .. import crud, async_crud, models, schemas
 from ..dependencies import get_db
-from ..auth import get_current_admin_user, get_password_hash
-from ..utils.csv_utils import import_chat_messages, validate_csv_format, import_annotations_from_csv, validate_annotations_csv_format
+from ..database import SessionLocal, get_async_db
+from ..jobs import (
+    run_project_export_job,
+    run_chat_room_csv_import_job,
+    run_annotation_csv_import_job,
+    run_batch_annotation_import_job,
+    render_chat_room_export
+)
+from ..config import get_settings
+from ..compute_pool import compute_pool
+from ..auth import get_current_admin_user, get_current_admin_user_async, get_password_hash
+from ..utils.csv_utils import iter_chat_message_batches, iter_annotation_batches
 
 router = APIRouter()
 
 @router.get("/users", response_model=List[schemas.User])
 async def list_users(
-    db: Session = Depends(get_db),
-    _: models.User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_async_db),
+    _: models.User = Depends(get_current_admin_user_async)
 ):
     """List all users (admin only)"""
-    return crud.get_users(db)
+    return await async_crud.get_users(db)
 
 @router.post("/users", response_model=schemas.User)
 async def create_user(
     user_data: schemas.UserCreate,
-    db: Session = Depends(get_db),
-    _: models.User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_async_db),
+    _: models.User = Depends(get_current_admin_user_async)
 ):
     """Create a new user (admin only)"""
     # Check if user exists
-    existing_user = crud.get_user_by_email(db, user_data.email)
+    existing_user = await async_crud.get_user_by_email(db, user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -39,34 +53,34 @@ async def create_user(
     
     # Create user with hashed password
     hashed_password = get_password_hash(user_data.password)
-    new_user = crud.create_user(db, user_data, hashed_password)
+    new_user = await async_crud.create_user(db, user_data, hashed_password)
     return new_user
 
 @router.get("/projects", response_model=List[schemas.Project])
 async def list_all_projects(
-    db: Session = Depends(get_db),
-    _: models.User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_async_db),
+    _: models.User = Depends(get_current_admin_user_async)
 ):
     """List all projects (admin only)"""
-    return crud.get_projects(db)
+    return await async_crud.get_projects(db)
 
 @router.post("/projects", response_model=schemas.Project)
 async def create_project(
     project_data: schemas.ProjectCreate,
-    db: Session = Depends(get_db),
-    _: models.User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_async_db),
+    _: models.User = Depends(get_current_admin_user_async)
 ):
     """Create a new project (admin only)"""
-    return crud.create_project(db, project_data)
+    return await async_crud.create_project(db, project_data)
 
 @router.get("/projects/{project_id}", response_model=schemas.Project)
 async def get_project(
     project_id: int,
-    db: Session = Depends(get_db),
-    _: models.User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_async_db),
+    _: models.User = Depends(get_current_admin_user_async)
 ):
     """Get a specific project (admin only)"""
-    project = crud.get_project(db, project_id)
+    project = await async_crud.get_project(db, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -77,8 +91,8 @@ async def get_project(
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_admin_user_async)
 ):
     """Delete a user (admin only)"""
     if user_id == current_user.id:
@@ -87,33 +101,36 @@ async def delete_user(
             detail="Cannot delete your own account"
         )
     
-    user = crud.get_user(db, user_id)
+    user = await async_crud.get_user(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    crud.delete_user(db, user)
+    await async_crud.delete_user(db, user)
 
 @router.delete("/projects/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_project(
     project_id: int,
-    db: Session = Depends(get_db),
-    _: models.User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_async_db),
+    _: models.User = Depends(get_current_admin_user_async)
 ):
     """Delete a project (admin only)"""
-    project = crud.get_project(db, project_id)
+    project = await async_crud.get_project(db, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
     
-    crud.delete_project(db, project)
+    await async_crud.delete_project(db, project)
+
+# Import endpoints are plain (sync) handlers: they stream the upload through the
+# sync Session, so FastAPI runs them in its threadpool instead of on the event loop.
 
 @router.post("/projects/{project_id}/import-chat-room-csv", response_model=schemas.ChatRoomImportResponse)
-async def create_chat_room_and_import_csv(
+def create_chat_room_and_import_csv(
     project_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
@@ -148,63 +165,18 @@ async def create_chat_room_and_import_csv(
             detail=f"Error creating chat room '{chat_room_name}': {str(e)}"
         )
     
-    # Save uploaded file temporarily
-    temp_file_path = f"uploads/{file.filename}"
+    # Stream the upload straight into the database in bounded batches
     try:
-        contents = await file.read()
-        os.makedirs("uploads", exist_ok=True)
-        with open(temp_file_path, "wb") as f:
-            f.write(contents)
-        
-        # Validate CSV format first
-        validate_csv_format(temp_file_path)
-        
-        # Import messages using our simple utility
-        messages = import_chat_messages(temp_file_path)
+        # Header is validated before any row is read
+        message_batches = iter_chat_message_batches(file.file)
         
-        # Import messages to database
-        imported_count = 0
-        skipped_count = 0
-        errors = []
-        warnings = []
-        
-        for message in messages:
-            try:
-                # Create message schema
-                message_schema = schemas.ChatMessageCreate(
-                    turn_id=message['turn_id'],
-                    user_id=message['user_id'],
-                    turn_text=message['turn_text'],
-                    reply_to_turn=message.get('reply_to_turn')
-                )
-                
-                # Check for existing message
-                existing = crud.get_chat_message_by_turn_id(db, new_chat_room.id, message['turn_id'])
-                if existing:
-                    skipped_count += 1
-                    warnings.append(f"Message with turn_id {message['turn_id']} already exists")
-                    continue
-                
-                # Create message
-                crud.create_chat_message(db, message=message_schema, chat_room_id=new_chat_room.id)
-                imported_count += 1
-                
-            except Exception as e:
-                errors.append(f"Error importing message {message.get('turn_id', 'unknown')}: {str(e)}")
-                skipped_count += 1
-        
-        # Commit all changes
-        db.commit()
+        import_details = crud.import_chat_message_batches(
+            db, chat_room_id=new_chat_room.id, batches=message_batches
+        )
         
         return schemas.ChatRoomImportResponse(
             chat_room=new_chat_room,
-            import_details=schemas.CSVImportResponse(
-                total_messages=len(messages),
-                imported_count=imported_count,
-                skipped_count=skipped_count,
-                errors=errors,
-                warnings=warnings
-            )
+            import_details=import_details
         )
         
     except Exception as e:
@@ -213,10 +185,6 @@ async def create_chat_room_and_import_csv(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error processing CSV file: {str(e)}"
         )
-    finally:
-        # Clean up temporary file
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
 
 # --- Remove or comment out old endpoints --- 
 
@@ -231,7 +199,7 @@ async def create_chat_room_and_import_csv(
 # PHASE 2: ANNOTATION IMPORT ENDPOINT
 
 @router.post("/chat-rooms/{chat_room_id}/import-annotations", response_model=schemas.AnnotationImportResponse)
-async def import_annotations_for_chat_room(
+def import_annotations_for_chat_room(
     chat_room_id: int,
     user_id: int = Form(...),
     file: UploadFile = File(...),
@@ -246,6 +214,11 @@ async def import_annotations_for_chat_room(
         chat_room_id: ID of the chat room to import annotations for
         user_id: ID of the user to whom these annotations belong
         file: CSV file containing turn_id and thread_id columns
+    
+    The file is read and written in batches (see iter_annotation_batches), and each
+    batch is committed on its own. If the file turns out to be malformed part-way,
+    the batches before the error stay imported. Re-importing the corrected file
+    upserts them again.
     """
     # Validate chat room exists
     chat_room = crud.get_chat_room(db, chat_room_id)
@@ -270,37 +243,13 @@ async def import_annotations_for_chat_room(
             detail="File must be a CSV"
         )
     
-    # Save uploaded file temporarily
-    temp_file_path = f"uploads/annotations_{file.filename}"
+    # Stream the upload straight into the database in bounded batches
     try:
-        contents = await file.read()
-        os.makedirs("uploads", exist_ok=True)
-        with open(temp_file_path, "wb") as f:
-            f.write(contents)
-        
-        # Validate CSV format for annotations
-        validate_annotations_csv_format(temp_file_path)
+        # Header is validated before any row is read
+        annotation_batches = iter_annotation_batches(file.file)
         
-        # Import annotations from CSV
-        annotations_data = import_annotations_from_csv(temp_file_path)
-        
-        # Import annotations to database with attribution
-        imported_count, skipped_count, errors = crud.import_annotations_for_chat_room(
-            db=db,
-            chat_room_id=chat_room_id,
-            annotator_id=user_id,
-            project_id=chat_room.project_id,
-            annotations_data=annotations_data
-        )
-        
-        return schemas.AnnotationImportResponse(
-            chat_room_id=chat_room_id,
-            annotator_id=user_id,
-            annotator_email=user.email,
-            total_annotations=len(annotations_data),
-            imported_count=imported_count,
-            skipped_count=skipped_count,
-            errors=errors
+        return crud.import_annotation_batches(
+            db, chat_room=chat_room, annotator=user, batches=annotation_batches
         )
         
     except Exception as e:
@@ -309,18 +258,14 @@ async def import_annotations_for_chat_room(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error processing annotation CSV file: {str(e)}"
         )
-    finally:
-        # Clean up temporary file
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
 
 # PHASE 3: AGGREGATED ANNOTATIONS FOR ANALYSIS
 
 @router.get("/chat-rooms/{chat_room_id}/aggregated-annotations", response_model=schemas.AggregatedAnnotationsResponse)
 async def get_aggregated_annotations(
     chat_room_id: int,
-    db: Session = Depends(get_db),
-    _: models.User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_async_db),
+    _: models.User = Depends(get_current_admin_user_async)
 ):
     """
     Get aggregated annotations for a chat room (admin only).
@@ -328,7 +273,7 @@ async def get_aggregated_annotations(
     organized by message, making concordance and discordance immediately visible.
     """
     # Validate chat room exists
-    chat_room = crud.get_chat_room(db, chat_room_id)
+    chat_room = await async_crud.get_chat_room(db, chat_room_id)
     if not chat_room:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -336,7 +281,7 @@ async def get_aggregated_annotations(
         )
     
     # Get aggregated data
-    aggregated_data = crud.get_aggregated_annotations_for_chat_room(db, chat_room_id)
+    aggregated_data = await async_crud.get_aggregated_annotations_for_chat_room(db, chat_room_id)
     
     # Calculate statistics
     total_messages = len(aggregated_data)
@@ -362,7 +307,7 @@ async def get_aggregated_annotations(
 # PHASE 4: BATCH ANNOTATION IMPORT ENDPOINT
 
 @router.post("/chat-rooms/{chat_room_id}/import-batch-annotations", response_model=schemas.BatchAnnotationImportResponse)
-async def import_batch_annotations(
+def import_batch_annotations(
     chat_room_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
@@ -401,19 +346,11 @@ async def import_batch_annotations(
             detail="Chat room not found"
         )
     
-    # Save uploaded file temporarily
-    temp_file_path = f"uploads/batch_annotations_{file.filename}"
     try:
-        contents = await file.read()
-        os.makedirs("uploads", exist_ok=True)
-        with open(temp_file_path, "wb") as f:
-            f.write(contents)
-        
-        # Parse and validate JSON
+        # Parse and validate JSON directly from the upload
         try:
-            with open(temp_file_path, 'r', encoding='utf-8') as f:
-                json_data = json.load(f)
-        except json.JSONDecodeError as e:
+            json_data = json.load(file.file)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid JSON format: {str(e)}"
@@ -461,10 +398,37 @@ async def import_batch_annotations(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing batch annotation file: {str(e)}"
         )
-    finally:
-        # Clean up temporary file
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+
+# WORKBOOK IMPORT ENDPOINT (EXCEL IMPORT TOOL)
+
+@router.post("/projects/{project_id}/import-workbook", response_model=schemas.WorkbookImportResponse)
+def import_chat_room_workbook(
+    project_id: int,
+    workbook: schemas.WorkbookImport,
+    db: Session = Depends(get_db),
+    _: models.User = Depends(get_current_admin_user)
+):
+    """
+    Import a whole annotated workbook in one request and one transaction (admin only).
+    
+    Creates the chat room and its messages, creates missing annotator accounts,
+    assigns them to the project and imports every annotator's thread column.
+    Either everything is stored or, on error, nothing is.
+    """
+    project = crud.get_project(db, project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    try:
+        return crud.import_chat_room_workbook(db, project_id=project_id, workbook=workbook)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error importing workbook '{workbook.chat_room.name}': {str(e)}"
+        )
 
 # PHASE 5: INTER-ANNOTATOR AGREEMENT (IAA) ENDPOINT
 
@@ -475,8 +439,8 @@ async def import_batch_annotations(
 )
 async def get_iaa_for_chat_room(
     chat_room_id: int,
-    db: Session = Depends(get_db),
-    _: models.User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_async_db),
+    _: models.User = Depends(get_current_admin_user_async)
 ):
     """
     Calculates and returns the one-to-one agreement analysis for a specific chat room.
@@ -500,17 +464,53 @@ async def get_iaa_for_chat_room(
             - 404 if chat room not found
             - 400 if chat room is not fully annotated or has insufficient data
     """
-    analysis = crud.get_chat_room_iaa_analysis(db=db, chat_room_id=chat_room_id)
+    analysis = await async_crud.get_chat_room_iaa_analysis(db=db, chat_room_id=chat_room_id)
     return analysis
 
 
 # EXPORT FUNCTIONALITY
 
+def _export_filename(chat_room_id: int, metadata: dict) -> str:
+    """Build the download filename from the export metadata (completion status and timestamp)."""
+    chat_room_name = metadata["chat_room_name"].replace(" ", "_").replace("-", "_")
+    completion_status = metadata["completion_status"]
+    completion_percentage = metadata["completion_percentage"]
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    # Create filename based on completion status
+    if completion_status == "COMPLETE":
+        return f"chatroom_{chat_room_id}_{chat_room_name}_COMPLETE_{timestamp}.json"
+    elif completion_status == "PARTIAL":
+        return f"chatroom_{chat_room_id}_{chat_room_name}_PARTIAL_{completion_percentage}pct_{timestamp}.json"
+    else:
+        return f"chatroom_{chat_room_id}_{chat_room_name}_INSUFFICIENT_{timestamp}.json"
+
+def _stream_chat_room_export(chat_room_id: int, export_metadata: dict, compress: bool) -> Iterator[bytes]:
+    """
+    Produce the export body chunk by chunk. Uses its own session because the
+    response body is consumed after the request's dependencies have been closed.
+    """
+    db = SessionLocal()
+    try:
+        compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+        for fragment in crud.iter_chat_room_export_json(db, chat_room_id, export_metadata):
+            data = fragment.encode("utf-8")
+            if compressor:
+                data = compressor.compress(data)
+            if data:
+                yield data
+        if compressor:
+            yield compressor.flush()
+    finally:
+        db.close()
+
 @router.get("/chat-rooms/{chat_room_id}/export")
 async def export_chat_room_data(
     chat_room_id: int,
-    db: Session = Depends(get_db),
-    _: models.User = Depends(get_current_admin_user)
+    stream: bool = False,
+    gzip: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    _: models.User = Depends(get_current_admin_user_async)
 ):
     """
     Export all annotated data from a chat room as a downloadable JSON file.
@@ -520,8 +520,14 @@ async def export_chat_room_data(
     - All messages with their complete text and metadata
     - All annotations from all annotators for each message
     
+    With stream=true the file is written incrementally (metadata first, then one
+    message at a time), so large rooms export in constant memory. gzip=true
+    streams a gzip-compressed .json.gz instead.
+    
     Args:
         chat_room_id: ID of the chat room to export
+        stream: Stream the document instead of building it in memory
+        gzip: Stream a gzip-compressed document (implies stream)
     
     Returns:
         JSON file download with the complete annotated data
@@ -529,30 +535,276 @@ async def export_chat_room_data(
     Raises:
         HTTPException: 404 if chat room not found
     """
-    from fastapi.responses import JSONResponse
-    
-    # Get the export data
-    export_data = crud.export_chat_room_data(db=db, chat_room_id=chat_room_id)
-    
-    # Extract metadata for filename generation
-    metadata = export_data["export_metadata"]
-    chat_room_name = metadata["chat_room_name"].replace(" ", "_").replace("-", "_")
-    completion_status = metadata["completion_status"]
-    completion_percentage = metadata["completion_percentage"]
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if stream or gzip:
+        chat_room = await async_crud.get_chat_room(db, chat_room_id)
+        if not chat_room:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Chat room not found"
+            )
+        
+        export_metadata = await async_crud.get_chat_room_export_metadata(db, chat_room)
+        filename = _export_filename(chat_room_id, export_metadata)
+        media_type = "application/json"
+        if gzip:
+            filename += ".gz"
+            media_type = "application/gzip"
+        
+        return StreamingResponse(
+            _stream_chat_room_export(chat_room_id, export_metadata, compress=gzip),
+            media_type=media_type,
+            headers={
+                "Content-Disposition": f"attachment; filename={filename}"
+            }
+        )
     
-    # Create filename based on completion status
-    if completion_status == "COMPLETE":
-        filename = f"chatroom_{chat_room_id}_{chat_room_name}_COMPLETE_{timestamp}.json"
-    elif completion_status == "PARTIAL":
-        filename = f"chatroom_{chat_room_id}_{chat_room_name}_PARTIAL_{completion_percentage}pct_{timestamp}.json"
-    else:
-        filename = f"chatroom_{chat_room_id}_{chat_room_name}_INSUFFICIENT_{timestamp}.json"
+    # Read compact rows in this request's session; building and encoding the document runs in the compute pool
+    export_metadata, message_rows, annotation_rows = await async_crud.prepare_chat_room_export(db, chat_room_id)
+    body = await compute_pool.run_async(render_chat_room_export, export_metadata, message_rows, annotation_rows)
+    filename = _export_filename(chat_room_id, export_metadata)
     
     # Return as downloadable JSON file
-    return JSONResponse(
-        content=export_data,
+    return Response(
+        content=body,
+        media_type="application/json",
         headers={
             "Content-Disposition": f"attachment; filename={filename}"
         }
     )
+
+
+# PROJECT-WIDE EXPORT (BACKGROUND JOB)
+
+def _job_response(job: models.Job) -> schemas.Job:
+    """Convert a Job row into its API schema, adding throughput and the download link."""
+    response = schemas.Job.model_validate(job)
+    if job.started_at and job.processed_items:
+        end = job.finished_at or datetime.utcnow()
+        elapsed = (end.replace(tzinfo=None) - job.started_at.replace(tzinfo=None)).total_seconds()
+        if elapsed > 0:
+            response.items_per_second = round(job.processed_items / elapsed, 2)
+    if job.status == "completed" and job.result_path:
+        response.download_url = f"/admin/jobs/{job.id}/download"
+    return response
+
+@router.post("/projects/{project_id}/export", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
+async def start_project_export(
+    project_id: int,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_admin_user_async)
+):
+    """
+    Start a background export of every chat room in a project (admin only).
+    
+    The job writes one NDJSON shard per chat room (messages plus every annotator's
+    thread_id) and a manifest.json into a single zip archive. Poll
+    GET /admin/jobs/{job_id} for progress and download the archive from
+    GET /admin/jobs/{job_id}/download once it has completed.
+    """
+    project = await async_crud.get_project(db, project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    job = await async_crud.create_job(db, kind="project_export", project_id=project_id, created_by_id=current_user.id)
+    background_tasks.add_task(run_project_export_job, job.id)
+    return _job_response(job)
+
+@router.get("/jobs/{job_id}", response_model=schemas.Job)
+async def get_job_status(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    _: models.User = Depends(get_current_admin_user_async)
+):
+    """Get the status and progress of a background job (admin only)"""
+    job = await async_crud.get_job(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return _job_response(job)
+
+@router.get("/jobs/{job_id}/download")
+async def download_job_result(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    _: models.User = Depends(get_current_admin_user_async)
+):
+    """Download the file produced by a completed background job (admin only)"""
+    job = await async_crud.get_job(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    if job.status != "completed" or not job.result_path or not os.path.exists(job.result_path):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job {job_id} has no downloadable result (status: {job.status})"
+        )
+    
+    return FileResponse(
+        job.result_path,
+        media_type="application/zip",
+        filename=os.path.basename(job.result_path)
+    )
+
+
+# BACKGROUND IMPORT JOBS
+# Same imports as the endpoints above, but the handler only validates the request,
+# spools the upload to IMPORT_DIR and returns the job; a background worker then
+# imports the file chunk by chunk. Poll GET /admin/jobs/{job_id} for rows processed,
+# errors and throughput; the import response is in the job's result once completed.
+# total_items is 0 until the job has read the upload once to count its rows (CSV)
+# or parsed it (JSON); from then on it is the number of rows the import processes.
+
+def _spool_upload(file: UploadFile, header_check: Optional[Callable[[BinaryIO], object]] = None) -> str:
+    """
+    Copy an upload to IMPORT_DIR and return its path.
+    
+    Args:
+        file: The uploaded file
+        header_check: Optional validator called on the spooled file, e.g. iter_chat_message_batches,
+            which checks a CSV header eagerly and raises ValueError
+    
+    Raises:
+        HTTPException: 400 if header_check rejects the file
+    """
+    import_dir = get_settings().IMPORT_DIR
+    os.makedirs(import_dir, exist_ok=True)
+    upload_path = os.path.join(import_dir, f"{uuid.uuid4().hex}_{os.path.basename(file.filename)}")
+    with open(upload_path, "wb") as spool:
+        shutil.copyfileobj(file.file, spool)
+    
+    if header_check is not None:
+        try:
+            with open(upload_path, "rb") as spool:
+                header_check(spool)
+        except ValueError as e:
+            os.remove(upload_path)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Error processing CSV file: {str(e)}"
+            )
+    return upload_path
+
+@router.post("/projects/{project_id}/import-chat-room-csv/job", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
+def start_chat_room_csv_import(
+    project_id: int,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """
+    Create a new chat room from a CSV filename and import its content in the background (admin only).
+    The chat room is created immediately; its id is in the job's result once the import has completed.
+    """
+    project = crud.get_project(db, project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    if not file.filename or not file.filename.lower().endswith('.csv'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be a CSV and have a filename"
+        )
+    
+    upload_path = _spool_upload(file, iter_chat_message_batches)
+    
+    chat_room_name = os.path.splitext(file.filename)[0]
+    chat_room = crud.create_chat_room(db, chat_room=schemas.ChatRoomCreate(name=chat_room_name, project_id=project_id))
+    
+    job = crud.create_job(db, kind="chat_room_csv_import", project_id=project_id, created_by_id=current_user.id)
+    background_tasks.add_task(run_chat_room_csv_import_job, job.id, chat_room.id, upload_path)
+    return _job_response(job)
+
+@router.post("/chat-rooms/{chat_room_id}/import-annotations/job", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
+def start_annotation_csv_import(
+    chat_room_id: int,
+    background_tasks: BackgroundTasks,
+    user_id: int = Form(...),
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """Import annotations from CSV for a specific user in the background (admin only)"""
+    chat_room = crud.get_chat_room(db, chat_room_id)
+    if not chat_room:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chat room not found"
+        )
+    
+    if not crud.get_user(db, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    if not file.filename or not file.filename.lower().endswith('.csv'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be a CSV"
+        )
+    
+    upload_path = _spool_upload(file, iter_annotation_batches)
+    
+    job = crud.create_job(db, kind="annotation_csv_import", project_id=chat_room.project_id, created_by_id=current_user.id)
+    background_tasks.add_task(run_annotation_csv_import_job, job.id, chat_room_id, user_id, upload_path)
+    return _job_response(job)
+
+@router.post("/chat-rooms/{chat_room_id}/import-batch-annotations/job", response_model=schemas.Job, status_code=status.HTTP_202_ACCEPTED)
+def start_batch_annotation_import(
+    chat_room_id: int,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """
+    Import a batch annotation JSON file in the background (admin only).
+    The JSON is parsed and validated by the job; invalid files end in a failed job with the reason in its errors.
+    """
+    if not file.filename or not file.filename.lower().endswith('.json'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be a JSON file"
+        )
+    
+    chat_room = crud.get_chat_room(db, chat_room_id)
+    if not chat_room:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chat room not found"
+        )
+    
+    upload_path = _spool_upload(file)
+    
+    job = crud.create_job(db, kind="batch_annotation_import", project_id=chat_room.project_id, created_by_id=current_user.id)
+    background_tasks.add_task(run_batch_annotation_import_job, job.id, chat_room_id, upload_path)
+    return _job_response(job)
+
+
+# COMPUTE POOL METRICS
+
+@router.get("/compute-pool", response_model=schemas.ComputePoolMetrics)
+async def get_compute_pool_metrics(
+    _: models.User = Depends(get_current_admin_user_async)
+):
+    """
+    Get the concurrency limits and current load of the compute pool (admin only).
+    
+    running/queued are the tasks executing and waiting for a worker; rejected counts
+    requests turned away with 503 because the queue was full.
+    """
+    return schemas.ComputePoolMetrics(**compute_pool.metrics())
+
@@ -3,11 +3,16 @@ from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
 
+from .. import crud
 from ..database import get_db
 from ..auth import get_current_user
 from ..dependencies import verify_project_access
 from ..models import User, Annotation, ChatMessage, Project, ProjectAssignment, ChatRoom
-from ..schemas import Annotation as AnnotationSchema, AnnotationCreate, AnnotationList
+from ..schemas import (
+    Annotation as AnnotationSchema, AnnotationCreate, AnnotationList,
+    AnnotationBatchCreate, AnnotationBatchResponse,
+    ThreadRename, ThreadMerge, ThreadSplit, ThreadOperationResponse
+)
 
 # Router for message-specific annotations
 message_annotation_router = APIRouter(
@@ -21,6 +26,23 @@ project_annotation_router = APIRouter(
     tags=["annotations"]
 )
 
+# Router for room-level annotation writes (batches and thread operations)
+chat_room_annotation_router = APIRouter(
+    prefix="/projects/{project_id}/chat-rooms/{room_id}",
+    tags=["annotations"]
+)
+
+def _get_project_chat_room(db: Session, project_id: int, room_id: int) -> ChatRoom:
+    """Get the chat room or raise 404 if it does not exist in the project."""
+    chat_room = db.query(ChatRoom).filter(
+        ChatRoom.id == room_id,
+        ChatRoom.project_id == project_id
+    ).first()
+    
+    if not chat_room:
+        raise HTTPException(status_code=404, detail="Chat room not found in this project")
+    return chat_room
+
 @project_annotation_router.get("/my") # Changed path to /my
 def get_my_annotations(
     project_id: int,
@@ -29,20 +51,16 @@ def get_my_annotations(
     _: None = Depends(verify_project_access)
 ):
     """Get all annotations made by the current user in a specific project with rich context"""
-    # Get annotations with chat room and message information
+    # Room names and message text for context; the annotator is the caller, so no users join
     annotations = db.query(
         Annotation,
-        User.email.label('annotator_email'),
-        ChatRoom.id.label('chat_room_id'),
         ChatRoom.name.label('chat_room_name'),
         ChatMessage.turn_id.label('message_turn_id'),
         ChatMessage.turn_text.label('message_text')
-    ).join(
-        User, Annotation.annotator_id == User.id
     ).join(
         ChatMessage, Annotation.message_id == ChatMessage.id
     ).join(
-        ChatRoom, ChatMessage.chat_room_id == ChatRoom.id
+        ChatRoom, Annotation.chat_room_id == ChatRoom.id
     ).filter(
         Annotation.project_id == project_id,
         Annotation.annotator_id == current_user.id
@@ -50,14 +68,13 @@ def get_my_annotations(
     
     # Convert to list of dictionaries with rich context
     result = []
-    for annotation, annotator_email, chat_room_id, chat_room_name, message_turn_id, message_text in annotations:
+    for annotation, chat_room_name, message_turn_id, message_text in annotations:
         annotation_dict = annotation.__dict__.copy()
         # Remove SQLAlchemy internal attributes
         annotation_dict.pop('_sa_instance_state', None)
         
         # Add rich context
-        annotation_dict['annotator_email'] = annotator_email
-        annotation_dict['chat_room_id'] = chat_room_id
+        annotation_dict['annotator_email'] = current_user.email
         annotation_dict['chat_room_name'] = chat_room_name
         annotation_dict['message_turn_id'] = message_turn_id
         annotation_dict['message_text'] = message_text[:100] + "..." if len(message_text) > 100 else message_text
@@ -150,12 +167,14 @@ def create_annotation(
     # Create new annotation
     db_annotation = Annotation(
         message_id=message_id,
+        chat_room_id=message.chat_room_id,
         annotator_id=current_user.id,
         project_id=project_id,
         thread_id=annotation.thread_id,
         created_at=datetime.utcnow()
     )
     
+    crud.update_pair_counts(db, message.chat_room_id, {(message_id, current_user.id): annotation.thread_id})
     db.add(db_annotation)
     db.commit()
     db.refresh(db_annotation)
@@ -204,7 +223,77 @@ def delete_annotation(
             detail="Not enough permissions to delete this annotation"
         )
     
+    crud.update_pair_counts(db, message.chat_room_id, {(message_id, annotation.annotator_id): None})
     db.delete(annotation)
     db.commit()
     
-    return None 
\ No newline at end of file
+    return None 
+
+@chat_room_annotation_router.post("/annotations/batch", response_model=AnnotationBatchResponse)
+def create_annotations_batch(
+    project_id: int,
+    room_id: int,
+    batch: AnnotationBatchCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    _: None = Depends(verify_project_access)
+):
+    """
+    Create or update the current user's annotations for many messages of a chat room.
+    
+    All items are validated with one query and written in one transaction, so
+    assigning a whole thread costs one round trip. Unlike the single-message
+    endpoint, an existing annotation is updated instead of rejected. Invalid items
+    (message not in the room, repeated message) are reported per item and do not
+    fail the batch.
+    """
+    chat_room = _get_project_chat_room(db, project_id, room_id)
+    return crud.write_annotation_batch(db, chat_room, current_user.id, batch.annotations)
+
+
+@chat_room_annotation_router.post("/threads/rename", response_model=ThreadOperationResponse)
+def rename_thread(
+    project_id: int,
+    room_id: int,
+    operation: ThreadRename,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    _: None = Depends(verify_project_access)
+):
+    """Rename one of the current user's threads in a chat room (409 if the new name is taken)"""
+    _get_project_chat_room(db, project_id, room_id)
+    updated_count = crud.rename_thread(db, room_id, current_user.id, operation.thread_id, operation.new_thread_id)
+    return ThreadOperationResponse(chat_room_id=room_id, thread_id=operation.new_thread_id, updated_count=updated_count)
+
+@chat_room_annotation_router.post("/threads/merge", response_model=ThreadOperationResponse)
+def merge_threads(
+    project_id: int,
+    room_id: int,
+    operation: ThreadMerge,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    _: None = Depends(verify_project_access)
+):
+    """Merge one of the current user's threads into another of their threads in a chat room"""
+    _get_project_chat_room(db, project_id, room_id)
+    updated_count = crud.merge_threads(db, room_id, current_user.id, operation.thread_id, operation.target_thread_id)
+    return ThreadOperationResponse(chat_room_id=room_id, thread_id=operation.target_thread_id, updated_count=updated_count)
+
+@chat_room_annotation_router.post("/threads/split", response_model=ThreadOperationResponse)
+def split_thread(
+    project_id: int,
+    room_id: int,
+    operation: ThreadSplit,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    _: None = Depends(verify_project_access)
+):
+    """
+    Split one of the current user's threads at a message: the message and all
+    later messages of the thread (in message id order) move to a new thread.
+    """
+    _get_project_chat_room(db, project_id, room_id)
+    updated_count = crud.split_thread(
+        db, room_id, current_user.id, operation.thread_id, operation.message_id, operation.new_thread_id
+    )
+    return ThreadOperationResponse(chat_room_id=room_id, thread_id=operation.new_thread_id, updated_count=updated_count)
@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from typing import Optional
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models import User
 from ..schemas import Token, UserCreate, User as UserSchema
 from ..auth import (
@@ -12,10 +12,11 @@ from ..auth import (
     create_access_token,
     create_refresh_token,
     get_password_hash,
-    get_current_user,
+    get_current_user_async,
     refresh_access_token,
 )
 from ..config import get_settings
+from .. import async_crud
 
 settings = get_settings()
 router = APIRouter()
@@ -27,10 +28,10 @@ class TokenResponse(Token):
 @router.post("/token", response_model=TokenResponse)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Find user by email
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await async_crud.get_user_by_email(db, form_data.username)
     
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
@@ -88,10 +89,10 @@ async def refresh_token(
 @router.post("/register", response_model=UserSchema)
 async def register_user(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await async_crud.get_user_by_email(db, user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -108,16 +109,16 @@ async def register_user(
     
     try:
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
         return new_user
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create user: {str(e)}"
         )
 
 @router.get("/me", response_model=UserSchema)
-async def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(current_user: User = Depends(get_current_user_async)):
     return current_user 
\ No newline at end of file
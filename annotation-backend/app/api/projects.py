@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from sqlalchemy import select
 
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..models import User, Project, ProjectAssignment, ChatMessage, ChatRoom
 from ..schemas import (
     Project as ProjectSchema, 
@@ -13,11 +14,13 @@ from ..schemas import (
     MessageList,
     ChatRoom as ChatRoomSchema,
     ChatMessage as ChatMessageSchema,
+    ChatMessagePage,
+    ChatRoomSnapshot,
     Annotation as AnnotationSchema
 )
-from ..auth import get_current_user, get_current_admin_user
+from ..auth import get_current_user, get_current_user_async, get_current_admin_user
 from ..dependencies import verify_project_access
-from .. import crud
+from .. import crud, async_crud, principal_cache
 
 router = APIRouter()
 
@@ -25,22 +28,17 @@ router = APIRouter()
 
 @router.get("/", response_model=ProjectList)
 async def list_user_projects(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """List all projects assigned to the current user"""
     try:
         if current_user.is_admin:
             # Admins can see all projects
-            projects = db.query(Project).all()
+            projects = await async_crud.get_projects(db, limit=None)
         else:
             # Regular users only see assigned projects
-            projects = (
-                db.query(Project)
-                .join(ProjectAssignment)
-                .filter(ProjectAssignment.user_id == current_user.id)
-                .all()
-            )
+            projects = await async_crud.get_projects_for_user(db, current_user.id)
         
         return ProjectList(projects=projects)
     except Exception as e:
@@ -52,13 +50,13 @@ async def list_user_projects(
 @router.get("/{project_id}", response_model=ProjectSchema)
 async def get_project(
     project_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Get a specific project if the user has access"""
     try:
         # First check if project exists
-        project = db.query(Project).filter(Project.id == project_id).first()
+        project = await async_crud.get_project(db, project_id)
         
         if not project:
             raise HTTPException(
@@ -68,16 +66,7 @@ async def get_project(
         
         # Check access
         if not current_user.is_admin:
-            assignment = (
-                db.query(ProjectAssignment)
-                .filter(
-                    ProjectAssignment.project_id == project_id,
-                    ProjectAssignment.user_id == current_user.id
-                )
-                .first()
-            )
-            
-            if not assignment:
+            if not await async_crud.is_user_assigned_to_project(db, current_user.id, project_id):
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Not authorized to access this project"
@@ -96,8 +85,8 @@ async def get_project(
 async def assign_user_to_project(
     project_id: int,
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Assign a user to a project (admin only)"""
     if not current_user.is_admin:
@@ -108,7 +97,7 @@ async def assign_user_to_project(
     
     try:
         # Check if project exists
-        project = db.query(Project).filter(Project.id == project_id).first()
+        project = await async_crud.get_project(db, project_id)
         
         if not project:
             raise HTTPException(
@@ -117,7 +106,7 @@ async def assign_user_to_project(
             )
         
         # Check if user exists
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await async_crud.get_user(db, user_id)
         
         if not user:
             raise HTTPException(
@@ -125,28 +114,14 @@ async def assign_user_to_project(
                 detail="User not found"
             )
         
-        # Check if assignment already exists
-        assignment = (
-            db.query(ProjectAssignment)
-            .filter(
-                ProjectAssignment.project_id == project_id,
-                ProjectAssignment.user_id == user_id
-            )
-            .first()
-        )
-        
-        if assignment:
-            return  # Already assigned
-        
-        # Create assignment
-        assignment = ProjectAssignment(project_id=project_id, user_id=user_id)
-        db.add(assignment)
-        db.commit()
+        # Create assignment (no-op if already assigned)
+        await async_crud.assign_user_to_project(db, project_id, user_id)
+        principal_cache.invalidate_assignment(user_id, project_id)
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to assign user to project: {str(e)}"
@@ -156,8 +131,8 @@ async def assign_user_to_project(
 async def remove_user_from_project(
     project_id: int,
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Remove a user from a project (admin only)"""
     if not current_user.is_admin:
@@ -167,22 +142,12 @@ async def remove_user_from_project(
         )
     
     try:
-        # Find assignment
-        assignment = (
-            db.query(ProjectAssignment)
-            .filter(
-                ProjectAssignment.project_id == project_id,
-                ProjectAssignment.user_id == user_id
-            )
-            .first()
-        )
-        
-        if assignment:
-            db.delete(assignment)
-            db.commit()
+        # Delete assignment if it exists
+        await async_crud.remove_user_from_project(db, project_id, user_id)
+        principal_cache.invalidate_assignment(user_id, project_id)
             
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to remove user from project: {str(e)}"
@@ -191,13 +156,13 @@ async def remove_user_from_project(
 @router.get("/{project_id}/users", response_model=List[UserSchema])
 async def get_project_users(
     project_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Get all users assigned to a project"""
     try:
         # First check if project exists and user has access
-        project = db.query(Project).filter(Project.id == project_id).first()
+        project = await async_crud.get_project(db, project_id)
         
         if not project:
             raise HTTPException(
@@ -207,28 +172,14 @@ async def get_project_users(
         
         # Check access if not admin
         if not current_user.is_admin:
-            assignment = (
-                db.query(ProjectAssignment)
-                .filter(
-                    ProjectAssignment.project_id == project_id,
-                    ProjectAssignment.user_id == current_user.id
-                )
-                .first()
-            )
-            
-            if not assignment:
+            if not await async_crud.is_user_assigned_to_project(db, current_user.id, project_id):
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Not authorized to access this project"
                 )
         
         # Get all users assigned to the project
-        users = (
-            db.query(User)
-            .join(ProjectAssignment)
-            .filter(ProjectAssignment.project_id == project_id)
-            .all()
-        )
+        users = await async_crud.get_project_users(db, project_id)
         
         return users
     except HTTPException:
@@ -342,10 +293,93 @@ def get_chat_messages(
     # Get messages from the specific chat room
     messages = db.query(ChatMessage).filter(
         ChatMessage.chat_room_id == room_id
-    ).order_by(ChatMessage.created_at).offset(skip).limit(limit).all() # Added ordering
+    ).order_by(ChatMessage.created_at, ChatMessage.id).offset(skip).limit(limit).all() # id breaks created_at ties
     
     return messages 
 
+@router.get("/{project_id}/chat-rooms/{room_id}/messages/page", response_model=ChatMessagePage, tags=["chat rooms"])
+def get_chat_messages_page(
+    project_id: int,
+    room_id: int,
+    cursor: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    include_totals: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    _: None = Depends(verify_project_access)
+):
+    """
+    Get a page of messages from a chat room using keyset pagination.
+    
+    Messages are ordered by id. Start without a cursor and pass the returned
+    next_cursor to fetch the following page; next_cursor is null on the last page.
+    Unlike skip/limit, per-page latency stays constant for deep pages and pages
+    never reorder when messages share a created_at timestamp.
+    
+    total_messages and annotated_by_me are returned on the first page only
+    (or on any page with include_totals=true); later pages leave them null.
+    """
+    chat_room = db.query(ChatRoom.id).filter(
+        ChatRoom.id == room_id,
+        ChatRoom.project_id == project_id
+    ).first()
+    
+    if not chat_room:
+        raise HTTPException(status_code=404, detail=f"Chat room with id {room_id} not found in project {project_id}")
+    
+    messages, next_cursor = crud.get_chat_message_page(db, room_id, cursor=cursor, limit=limit)
+    page = ChatMessagePage(messages=messages, next_cursor=next_cursor)
+    
+    if cursor is None or include_totals:
+        page.total_messages = crud.count_chat_messages_by_room(db, room_id)
+        page.annotated_by_me = crud.get_annotation_counts_by_annotator(db, room_id).get(current_user.id, 0)
+    return page
+
+@router.get(
+    "/{project_id}/chat-rooms/{room_id}/snapshot",
+    response_model=ChatRoomSnapshot,
+    responses={304: {"description": "Snapshot unchanged since the ETag in If-None-Match"}},
+    tags=["chat rooms"]
+)
+def get_chat_room_snapshot(
+    project_id: int,
+    room_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    _: None = Depends(verify_project_access)
+):
+    """
+    Get all messages of a chat room and the caller's annotations in one response.
+    
+    The payload is columnar (parallel arrays, one entry per message in id order)
+    instead of one object per message and per annotation. The ETag changes with
+    the room's annotation_version, which every message and annotation write bumps;
+    send it back in If-None-Match to get an empty 304 when nothing changed.
+    """
+    chat_room = db.query(ChatRoom.id, ChatRoom.annotation_version).filter(
+        ChatRoom.id == room_id,
+        ChatRoom.project_id == project_id
+    ).first()
+    
+    if not chat_room:
+        raise HTTPException(status_code=404, detail=f"Chat room with id {room_id} not found in project {project_id}")
+    
+    # The payload depends on the caller, so the ETag does too.
+    # The version is read before the data: a concurrent write can only make the tag older than the data.
+    etag = f'W/"{room_id}-{chat_room.annotation_version}-{current_user.id}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    response.headers.update(headers)
+    return ChatRoomSnapshot(
+        chat_room_id=room_id,
+        version=chat_room.annotation_version,
+        **crud.get_chat_room_snapshot(db, room_id, current_user.id)
+    )
+
 @router.get("/{project_id}/chat-rooms/{room_id}/annotations", response_model=List[AnnotationSchema], tags=["annotations"])
 def get_chat_room_annotations(
     project_id: int,
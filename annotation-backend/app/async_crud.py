@@ -0,0 +1,174 @@
+"""
+Async variants of the crud functions used by the async route handlers.
+
+Simple lookups and inserts are written natively against AsyncSession. The heavy
+operations (aggregation, IAA data loading, cascading deletes) reuse the synchronous
+implementations in crud.py through AsyncSession.run_sync: the sync code runs
+unchanged, but every query it issues awaits the async driver, so the event loop
+keeps serving other requests while the database works. CPU-bound IAA matching
+is dispatched to the compute pool.
+"""
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud, models, schemas
+from .compute_pool import compute_pool
+from .config import get_settings
+
+# User CRUD operations
+async def get_user(db: AsyncSession, user_id: int) -> Optional[models.User]:
+    return await db.get(models.User, user_id)
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalars().first()
+
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[models.User]:
+    result = await db.execute(select(models.User).offset(skip).limit(limit))
+    return list(result.scalars().all())
+
+async def create_user(db: AsyncSession, user: schemas.UserCreate, hashed_password: str) -> models.User:
+    db_user = models.User(
+        email=user.email,
+        hashed_password=hashed_password,
+        is_admin=user.is_admin
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+async def delete_user(db: AsyncSession, user: models.User) -> None:
+    await db.run_sync(lambda session: crud.delete_user(session, user))
+
+# Project CRUD operations
+async def get_project(db: AsyncSession, project_id: int) -> Optional[models.Project]:
+    return await db.get(models.Project, project_id)
+
+async def get_projects(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[models.Project]:
+    result = await db.execute(select(models.Project).offset(skip).limit(limit))
+    return list(result.scalars().all())
+
+async def get_projects_for_user(db: AsyncSession, user_id: int) -> List[models.Project]:
+    result = await db.execute(
+        select(models.Project)
+        .join(models.ProjectAssignment)
+        .where(models.ProjectAssignment.user_id == user_id)
+    )
+    return list(result.scalars().all())
+
+async def create_project(db: AsyncSession, project: schemas.ProjectCreate) -> models.Project:
+    db_project = models.Project(
+        name=project.name,
+        description=project.description
+    )
+    db.add(db_project)
+    await db.commit()
+    await db.refresh(db_project)
+    return db_project
+
+async def delete_project(db: AsyncSession, project: models.Project) -> None:
+    await db.run_sync(lambda session: crud.delete_project(session, project))
+
+# ProjectAssignment CRUD operations
+async def is_user_assigned_to_project(db: AsyncSession, user_id: int, project_id: int) -> bool:
+    result = await db.execute(
+        select(models.ProjectAssignment.id).where(
+            models.ProjectAssignment.user_id == user_id,
+            models.ProjectAssignment.project_id == project_id
+        )
+    )
+    return result.first() is not None
+
+async def get_project_users(db: AsyncSession, project_id: int) -> List[models.User]:
+    result = await db.execute(
+        select(models.User)
+        .join(models.ProjectAssignment)
+        .where(models.ProjectAssignment.project_id == project_id)
+    )
+    return list(result.scalars().all())
+
+async def assign_user_to_project(db: AsyncSession, project_id: int, user_id: int) -> None:
+    """Create the assignment if it does not exist yet. Commits."""
+    if await is_user_assigned_to_project(db, user_id, project_id):
+        return
+    db.add(models.ProjectAssignment(project_id=project_id, user_id=user_id))
+    await db.run_sync(lambda session: crud.bump_annotation_versions_for_project(session, project_id))
+    await db.commit()
+
+async def remove_user_from_project(db: AsyncSession, project_id: int, user_id: int) -> None:
+    """Delete the assignment if it exists. Commits."""
+    result = await db.execute(
+        select(models.ProjectAssignment).where(
+            models.ProjectAssignment.project_id == project_id,
+            models.ProjectAssignment.user_id == user_id
+        )
+    )
+    assignment = result.scalars().first()
+    if assignment:
+        await db.delete(assignment)
+        await db.run_sync(lambda session: crud.bump_annotation_versions_for_project(session, project_id))
+        await db.commit()
+
+# ChatRoom CRUD operations
+async def get_chat_room(db: AsyncSession, chat_room_id: int) -> Optional[models.ChatRoom]:
+    return await db.get(models.ChatRoom, chat_room_id)
+
+# PHASE 3: AGGREGATED ANNOTATIONS
+async def get_aggregated_annotations_for_chat_room(db: AsyncSession, chat_room_id: int) -> List[dict]:
+    return await db.run_sync(lambda session: crud.get_aggregated_annotations_for_chat_room(session, chat_room_id))
+
+# PHASE 5: IAA ANALYSIS
+async def get_chat_room_iaa_analysis(db: AsyncSession, chat_room_id: int) -> Optional[schemas.ChatRoomIAA]:
+    """
+    Same result and caching as crud.get_chat_room_iaa_analysis, but the Hungarian
+    matching of large rooms runs in the compute pool on the rooms' overlap matrices.
+    """
+    cached = await db.run_sync(lambda session: crud.get_cached_iaa_analysis(session, chat_room_id))
+    if cached:
+        return cached
+    
+    chat_room = await get_chat_room(db, chat_room_id)
+    if not chat_room:
+        raise HTTPException(status_code=404, detail="Chat room not found")
+    
+    # Read the watermark before the data so a concurrent write can only make the entry stale-and-ignored
+    annotation_version = chat_room.annotation_version
+    analysis, pairs, pair_matrices = await db.run_sync(
+        lambda session: crud.prepare_chat_room_iaa_analysis(session, chat_room)
+    )
+    
+    if sum(matrix.size for matrix in pair_matrices) >= get_settings().COMPUTE_POOL_IAA_MIN_CELLS:
+        accuracies = await compute_pool.run_async(
+            crud.pairwise_one_to_one_accuracies, pair_matrices, analysis.message_count
+        )
+    else:
+        accuracies = crud.pairwise_one_to_one_accuracies(pair_matrices, analysis.message_count)
+    analysis = crud.complete_chat_room_iaa_analysis(analysis, pairs, accuracies)
+    
+    await db.run_sync(lambda session: crud.store_iaa_analysis(session, chat_room_id, annotation_version, analysis))
+    return analysis
+
+# EXPORT
+async def get_chat_room_export_metadata(db: AsyncSession, chat_room: models.ChatRoom) -> dict:
+    return await db.run_sync(lambda session: crud.get_chat_room_export_metadata(session, chat_room))
+
+async def prepare_chat_room_export(db: AsyncSession, chat_room_id: int) -> Tuple[dict, List[tuple], List[tuple]]:
+    return await db.run_sync(lambda session: crud.prepare_chat_room_export(session, chat_room_id))
+
+# BACKGROUND JOBS
+async def create_job(
+    db: AsyncSession,
+    kind: str,
+    project_id: Optional[int] = None,
+    created_by_id: Optional[int] = None
+) -> models.Job:
+    return await db.run_sync(
+        lambda session: crud.create_job(session, kind, project_id=project_id, created_by_id=created_by_id)
+    )
+
+async def get_job(db: AsyncSession, job_id: int) -> Optional[models.Job]:
+    return await db.get(models.Job, job_id)
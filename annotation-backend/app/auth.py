@@ -4,11 +4,12 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .config import get_settings
-from .database import get_db
-from .models import User
+from .database import get_db, get_async_db
+from . import crud, async_crud, principal_cache
 
 settings = get_settings()
 
@@ -50,32 +51,64 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None)
     return encoded_jwt
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _token_subject(token: str) -> str:
+    """Email in the access token's subject; raises 401 if the token is invalid."""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    return email
+
+
+# The current-user dependencies come in a sync and an async variant. A route uses the
+# variant matching its own session dependency (get_db / get_async_db), so FastAPI's
+# per-request dependency cache hands both the same session and a request never holds
+# connections from two pools.
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> principal_cache.Principal:
+    """Authenticated user for sync routes."""
+    email = _token_subject(token)
+    cached_user = principal_cache.get_cached_user(email)
+    if cached_user is not None:
+        return cached_user
     
-    user = db.query(User).filter(User.email == email).first()
+    user = crud.get_user_by_email(db, email)
     if user is None:
-        raise credentials_exception
-    return user
+        raise _credentials_exception()
+    return principal_cache.cache_user(user)
 
 
-async def get_current_admin_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> principal_cache.Principal:
+    """Authenticated user for async routes."""
+    email = _token_subject(token)
+    cached_user = principal_cache.get_cached_user(email)
+    if cached_user is not None:
+        return cached_user
+    
+    user = await async_crud.get_user_by_email(db, email)
+    if user is None:
+        raise _credentials_exception()
+    return principal_cache.cache_user(user)
+
+
+def _require_admin(current_user: principal_cache.Principal) -> principal_cache.Principal:
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -84,9 +117,21 @@ async def get_current_admin_user(
     return current_user
 
 
+async def get_current_admin_user(
+    current_user: principal_cache.Principal = Depends(get_current_user)
+) -> principal_cache.Principal:
+    return _require_admin(current_user)
+
+
+async def get_current_admin_user_async(
+    current_user: principal_cache.Principal = Depends(get_current_user_async)
+) -> principal_cache.Principal:
+    return _require_admin(current_user)
+
+
 async def refresh_access_token(
     refresh_token: str = Depends(oauth2_refresh_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> dict:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -103,7 +148,7 @@ async def refresh_access_token(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.email == email).first()
+    user = await async_crud.get_user_by_email(db, email)
     if user is None:
         raise credentials_exception
     
@@ -0,0 +1,130 @@
+"""
+Bounded process pool for CPU-heavy work (IAA matching, export rendering).
+
+Work is submitted with plain, picklable arguments (integer arrays, ids) and runs
+in separate worker processes, so a large analysis no longer holds the GIL of the
+process serving interactive requests. At most COMPUTE_POOL_WORKERS tasks run at
+once and at most COMPUTE_POOL_MAX_QUEUE more wait; beyond that submissions are
+rejected with 503 so the API sheds heavy load instead of queueing it forever.
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class ComputePool:
+    """ProcessPoolExecutor with a hard bound on in-flight tasks and usage counters."""
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(max(max_workers, 1) + max(max_queue, 0))
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: workers must not inherit the parent's threads, locks or open DB connections
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _reset_executor(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _on_done(self, future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self._failed += 1
+            else:
+                self._completed += 1
+        self._slots.release()
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            logger.error("Compute pool worker died; the pool will be recreated")
+            self._reset_executor()
+
+    def submit(self, fn: Callable, *args: Any) -> Future:
+        """
+        Submit fn(*args) to a worker process.
+
+        Raises:
+            HTTPException: 503 if the pool already has max_workers + max_queue tasks in flight
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy with other analyses, please retry shortly",
+                headers={"Retry-After": "5"}
+            )
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def run(self, fn: Callable, *args: Any) -> Any:
+        """Run fn(*args) in the pool and wait for it (for sync callers). Runs inline when the pool is disabled."""
+        if not self.enabled:
+            return fn(*args)
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable, *args: Any) -> Any:
+        """Await fn(*args) run in the pool without blocking the event loop."""
+        if not self.enabled:
+            return await run_in_threadpool(fn, *args)
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            in_flight = self._in_flight
+            running = min(in_flight, self.max_workers)
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": running,
+                "queued": in_flight - running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        self._reset_executor()
+
+
+_settings = get_settings()
+compute_pool = ComputePool(_settings.COMPUTE_POOL_WORKERS, _settings.COMPUTE_POOL_MAX_QUEUE)
@@ -1,11 +1,28 @@
-from sqlalchemy.orm import Session, Query
-from typing import List, Optional, Tuple
-from . import models, schemas
+from sqlalchemy.orm import Session, Query, aliased
+from sqlalchemy import insert, update, delete, select, and_, or_, func, distinct
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from . import models, schemas, principal_cache
 from fastapi import HTTPException
 import numpy as np
 from scipy.optimize import linear_sum_assignment
 from itertools import combinations
+from collections import Counter
 from datetime import datetime
+import json
+
+# Progress hook for chunked imports: called with (items processed so far, errors of the last chunk)
+ProgressCallback = Callable[[int, List[str]], None]
+
+def upsert_insert(db: Session, model):
+    """
+    INSERT construct supporting ON CONFLICT for the session's database.
+    SQLite and PostgreSQL share the on_conflict_do_update / excluded API.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql_insert(model)
+    return sqlite_insert(model)
 
 # User CRUD operations
 def get_user(db: Session, user_id: int) -> Optional[models.User]:
@@ -30,8 +47,19 @@ def create_user(db: Session, user: schemas.UserCreate, hashed_password: str) ->
 
 def delete_user(db: Session, user: models.User) -> None:
     """Delete a user from the database."""
+    user_id, email = user.id, user.email
+    bump_annotation_versions_for_user(db, user.id)
+    db.execute(
+        delete(models.AnnotationPairCount)
+        .where(or_(
+            models.AnnotationPairCount.annotator_1_id == user.id,
+            models.AnnotationPairCount.annotator_2_id == user.id
+        ))
+        .execution_options(synchronize_session=False)
+    )
     db.delete(user)
     db.commit()
+    principal_cache.invalidate_user(user_id, email)
 
 # Project CRUD operations
 def get_project(db: Session, project_id: int) -> Optional[models.Project]:
@@ -52,8 +80,10 @@ def create_project(db: Session, project: schemas.ProjectCreate) -> models.Projec
 
 def delete_project(db: Session, project: models.Project) -> None:
     """Delete a project from the database."""
+    project_id = project.id
     db.delete(project)
     db.commit()
+    principal_cache.invalidate_project(project_id)
 
 # ChatRoom CRUD operations
 def get_chat_room(db: Session, chat_room_id: int) -> Optional[models.ChatRoom]:
@@ -82,9 +112,8 @@ def get_annotations_for_chat_room(
     """
     return (
         db.query(models.Annotation, models.User.email)
-        .join(models.ChatMessage, models.Annotation.message_id == models.ChatMessage.id)
         .join(models.User, models.Annotation.annotator_id == models.User.id)
-        .filter(models.ChatMessage.chat_room_id == chat_room_id)
+        .filter(models.Annotation.chat_room_id == chat_room_id)
         .all()
     )
 
@@ -100,10 +129,9 @@ def get_annotations_for_chat_room_by_annotator(
     """
     return (
         db.query(models.Annotation, models.User.email)
-        .join(models.ChatMessage, models.Annotation.message_id == models.ChatMessage.id)
         .join(models.User, models.Annotation.annotator_id == models.User.id)
         .filter(
-            models.ChatMessage.chat_room_id == chat_room_id,
+            models.Annotation.chat_room_id == chat_room_id,
             models.Annotation.annotator_id == annotator_id
         )
         .all()
@@ -119,32 +147,20 @@ def get_all_annotations_for_chat_room_admin(
     """
     return (
         db.query(models.Annotation, models.User.email)
-        .join(models.ChatMessage, models.Annotation.message_id == models.ChatMessage.id)
         .join(models.User, models.Annotation.annotator_id == models.User.id)
-        .filter(models.ChatMessage.chat_room_id == chat_room_id)
+        .filter(models.Annotation.chat_room_id == chat_room_id)
         .all()
     )
 
 # ChatMessage CRUD operations
+MESSAGE_SCAN_CHUNK_SIZE = 1000
+
 def get_chat_message(db: Session, message_id: int) -> Optional[models.ChatMessage]:
     return db.query(models.ChatMessage).filter(models.ChatMessage.id == message_id).first()
 
 def get_chat_messages_by_room(db: Session, chat_room_id: int, skip: int = 0, limit: int = 100) -> List[models.ChatMessage]:
     return db.query(models.ChatMessage).filter(models.ChatMessage.chat_room_id == chat_room_id).offset(skip).limit(limit).all()
 
-def create_chat_message(db: Session, message: schemas.ChatMessageCreate, chat_room_id: int) -> models.ChatMessage:
-    db_message = models.ChatMessage(
-        turn_id=message.turn_id,
-        user_id=message.user_id,
-        turn_text=message.turn_text,
-        reply_to_turn=message.reply_to_turn,
-        chat_room_id=chat_room_id
-    )
-    db.add(db_message)
-    db.commit()
-    db.refresh(db_message)
-    return db_message
-
 def get_chat_message_by_turn_id(db: Session, chat_room_id: int, turn_id: str) -> Optional[models.ChatMessage]:
     """Get a chat message by its turn_id within a specific chat room."""
     return db.query(models.ChatMessage).filter(
@@ -152,6 +168,209 @@ def get_chat_message_by_turn_id(db: Session, chat_room_id: int, turn_id: str) ->
         models.ChatMessage.turn_id == turn_id
     ).first()
 
+def get_chat_message_page(
+    db: Session,
+    chat_room_id: int,
+    cursor: Optional[int] = None,
+    limit: int = 100
+) -> Tuple[List[models.ChatMessage], Optional[int]]:
+    """
+    Get one page of a chat room's messages in id order, starting after the cursor
+    (the last message id of the previous page). Served from the (chat_room_id, id)
+    index, so every page costs the same no matter how deep it is.
+    
+    Returns:
+        Tuple of (messages, next_cursor). next_cursor is None on the last page.
+    """
+    query = db.query(models.ChatMessage).filter(models.ChatMessage.chat_room_id == chat_room_id)
+    if cursor is not None:
+        query = query.filter(models.ChatMessage.id > cursor)
+    # Fetch one extra row to know whether another page follows
+    messages = query.order_by(models.ChatMessage.id).limit(limit + 1).all()
+    
+    if len(messages) > limit:
+        messages = messages[:limit]
+        return messages, messages[-1].id
+    return messages, None
+
+def get_chat_room_snapshot(db: Session, chat_room_id: int, annotator_id: int) -> Dict[str, list]:
+    """
+    Load every message of a chat room together with one annotator's annotations as
+    parallel columns (index i of every list describes the i-th message in id order).
+    
+    A single query: a room scan on the (chat_room_id, id) index, left-joined to the
+    annotator's annotation of each message through the (message_id, annotator_id) index.
+    Messages the annotator has not annotated have None for thread_id and annotation_id.
+    """
+    rows = (
+        db.query(
+            models.ChatMessage.id,
+            models.ChatMessage.turn_id,
+            models.ChatMessage.user_id,
+            models.ChatMessage.turn_text,
+            models.ChatMessage.reply_to_turn,
+            models.Annotation.thread_id,
+            models.Annotation.id
+        )
+        .outerjoin(
+            models.Annotation,
+            and_(
+                models.Annotation.message_id == models.ChatMessage.id,
+                models.Annotation.annotator_id == annotator_id
+            )
+        )
+        .filter(models.ChatMessage.chat_room_id == chat_room_id)
+        .order_by(models.ChatMessage.id)
+        .all()
+    )
+    columns = list(zip(*rows)) if rows else [()] * 7
+    keys = ("message_ids", "turn_ids", "user_ids", "turn_texts", "reply_to_turns", "thread_ids", "annotation_ids")
+    return {key: list(column) for key, column in zip(keys, columns)}
+
+def count_chat_messages_by_room(db: Session, chat_room_id: int) -> int:
+    return (
+        db.query(func.count(models.ChatMessage.id))
+        .filter(models.ChatMessage.chat_room_id == chat_room_id)
+        .scalar()
+    )
+
+def iter_chat_message_chunks(
+    db: Session,
+    chat_room_id: int,
+    *columns,
+    chunk_size: int = MESSAGE_SCAN_CHUNK_SIZE
+) -> Iterator[list]:
+    """
+    Scan a chat room's messages in id order with keyset pagination (id > last seen id),
+    yielding lists of at most chunk_size rows. Only ChatMessage.id plus the requested
+    columns are loaded, so there is no row ceiling and no ORM objects are kept around.
+    """
+    last_id = 0
+    while True:
+        chunk = (
+            db.query(models.ChatMessage.id, *columns)
+            .filter(
+                models.ChatMessage.chat_room_id == chat_room_id,
+                models.ChatMessage.id > last_id
+            )
+            .order_by(models.ChatMessage.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1].id
+
+def get_turn_ids_by_room(db: Session, chat_room_id: int) -> Set[str]:
+    """Get the set of turn_ids already stored for a chat room (single column-only query)."""
+    return {
+        turn_id for (turn_id,) in db.query(models.ChatMessage.turn_id).filter(
+            models.ChatMessage.chat_room_id == chat_room_id
+        )
+    }
+
+def _insert_chat_message_batch(
+    db: Session,
+    chat_room_id: int,
+    messages: List[dict],
+    seen_turn_ids: Set[str]
+) -> Tuple[int, int, List[str], List[str]]:
+    """
+    Validate one batch of messages against the known turn_ids and insert the new
+    ones with a single executemany INSERT. Updates seen_turn_ids in place. Does not commit.
+    """
+    skipped_count = 0
+    errors = []
+    warnings = []
+    rows = []
+
+    for message in messages:
+        try:
+            message_schema = schemas.ChatMessageCreate(
+                turn_id=message['turn_id'],
+                user_id=message['user_id'],
+                turn_text=message['turn_text'],
+                reply_to_turn=message.get('reply_to_turn')
+            )
+        except Exception as e:
+            errors.append(f"Error importing message {message.get('turn_id', 'unknown')}: {str(e)}")
+            skipped_count += 1
+            continue
+
+        if message_schema.turn_id in seen_turn_ids:
+            skipped_count += 1
+            warnings.append(f"Message with turn_id {message_schema.turn_id} already exists")
+            continue
+
+        seen_turn_ids.add(message_schema.turn_id)
+        rows.append({**message_schema.model_dump(), 'chat_room_id': chat_room_id})
+
+    if rows:
+        db.execute(insert(models.ChatMessage), rows)
+
+    return len(rows), skipped_count, errors, warnings
+
+def import_chat_message_batches(
+    db: Session,
+    chat_room_id: int,
+    batches: Iterable[List[dict]],
+    progress: Optional[ProgressCallback] = None
+) -> schemas.CSVImportResponse:
+    """
+    Insert chat messages into a chat room from an iterable of row batches.
+
+    Existing turn_ids are prefetched once, so duplicates (already stored or
+    repeated within the input) are skipped without a query per row. Each batch
+    is written with one executemany INSERT as soon as it arrives, so memory is
+    bounded by the batch size, and everything is committed once at the end.
+
+    Args:
+        db: Database session
+        chat_room_id: ID of the chat room
+        batches: Iterable of lists of dicts with 'turn_id', 'user_id', 'turn_text'
+            and optional 'reply_to_turn'
+        progress: Optional hook called after every batch. It must commit the
+            session, so each batch is committed as it is processed (background jobs).
+
+    Returns:
+        CSVImportResponse with the import statistics
+    """
+    total_messages = 0
+    imported_count = 0
+    skipped_count = 0
+    errors = []
+    warnings = []
+
+    seen_turn_ids = get_turn_ids_by_room(db, chat_room_id)
+
+    for messages in batches:
+        total_messages += len(messages)
+        imported, skipped, batch_errors, batch_warnings = _insert_chat_message_batch(
+            db, chat_room_id, messages, seen_turn_ids
+        )
+        imported_count += imported
+        skipped_count += skipped
+        errors.extend(batch_errors)
+        warnings.extend(batch_warnings)
+        
+        if progress is not None:
+            if imported:
+                bump_annotation_version(db, chat_room_id)
+            progress(total_messages, batch_errors)
+
+    if imported_count and progress is None:
+        bump_annotation_version(db, chat_room_id)
+    db.commit()
+
+    return schemas.CSVImportResponse(
+        total_messages=total_messages,
+        imported_count=imported_count,
+        skipped_count=skipped_count,
+        errors=errors,
+        warnings=warnings
+    )
+
 # Annotation CRUD operations
 def get_annotation(db: Session, annotation_id: int) -> Optional[models.Annotation]:
     return db.query(models.Annotation).filter(models.Annotation.id == annotation_id).first()
@@ -162,18 +381,6 @@ def get_annotations_by_message(db: Session, message_id: int) -> List[models.Anno
 def get_annotations_by_annotator(db: Session, annotator_id: int) -> List[models.Annotation]:
     return db.query(models.Annotation).filter(models.Annotation.annotator_id == annotator_id).all()
 
-def create_annotation(db: Session, annotation: schemas.AnnotationCreate) -> models.Annotation:
-    db_annotation = models.Annotation(
-        message_id=annotation.message_id,
-        annotator_id=annotation.annotator_id,
-        project_id=annotation.project_id,
-        thread_id=annotation.thread_id
-    )
-    db.add(db_annotation)
-    db.commit()
-    db.refresh(db_annotation)
-    return db_annotation
-
 # ProjectAssignment CRUD operations
 def get_project_assignment(db: Session, assignment_id: int) -> Optional[models.ProjectAssignment]:
     return db.query(models.ProjectAssignment).filter(models.ProjectAssignment.id == assignment_id).first()
@@ -184,79 +391,365 @@ def get_project_assignments_by_user(db: Session, user_id: int) -> List[models.Pr
 def get_project_assignments_by_project(db: Session, project_id: int) -> List[models.ProjectAssignment]:
     return db.query(models.ProjectAssignment).filter(models.ProjectAssignment.project_id == project_id).all()
 
+def is_user_assigned_to_project(db: Session, user_id: int, project_id: int) -> bool:
+    return db.query(models.ProjectAssignment.id).filter(
+        models.ProjectAssignment.user_id == user_id,
+        models.ProjectAssignment.project_id == project_id
+    ).first() is not None
+
 # Removed create_project_assignment function as it's unused and caused an import error
 # Assignment creation is handled directly in the admin endpoint.
 
+# Annotation version (watermark for the IAA result cache)
+# Every write that can change a room's IAA analysis (annotations, messages,
+# project assignments) bumps ChatRoom.annotation_version in the same transaction.
+
+def _bump_annotation_versions(db: Session, *criteria) -> None:
+    db.execute(
+        update(models.ChatRoom)
+        .where(*criteria)
+        # Keep updated_at for real room edits, not annotation activity
+        .values(
+            annotation_version=models.ChatRoom.annotation_version + 1,
+            updated_at=models.ChatRoom.updated_at
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+def bump_annotation_version(db: Session, chat_room_id: int) -> None:
+    """Invalidate cached IAA results for one chat room. Does not commit."""
+    _bump_annotation_versions(db, models.ChatRoom.id == chat_room_id)
+
+def bump_annotation_versions_for_project(db: Session, project_id: int) -> None:
+    """Invalidate cached IAA results for every chat room in a project. Does not commit."""
+    _bump_annotation_versions(db, models.ChatRoom.project_id == project_id)
+
+def bump_annotation_versions_for_user(db: Session, user_id: int) -> None:
+    """Invalidate cached IAA results for every chat room a user is assigned to or has annotated. Does not commit."""
+    assigned_projects = select(models.ProjectAssignment.project_id).where(
+        models.ProjectAssignment.user_id == user_id
+    )
+    annotated_rooms = select(models.Annotation.chat_room_id).where(models.Annotation.annotator_id == user_id)
+    _bump_annotation_versions(
+        db,
+        or_(
+            models.ChatRoom.project_id.in_(assigned_projects),
+            models.ChatRoom.id.in_(annotated_rooms)
+        )
+    )
+
+# Annotation pair counts (incrementally maintained IAA contingency matrices)
+# Every annotation create/update/delete calls update_pair_counts *before* applying
+# the write, so models.AnnotationPairCount always mirrors the annotations table.
+# update_pair_counts also bumps the room's annotation_version, so callers don't.
+
+PAIR_COUNT_QUERY_CHUNK = 500
+
+def _pair_cells(threads_by_annotator: Dict[int, str]) -> Iterator[Tuple[int, int, str, str]]:
+    """Yield the (annotator_1, annotator_2, thread_1, thread_2) cells one message contributes, self pairs included."""
+    items = sorted(threads_by_annotator.items())
+    for i, (annotator_1_id, thread_1) in enumerate(items):
+        for annotator_2_id, thread_2 in items[i:]:
+            yield annotator_1_id, annotator_2_id, thread_1, thread_2
+
+def _get_threads_by_message(db: Session, message_ids: List[int]) -> Dict[int, Dict[int, str]]:
+    """Current {message_id: {annotator_id: thread_id}} for the given messages."""
+    threads_by_message = {}
+    for start in range(0, len(message_ids), PAIR_COUNT_QUERY_CHUNK):
+        chunk = message_ids[start:start + PAIR_COUNT_QUERY_CHUNK]
+        rows = db.query(
+            models.Annotation.message_id, models.Annotation.annotator_id, models.Annotation.thread_id
+        ).filter(models.Annotation.message_id.in_(chunk))
+        for message_id, annotator_id, thread_id in rows:
+            threads_by_message.setdefault(message_id, {})[annotator_id] = thread_id
+    return threads_by_message
+
+def update_pair_counts(
+    db: Session,
+    chat_room_id: int,
+    changes: Dict[Tuple[int, int], Optional[str]]
+) -> None:
+    """
+    Apply pending annotation writes to the room's materialized pair counts.
+    
+    Must be called before the writes themselves reach the database, since the
+    current annotations of the touched messages are read as the "before" state.
+    To keep that read from racing another writer, the room's annotation_version
+    is bumped first: the UPDATE row-locks the chat room on PostgreSQL and takes
+    the write lock on SQLite, so writers to the same room are serialized until
+    commit and each one reads the state the previous one committed. The bump
+    also invalidates the room's cached IAA results, so callers need not repeat it.
+    Does not commit.
+    
+    Args:
+        db: Database session
+        chat_room_id: ID of the chat room the messages belong to
+        changes: Maps (message_id, annotator_id) to the new thread_id, or None for a deletion
+    """
+    if not changes:
+        return
+    
+    bump_annotation_version(db, chat_room_id)
+    message_ids = sorted({message_id for message_id, _ in changes})
+    before = _get_threads_by_message(db, message_ids)
+    after = {message_id: dict(threads) for message_id, threads in before.items()}
+    for (message_id, annotator_id), thread_id in changes.items():
+        threads = after.setdefault(message_id, {})
+        if thread_id is None:
+            threads.pop(annotator_id, None)
+        else:
+            threads[annotator_id] = thread_id
+    
+    deltas = Counter()
+    for message_id in message_ids:
+        deltas.subtract(_pair_cells(before.get(message_id, {})))
+        deltas.update(_pair_cells(after.get(message_id, {})))
+    
+    rows = [
+        {
+            'chat_room_id': chat_room_id,
+            'annotator_1_id': annotator_1_id,
+            'annotator_2_id': annotator_2_id,
+            'thread_1': thread_1,
+            'thread_2': thread_2,
+            'count': delta
+        }
+        for (annotator_1_id, annotator_2_id, thread_1, thread_2), delta in deltas.items()
+        if delta != 0
+    ]
+    if not rows:
+        return
+    
+    stmt = upsert_insert(db, models.AnnotationPairCount)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['chat_room_id', 'annotator_1_id', 'annotator_2_id', 'thread_1', 'thread_2'],
+        set_={'count': models.AnnotationPairCount.count + stmt.excluded.count}
+    )
+    db.execute(stmt, rows)
+    db.execute(
+        delete(models.AnnotationPairCount)
+        .where(
+            models.AnnotationPairCount.chat_room_id == chat_room_id,
+            models.AnnotationPairCount.count <= 0
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+def rebuild_pair_counts(db: Session, chat_room_id: int) -> None:
+    """Recompute a room's pair counts from scratch from the annotations table. Commits."""
+    db.execute(
+        delete(models.AnnotationPairCount)
+        .where(models.AnnotationPairCount.chat_room_id == chat_room_id)
+        .execution_options(synchronize_session=False)
+    )
+    annotation_1 = aliased(models.Annotation)
+    annotation_2 = aliased(models.Annotation)
+    pairs = (
+        select(
+            annotation_1.chat_room_id,
+            annotation_1.annotator_id,
+            annotation_2.annotator_id,
+            annotation_1.thread_id,
+            annotation_2.thread_id,
+            func.count()
+        )
+        .join(
+            annotation_2,
+            and_(
+                annotation_2.message_id == annotation_1.message_id,
+                annotation_2.annotator_id >= annotation_1.annotator_id
+            )
+        )
+        .where(annotation_1.chat_room_id == chat_room_id)
+        .group_by(
+            annotation_1.chat_room_id,
+            annotation_1.annotator_id,
+            annotation_2.annotator_id,
+            annotation_1.thread_id,
+            annotation_2.thread_id
+        )
+    )
+    db.execute(
+        insert(models.AnnotationPairCount).from_select(
+            ['chat_room_id', 'annotator_1_id', 'annotator_2_id', 'thread_1', 'thread_2', 'count'],
+            pairs
+        )
+    )
+    bump_annotation_version(db, chat_room_id)
+    db.commit()
+
+def get_annotation_counts_by_annotator(db: Session, chat_room_id: int) -> Dict[int, int]:
+    """Number of messages each annotator has annotated in a room, read from the self-pair counts."""
+    rows = (
+        db.query(models.AnnotationPairCount.annotator_1_id, func.sum(models.AnnotationPairCount.count))
+        .filter(
+            models.AnnotationPairCount.chat_room_id == chat_room_id,
+            models.AnnotationPairCount.annotator_1_id == models.AnnotationPairCount.annotator_2_id
+        )
+        .group_by(models.AnnotationPairCount.annotator_1_id)
+    )
+    return {annotator_id: count for annotator_id, count in rows}
+
+def get_pair_count_matrices(
+    db: Session, chat_room_id: int
+) -> Tuple[Dict[int, int], Dict[Tuple[int, int], np.ndarray]]:
+    """
+    Load a room's materialized contingency data.
+    
+    Returns:
+        Tuple of (annotation count per annotator, overlap matrix per annotator pair).
+        Matrices are keyed (annotator_1_id, annotator_2_id) with annotator_1_id < annotator_2_id,
+        rows indexed by annotator_1's threads and columns by annotator_2's.
+    """
+    rows = db.query(
+        models.AnnotationPairCount.annotator_1_id,
+        models.AnnotationPairCount.annotator_2_id,
+        models.AnnotationPairCount.thread_1,
+        models.AnnotationPairCount.thread_2,
+        models.AnnotationPairCount.count
+    ).filter(models.AnnotationPairCount.chat_room_id == chat_room_id).all()
+    
+    annotation_counts = {}
+    thread_index = {}
+    for annotator_1_id, annotator_2_id, thread_1, _, count in rows:
+        if annotator_1_id == annotator_2_id:
+            annotation_counts[annotator_1_id] = annotation_counts.get(annotator_1_id, 0) + count
+            labels = thread_index.setdefault(annotator_1_id, {})
+            labels.setdefault(thread_1, len(labels))
+    
+    matrices = {}
+    for annotator_1_id, annotator_2_id, thread_1, thread_2, count in rows:
+        if annotator_1_id == annotator_2_id:
+            continue
+        key = (annotator_1_id, annotator_2_id)
+        if key not in matrices:
+            matrices[key] = np.zeros(
+                (len(thread_index[annotator_1_id]), len(thread_index[annotator_2_id])), dtype=np.int64
+            )
+        matrices[key][thread_index[annotator_1_id][thread_1], thread_index[annotator_2_id][thread_2]] += count
+    
+    return annotation_counts, matrices
+
 # PHASE 2: IMPORT ANNOTATIONS WITH ATTRIBUTION
 
+def get_message_id_map_by_room(db: Session, chat_room_id: int) -> Dict[str, int]:
+    """Get a turn_id -> message_id map for every message in a chat room (single query)."""
+    return {
+        turn_id: message_id for turn_id, message_id in db.query(
+            models.ChatMessage.turn_id, models.ChatMessage.id
+        ).filter(models.ChatMessage.chat_room_id == chat_room_id)
+    }
+
+def upsert_annotations(db: Session, rows: List[dict]) -> None:
+    """
+    Insert or update many annotations in one executemany statement.
+    Each row carries message_id, chat_room_id (the message's room), annotator_id,
+    project_id and thread_id. Rows that collide on uix_message_annotator get their
+    thread_id overwritten.
+    Does not commit.
+    """
+    if not rows:
+        return
+    stmt = upsert_insert(db, models.Annotation)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['message_id', 'annotator_id'],
+        set_={'thread_id': stmt.excluded.thread_id, 'updated_at': func.now()}
+    )
+    db.execute(stmt, rows)
+
 def import_annotations_for_chat_room(
     db: Session, 
     chat_room_id: int, 
     annotator_id: int, 
     project_id: int,
-    annotations_data: List[dict]
+    annotations_data: List[dict],
+    message_id_by_turn: Optional[Dict[str, int]] = None
 ) -> Tuple[int, int, List[str]]:
     """
     Import annotations for a chat room and assign them to a specific annotator.
     
+    The room's turn_id -> message_id map is loaded once (or passed in by batch
+    callers), unknown turn_ids are found by set difference, and all valid rows
+    are upserted in a single statement keyed on uix_message_annotator.
+    
     Args:
         db: Database session
         chat_room_id: ID of the chat room
         annotator_id: ID of the user who made these annotations
         project_id: ID of the project
         annotations_data: List of dicts with 'turn_id' and 'thread_id'
+        message_id_by_turn: Optional prefetched map from get_message_id_map_by_room
     
     Returns:
         Tuple of (imported_count, skipped_count, errors)
     """
-    imported_count = 0
-    skipped_count = 0
+    if message_id_by_turn is None:
+        message_id_by_turn = get_message_id_map_by_room(db, chat_room_id)
+    
+    rows_by_message, imported_count, skipped_count, errors = _build_annotation_rows(
+        chat_room_id, annotator_id, project_id, annotations_data, message_id_by_turn
+    )
+    
+    try:
+        update_pair_counts(db, chat_room_id, {
+            (message_id, annotator_id): row['thread_id'] for message_id, row in rows_by_message.items()
+        })
+        upsert_annotations(db, list(rows_by_message.values()))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        errors.append(f"Error writing annotations for annotator {annotator_id}: {str(e)}")
+        return 0, len(annotations_data), errors
+    
+    return imported_count, skipped_count, errors
+
+def _build_annotation_rows(
+    chat_room_id: int,
+    annotator_id: int,
+    project_id: int,
+    annotations_data: List[dict],
+    message_id_by_turn: Dict[str, int]
+) -> Tuple[Dict[int, dict], int, int, List[str]]:
+    """
+    Validate one annotator's (turn_id, thread_id) items against the room's messages.
+    
+    Returns:
+        Tuple of (annotation rows keyed by message_id, imported_count, skipped_count, errors)
+    """
+    requested_turn_ids = {data.get('turn_id') for data in annotations_data if data.get('turn_id')}
+    unknown_turn_ids = requested_turn_ids - message_id_by_turn.keys()
+    
     errors = []
+    skipped_count = 0
+    # Keyed by message_id so a turn repeated in the input keeps its last thread_id
+    rows_by_message = {}
+    imported_count = 0
     
     for annotation_data in annotations_data:
-        try:
-            turn_id = annotation_data.get('turn_id')
-            thread_id = annotation_data.get('thread_id')
-            
-            if not turn_id or not thread_id:
-                errors.append(f"Missing turn_id or thread_id in annotation data: {annotation_data}")
-                skipped_count += 1
-                continue
-            
-            # Find the message by turn_id in this chat room
-            message = get_chat_message_by_turn_id(db, chat_room_id, turn_id)
-            if not message:
-                errors.append(f"Message with turn_id '{turn_id}' not found in chat room {chat_room_id}")
-                skipped_count += 1
-                continue
-            
-            # Check if annotation already exists for this message and annotator
-            existing_annotation = db.query(models.Annotation).filter(
-                models.Annotation.message_id == message.id,
-                models.Annotation.annotator_id == annotator_id
-            ).first()
-            
-            if existing_annotation:
-                # Update existing annotation
-                existing_annotation.thread_id = thread_id
-                imported_count += 1
-            else:
-                # Create new annotation
-                new_annotation = models.Annotation(
-                    message_id=message.id,
-                    annotator_id=annotator_id,
-                    project_id=project_id,
-                    thread_id=thread_id
-                )
-                db.add(new_annotation)
-                imported_count += 1
-                
-        except Exception as e:
-            errors.append(f"Error processing annotation for turn_id '{annotation_data.get('turn_id')}': {str(e)}")
+        turn_id = annotation_data.get('turn_id')
+        thread_id = annotation_data.get('thread_id')
+        
+        if not turn_id or not thread_id:
+            errors.append(f"Missing turn_id or thread_id in annotation data: {annotation_data}")
+            skipped_count += 1
+            continue
+        
+        if turn_id in unknown_turn_ids:
+            errors.append(f"Message with turn_id '{turn_id}' not found in chat room {chat_room_id}")
             skipped_count += 1
+            continue
+        
+        message_id = message_id_by_turn[turn_id]
+        rows_by_message[message_id] = {
+            'message_id': message_id,
+            'chat_room_id': chat_room_id,
+            'annotator_id': annotator_id,
+            'project_id': project_id,
+            'thread_id': thread_id
+        }
+        imported_count += 1
     
-    db.commit()
-    return imported_count, skipped_count, errors
+    return rows_by_message, imported_count, skipped_count, errors
 
 # PHASE 3: AGGREGATION FOR IAA ANALYSIS
 
@@ -331,11 +824,66 @@ def get_aggregated_annotations_for_chat_room(
 
 # PHASE 4: BATCH ANNOTATION IMPORT
 
+def import_annotation_batches(
+    db: Session,
+    chat_room: models.ChatRoom,
+    annotator: models.User,
+    batches: Iterable[List[dict]],
+    progress: Optional[ProgressCallback] = None
+) -> schemas.AnnotationImportResponse:
+    """
+    Import one annotator's annotations for a chat room from an iterable of row batches.
+    turn_ids are resolved once for the whole input; each batch is committed on its own.
+    
+    Args:
+        db: Database session
+        chat_room: The chat room the annotations belong to
+        annotator: The user the annotations are attributed to
+        batches: Iterable of lists of dicts with 'turn_id' and 'thread_id'
+        progress: Optional hook called after every batch
+    
+    Returns:
+        AnnotationImportResponse with the import statistics
+    """
+    message_id_by_turn = get_message_id_map_by_room(db, chat_room.id)
+    
+    total_annotations = 0
+    imported_count = 0
+    skipped_count = 0
+    errors = []
+    
+    for annotations_data in batches:
+        total_annotations += len(annotations_data)
+        imported, skipped, batch_errors = import_annotations_for_chat_room(
+            db=db,
+            chat_room_id=chat_room.id,
+            annotator_id=annotator.id,
+            project_id=chat_room.project_id,
+            annotations_data=annotations_data,
+            message_id_by_turn=message_id_by_turn
+        )
+        imported_count += imported
+        skipped_count += skipped
+        errors.extend(batch_errors)
+        if progress is not None:
+            progress(total_annotations, batch_errors)
+    
+    return schemas.AnnotationImportResponse(
+        chat_room_id=chat_room.id,
+        annotator_id=annotator.id,
+        annotator_email=annotator.email,
+        total_annotations=total_annotations,
+        imported_count=imported_count,
+        skipped_count=skipped_count,
+        errors=errors
+    )
+
 def import_batch_annotations_for_chat_room(
     db: Session,
     chat_room_id: int,
     project_id: int,
-    batch_data: schemas.BatchAnnotationImport
+    batch_data: schemas.BatchAnnotationImport,
+    progress: Optional[ProgressCallback] = None
 ) -> schemas.BatchAnnotationImportResponse:
     """
     Import batch annotations from multiple annotators for a chat room.
@@ -352,6 +900,7 @@ def import_batch_annotations_for_chat_room(
         chat_room_id: ID of the chat room
         project_id: ID of the project
         batch_data: Structured batch annotation data
+        progress: Optional hook called after every annotator with the annotations processed so far
     
     Returns:
         BatchAnnotationImportResponse with detailed import statistics
@@ -390,6 +939,9 @@ def import_batch_annotations_for_chat_room(
             global_errors=global_errors
         )
     
+    # Resolve turn_ids once for every annotator in the batch
+    message_id_by_turn = get_message_id_map_by_room(db, chat_room_id)
+    
     # Process each annotator
     for annotator_data in batch_data.annotators:
         annotator_errors = []
@@ -427,7 +979,8 @@ def import_batch_annotations_for_chat_room(
                 chat_room_id=chat_room_id,
                 annotator_id=user.id,
                 project_id=project_id,
-                annotations_data=annotations_data
+                annotations_data=annotations_data,
+                message_id_by_turn=message_id_by_turn
             )
             
             imported_count = imported
@@ -453,6 +1006,8 @@ def import_batch_annotations_for_chat_room(
             skipped_count=skipped_count,
             errors=annotator_errors
         ))
+        if progress is not None:
+            progress(total_annotations_processed, annotator_errors)
     
     # Determine overall message
     if global_errors:
@@ -474,82 +1029,525 @@ def import_batch_annotations_for_chat_room(
         global_errors=global_errors
     )
 
-# PHASE 5: INTER-ANNOTATOR AGREEMENT (IAA) FUNCTIONS
+# BATCH ANNOTATION WRITES (ANNOTATOR API)
 
-def _calculate_one_to_one_accuracy(annot1: List[str], annot2: List[str]) -> float:
+def write_annotation_batch(
+    db: Session,
+    chat_room: models.ChatRoom,
+    annotator_id: int,
+    items: List[schemas.AnnotationBase]
+) -> schemas.AnnotationBatchResponse:
     """
-    Computes the one-to-one accuracy metric for two lists of annotations.
-    This metric finds the optimal matching between thread labels from two annotators
-    and calculates the percentage of messages that align based on this matching.
-
-    Parameters:
-    annot1: A list of thread identifiers (e.g., strings) from the first annotator.
-    annot2: A list of thread identifiers from the second annotator. Must be the same length as annot1.
-
+    Create or update one annotator's annotations for many messages of a chat room
+    in a single transaction.
+    
+    One query checks that every message belongs to the room and reads the
+    annotator's current thread for it; the changed rows are then written with one
+    upsert. Items whose message is not in the room, or that repeat a message
+    already in the batch, are reported as errors and do not stop the others.
+    Commits.
+    
     Returns:
-    A float representing the accuracy score (0-100).
+        AnnotationBatchResponse with one result per item, in request order
     """
-    # Ensure annotations are of the same length
-    assert len(annot1) == len(annot2), "Annotation lists must have the same length."
+    message_ids = {item.message_id for item in items}
+    current = {
+        message_id: (annotation_id, thread_id)
+        for message_id, annotation_id, thread_id in db.query(
+            models.ChatMessage.id, models.Annotation.id, models.Annotation.thread_id
+        ).outerjoin(
+            models.Annotation,
+            and_(
+                models.Annotation.message_id == models.ChatMessage.id,
+                models.Annotation.annotator_id == annotator_id
+            )
+        ).filter(
+            models.ChatMessage.chat_room_id == chat_room.id,
+            models.ChatMessage.id.in_(message_ids)
+        )
+    }
     
-    if len(annot1) == 0:
-        return 0.0
-
-    # Create a contingency matrix to store the overlap between thread labels
-    unique_labels1 = sorted(list(set(annot1)))
-    unique_labels2 = sorted(list(set(annot2)))
+    results = []
+    changes = {}
+    seen = set()
+    for item in items:
+        result = schemas.AnnotationBatchItemResult(
+            message_id=item.message_id, thread_id=item.thread_id, status="error"
+        )
+        results.append(result)
+        if item.message_id not in current:
+            result.error = "Message not found in this chat room"
+        elif item.message_id in seen:
+            result.error = "Duplicate message_id in batch"
+        else:
+            seen.add(item.message_id)
+            annotation_id, thread_id = current[item.message_id]
+            result.annotation_id = annotation_id
+            if annotation_id is None:
+                result.status = "created"
+            elif thread_id != item.thread_id:
+                result.status = "updated"
+            else:
+                result.status = "unchanged"
+                continue
+            changes[(item.message_id, annotator_id)] = item.thread_id
     
-    label_map1 = {label: i for i, label in enumerate(unique_labels1)}
-    label_map2 = {label: i for i, label in enumerate(unique_labels2)}
-
-    # Initialize a zero matrix for counting overlaps
-    overlap_matrix = np.zeros((len(unique_labels1), len(unique_labels2)), dtype=int)
+    if changes:
+        try:
+            update_pair_counts(db, chat_room.id, changes)
+            upsert_annotations(db, [
+                {
+                    'message_id': message_id,
+                    'chat_room_id': chat_room.id,
+                    'annotator_id': annotator_id,
+                    'project_id': chat_room.project_id,
+                    'thread_id': thread_id
+                }
+                for (message_id, _), thread_id in changes.items()
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        created_ids = [result.message_id for result in results if result.status == "created"]
+        if created_ids:
+            new_ids = dict(db.query(models.Annotation.message_id, models.Annotation.id).filter(
+                models.Annotation.annotator_id == annotator_id,
+                models.Annotation.message_id.in_(created_ids)
+            ))
+            for result in results:
+                if result.status == "created":
+                    result.annotation_id = new_ids.get(result.message_id)
+    
+    counts = Counter(result.status for result in results)
+    return schemas.AnnotationBatchResponse(
+        chat_room_id=chat_room.id,
+        created=counts["created"],
+        updated=counts["updated"],
+        unchanged=counts["unchanged"],
+        failed=counts["error"],
+        results=results
+    )
 
-    # Populate the overlap matrix
-    for i in range(len(annot1)):
-        idx1 = label_map1[annot1[i]]
-        idx2 = label_map2[annot2[i]]
-        overlap_matrix[idx1, idx2] += 1
+# THREAD OPERATIONS (ANNOTATOR API)
+# Rename, merge and split relabel one annotator's annotations of one thread in a
+# room with a single UPDATE, served by the (chat_room_id, annotator_id, thread_id, message_id) index.
 
-    # Apply the Hungarian algorithm to find the optimal matching.
-    # We negate the matrix because the algorithm finds the minimum cost assignment,
-    # and we want to maximize the overlap.
-    row_ind, col_ind = linear_sum_assignment(-overlap_matrix)
+def _thread_criteria(chat_room_id: int, annotator_id: int, thread_id: str) -> list:
+    """Filter for one annotator's annotations of one thread within a chat room."""
+    return [
+        models.Annotation.chat_room_id == chat_room_id,
+        models.Annotation.annotator_id == annotator_id,
+        models.Annotation.thread_id == thread_id
+    ]
 
-    # Calculate total overlap by summing the values at the optimal matching positions
-    total_overlap = overlap_matrix[row_ind, col_ind].sum()
+def get_thread_message_ids(db: Session, chat_room_id: int, annotator_id: int, thread_id: str) -> List[int]:
+    """Ids of the messages an annotator assigned to a thread in a chat room, in id order."""
+    return [
+        message_id for (message_id,) in db.query(models.Annotation.message_id)
+        .filter(*_thread_criteria(chat_room_id, annotator_id, thread_id))
+        .order_by(models.Annotation.message_id)
+    ]
 
-    # Calculate one-to-one accuracy as the percentage of the total messages
-    accuracy = (total_overlap / len(annot1)) * 100 if len(annot1) > 0 else 0
+def _relabel_thread(
+    db: Session,
+    chat_room_id: int,
+    annotator_id: int,
+    thread_id: str,
+    new_thread_id: str,
+    message_ids: List[int],
+    from_message_id: Optional[int] = None
+) -> int:
+    """
+    Move a thread (or its messages from from_message_id on) to new_thread_id with
+    one UPDATE, keeping pair counts and the room version in step. message_ids are
+    the messages that move, as read by the caller. Commits.
+    """
+    criteria = _thread_criteria(chat_room_id, annotator_id, thread_id)
+    if from_message_id is not None:
+        criteria.append(models.Annotation.message_id >= from_message_id)
+    try:
+        update_pair_counts(
+            db, chat_room_id, {(message_id, annotator_id): new_thread_id for message_id in message_ids}
+        )
+        db.execute(
+            update(models.Annotation)
+            .where(*criteria)
+            .values(thread_id=new_thread_id, updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(message_ids)
 
-    return accuracy
+def _require_thread(db: Session, chat_room_id: int, annotator_id: int, thread_id: str) -> List[int]:
+    message_ids = get_thread_message_ids(db, chat_room_id, annotator_id, thread_id)
+    if not message_ids:
+        raise HTTPException(status_code=404, detail=f"Thread '{thread_id}' not found in this chat room")
+    return message_ids
 
+def _require_new_thread(db: Session, chat_room_id: int, annotator_id: int, thread_id: str) -> None:
+    exists = db.query(models.Annotation.id).filter(
+        *_thread_criteria(chat_room_id, annotator_id, thread_id)
+    ).first()
+    if exists:
+        raise HTTPException(status_code=409, detail=f"Thread '{thread_id}' already exists in this chat room")
 
-def get_chat_room_iaa_analysis(db: Session, chat_room_id: int) -> Optional[schemas.ChatRoomIAA]:
+def rename_thread(db: Session, chat_room_id: int, annotator_id: int, thread_id: str, new_thread_id: str) -> int:
     """
-    Calculates and returns the Inter-Annotator Agreement (IAA) analysis for a chat room.
+    Rename an annotator's thread in a chat room. The new name must not be in use
+    (merge_threads joins two existing threads). Commits.
     
-    This function now supports partial analysis:
-    1. Verifies the chat room exists
-    2. Identifies annotators who have completed annotating all messages
-    3. If 2+ annotators have completed work, calculates IAA for that subset
-    4. Returns analysis with clear status and annotator information
+    Returns:
+        Number of annotations relabelled
+    """
+    if new_thread_id == thread_id:
+        raise HTTPException(status_code=400, detail="The new thread id is the same as the current one")
+    message_ids = _require_thread(db, chat_room_id, annotator_id, thread_id)
+    _require_new_thread(db, chat_room_id, annotator_id, new_thread_id)
+    return _relabel_thread(db, chat_room_id, annotator_id, thread_id, new_thread_id, message_ids)
+
+def merge_threads(db: Session, chat_room_id: int, annotator_id: int, thread_id: str, target_thread_id: str) -> int:
+    """
+    Merge an annotator's thread into another of their threads in the same chat room. Commits.
+    
+    Returns:
+        Number of annotations moved to the target thread
+    """
+    if target_thread_id == thread_id:
+        raise HTTPException(status_code=400, detail="Cannot merge a thread into itself")
+    message_ids = _require_thread(db, chat_room_id, annotator_id, thread_id)
+    _require_thread(db, chat_room_id, annotator_id, target_thread_id)
+    return _relabel_thread(db, chat_room_id, annotator_id, thread_id, target_thread_id, message_ids)
+
+def split_thread(
+    db: Session,
+    chat_room_id: int,
+    annotator_id: int,
+    thread_id: str,
+    message_id: int,
+    new_thread_id: str
+) -> int:
+    """
+    Split an annotator's thread at a message: that message and every later message
+    (by id) of the thread move to a new thread. Commits.
+    
+    Returns:
+        Number of annotations moved to the new thread
+    """
+    message_ids = _require_thread(db, chat_room_id, annotator_id, thread_id)
+    if message_id not in message_ids:
+        raise HTTPException(status_code=404, detail=f"Message {message_id} is not in thread '{thread_id}'")
+    _require_new_thread(db, chat_room_id, annotator_id, new_thread_id)
+    return _relabel_thread(
+        db, chat_room_id, annotator_id, thread_id, new_thread_id,
+        message_ids[message_ids.index(message_id):], from_message_id=message_id
+    )
+
+# WORKBOOK IMPORT (EXCEL IMPORT TOOL)
+
+def import_chat_room_workbook(
+    db: Session,
+    project_id: int,
+    workbook: schemas.WorkbookImport
+) -> schemas.WorkbookImportResponse:
+    """
+    Create a chat room with its messages, annotators and all of their annotations
+    in a single transaction.
+    
+    Users are looked up and created in bulk, missing project assignments are added,
+    messages and annotations are written with one executemany statement each, and
+    everything is committed once at the end. Any database error rolls back the
+    whole workbook, so a failed import never leaves a half-imported room behind.
+    Invalid items (duplicate turn_ids, annotations of unknown turns) are skipped
+    and reported, as in the CSV imports.
     
     Args:
         db: Database session
-        chat_room_id: ID of the chat room to analyze
+        project_id: ID of the project the chat room is created in
+        workbook: Room metadata, messages and every annotator's annotations
+    
+    Returns:
+        WorkbookImportResponse with the created chat room and per-annotator statistics
+    """
+    from app.auth import get_password_hash
+    
+    try:
+        chat_room = models.ChatRoom(
+            name=workbook.chat_room.name,
+            description=workbook.chat_room.description,
+            project_id=project_id
+        )
+        db.add(chat_room)
+        db.flush()
+        
+        # Messages
+        imported_messages, skipped_messages, message_errors, message_warnings = _insert_chat_message_batch(
+            db, chat_room.id, [message.model_dump() for message in workbook.messages], set()
+        )
+        import_details = schemas.CSVImportResponse(
+            total_messages=len(workbook.messages),
+            imported_count=imported_messages,
+            skipped_count=skipped_messages,
+            errors=message_errors,
+            warnings=message_warnings
+        )
+        
+        # Annotators: one query for the existing users, one flush for the new ones
+        emails = list(dict.fromkeys(annotator.annotator_email for annotator in workbook.annotators))
+        users_by_email = {
+            user.email: user
+            for user in db.query(models.User).filter(models.User.email.in_(emails))
+        }
+        password_hashes = {}
+        new_user_rows = {}
+        for annotator in workbook.annotators:
+            if annotator.annotator_email in users_by_email or annotator.annotator_email in new_user_rows:
+                continue
+            # Create new user with default password (they'll need to reset it)
+            password = annotator.password or "changeMe123!"
+            if password not in password_hashes:
+                password_hashes[password] = get_password_hash(password)
+            new_user_rows[annotator.annotator_email] = {
+                'email': annotator.annotator_email,
+                'hashed_password': password_hashes[password],
+                'is_admin': False
+            }
+        users_created = list(new_user_rows)
+        if new_user_rows:
+            # Concurrent workbook imports may create the same annotator; the first insert wins
+            db.execute(
+                upsert_insert(db, models.User).on_conflict_do_nothing(index_elements=['email']),
+                list(new_user_rows.values())
+            )
+            users_by_email.update(
+                (user.email, user)
+                for user in db.query(models.User).filter(models.User.email.in_(users_created))
+            )
+        
+        # Project assignments: existing ones (or ones a concurrent import adds) are left alone,
+        # and RETURNING reports only the rows this import actually inserted
+        new_assignments = []
+        if users_by_email:
+            new_assignments = db.scalars(
+                upsert_insert(db, models.ProjectAssignment)
+                .values([{'project_id': project_id, 'user_id': user.id} for user in users_by_email.values()])
+                .on_conflict_do_nothing(index_elements=['user_id', 'project_id'])
+                .returning(models.ProjectAssignment.user_id)
+            ).all()
+        
+        # Annotations of every annotator, written together
+        message_id_by_turn = get_message_id_map_by_room(db, chat_room.id)
+        rows_by_key = {}
+        results = []
+        total_imported = 0
+        total_skipped = 0
+        for annotator in workbook.annotators:
+            user = users_by_email[annotator.annotator_email]
+            rows_by_message, imported, skipped, errors = _build_annotation_rows(
+                chat_room.id,
+                user.id,
+                project_id,
+                [annotation.model_dump() for annotation in annotator.annotations],
+                message_id_by_turn
+            )
+            for message_id, row in rows_by_message.items():
+                rows_by_key[(message_id, user.id)] = row
+            total_imported += imported
+            total_skipped += skipped
+            results.append(schemas.BatchAnnotationResult(
+                annotator_email=annotator.annotator_email,
+                annotator_name=annotator.annotator_name,
+                user_id=user.id,
+                imported_count=imported,
+                skipped_count=skipped,
+                errors=errors
+            ))
+        
+        update_pair_counts(db, chat_room.id, {key: row['thread_id'] for key, row in rows_by_key.items()})
+        upsert_annotations(db, list(rows_by_key.values()))
         
+        if new_assignments:
+            # Assignments change the annotator set of every room in the project
+            bump_annotation_versions_for_project(db, project_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    
+    for user_id in new_assignments:
+        principal_cache.invalidate_assignment(user_id, project_id)
+    db.refresh(chat_room)
+    
+    return schemas.WorkbookImportResponse(
+        message=f"Workbook imported: {imported_messages} messages and {total_imported} annotations from {len(workbook.annotators)} annotators.",
+        chat_room=chat_room,
+        import_details=import_details,
+        users_created=users_created,
+        users_assigned=len(new_assignments),
+        total_annotations_processed=sum(len(annotator.annotations) for annotator in workbook.annotators),
+        total_imported=total_imported,
+        total_skipped=total_skipped,
+        results=results
+    )
+
+# PHASE 5: INTER-ANNOTATOR AGREEMENT (IAA) FUNCTIONS
+
+def _factorize_thread_labels(labels: List[str]) -> Tuple[np.ndarray, int]:
+    """
+    Encodes a list of thread labels as a dense integer array.
+
     Returns:
-        ChatRoomIAA schema with analysis (complete, partial, or insufficient data)
+    A tuple (codes, label_count) where codes[i] is the index of labels[i]
+    in order of first appearance. The ordering does not affect the matching.
     """
-    # Get chat room
+    label_index = {}
+    codes = np.fromiter(
+        (label_index.setdefault(label, len(label_index)) for label in labels),
+        dtype=np.int64,
+        count=len(labels)
+    )
+    return codes, len(label_index)
+
+
+def _contingency_matrix(codes1: np.ndarray, n_labels1: int, codes2: np.ndarray, n_labels2: int) -> np.ndarray:
+    """
+    Builds the overlap matrix between two factorized annotations in one pass:
+    cell (i, j) counts the messages labelled i by the first annotator and j by the second.
+    """
+    flat = np.bincount(codes1 * n_labels2 + codes2, minlength=n_labels1 * n_labels2)
+    return flat.reshape(n_labels1, n_labels2)
+
+
+def _one_to_one_accuracy_from_matrix(overlap_matrix: np.ndarray, message_count: int) -> float:
+    """One-to-one accuracy (0-100) given the overlap matrix of two annotators over message_count messages."""
+    if message_count == 0 or overlap_matrix.size == 0:
+        return 0.0
+
+    # Apply the Hungarian algorithm to find the optimal matching.
+    # We negate the matrix because the algorithm finds the minimum cost assignment,
+    # and we want to maximize the overlap.
+    row_ind, col_ind = linear_sum_assignment(-overlap_matrix)
+    total_overlap = overlap_matrix[row_ind, col_ind].sum()
+
+    return float(total_overlap / message_count * 100)
+
+
+def _calculate_one_to_one_accuracy(annot1: List[str], annot2: List[str]) -> float:
+    """
+    Computes the one-to-one accuracy metric for two lists of annotations.
+    This metric finds the optimal matching between thread labels from two annotators
+    and calculates the percentage of messages that align based on this matching.
+
+    Parameters:
+    annot1: A list of thread identifiers (e.g., strings) from the first annotator.
+    annot2: A list of thread identifiers from the second annotator. Must be the same length as annot1.
+
+    Returns:
+    A float representing the accuracy score (0-100).
+    """
+    # Ensure annotations are of the same length
+    assert len(annot1) == len(annot2), "Annotation lists must have the same length."
+
+    codes1, n_labels1 = _factorize_thread_labels(annot1)
+    codes2, n_labels2 = _factorize_thread_labels(annot2)
+    overlap_matrix = _contingency_matrix(codes1, n_labels1, codes2, n_labels2)
+    return _one_to_one_accuracy_from_matrix(overlap_matrix, len(annot1))
+
+
+def get_cached_iaa_analysis(db: Session, chat_room_id: int) -> Optional[schemas.ChatRoomIAA]:
+    """
+    Return the cached IAA analysis for a chat room if it was computed at the
+    room's current annotation_version, otherwise None. Single primary-key lookup.
+    """
+    cached = (
+        db.query(models.ChatRoomIAACache.result_json)
+        .join(models.ChatRoom, models.ChatRoom.id == models.ChatRoomIAACache.chat_room_id)
+        .filter(
+            models.ChatRoomIAACache.chat_room_id == chat_room_id,
+            models.ChatRoomIAACache.annotation_version == models.ChatRoom.annotation_version
+        )
+        .first()
+    )
+    if not cached:
+        return None
+    return schemas.ChatRoomIAA.model_validate_json(cached.result_json)
+
+def store_iaa_analysis(db: Session, chat_room_id: int, annotation_version: int, analysis: schemas.ChatRoomIAA) -> None:
+    """Save an IAA analysis computed at the given annotation_version, replacing any older entry."""
+    stmt = upsert_insert(db, models.ChatRoomIAACache).values(
+        chat_room_id=chat_room_id,
+        annotation_version=annotation_version,
+        result_json=analysis.model_dump_json()
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['chat_room_id'],
+        set_={
+            'annotation_version': stmt.excluded.annotation_version,
+            'result_json': stmt.excluded.result_json,
+            'computed_at': func.now()
+        }
+    )
+    try:
+        db.execute(stmt)
+        db.commit()
+    except Exception:
+        # The cache is an optimization; never fail the analysis because of it
+        db.rollback()
+
+def get_chat_room_iaa_analysis(db: Session, chat_room_id: int) -> Optional[schemas.ChatRoomIAA]:
+    """
+    Returns the IAA analysis for a chat room, served from the result cache when
+    no annotation write has happened since it was last computed.
+    See _compute_chat_room_iaa_analysis for the analysis itself.
+    """
+    cached = get_cached_iaa_analysis(db, chat_room_id)
+    if cached:
+        return cached
+    
     chat_room = get_chat_room(db, chat_room_id)
     if not chat_room:
         raise HTTPException(status_code=404, detail="Chat room not found")
     
-    # Get all messages in the chat room
-    messages = get_chat_messages_by_room(db, chat_room_id, skip=0, limit=10000)
-    message_count = len(messages)
+    # Read the watermark before the data so a concurrent write can only make the entry stale-and-ignored
+    annotation_version = chat_room.annotation_version
+    analysis = _compute_chat_room_iaa_analysis(db, chat_room)
+    store_iaa_analysis(db, chat_room_id, annotation_version, analysis)
+    return analysis
+
+def pairwise_one_to_one_accuracies(overlap_matrices: List[np.ndarray], message_count: int) -> List[float]:
+    """
+    One-to-one accuracy for each overlap matrix (Hungarian step only).
+    Takes plain integer arrays so it can run in a compute pool worker process.
+    """
+    return [_one_to_one_accuracy_from_matrix(matrix, message_count) for matrix in overlap_matrices]
+
+def prepare_chat_room_iaa_analysis(
+    db: Session, chat_room: models.ChatRoom
+) -> Tuple[schemas.ChatRoomIAA, List[Tuple[schemas.AnnotatorInfo, schemas.AnnotatorInfo]], List[np.ndarray]]:
+    """
+    Load everything the IAA analysis needs from the database.
+    
+    Identifies annotators who have completed annotating all messages and, if 2+
+    have, collects the overlap matrix of every completed pair from the
+    materialized pair counts.
+    
+    Args:
+        db: Database session
+        chat_room: The chat room to analyze
+        
+    Returns:
+        Tuple of (analysis without pairwise accuracies, annotator pairs, overlap matrix per pair).
+        Pass the matrices to pairwise_one_to_one_accuracies and the result to
+        complete_chat_room_iaa_analysis.
+    """
+    chat_room_id = chat_room.id
+    
+    # Count messages in the chat room
+    message_count = count_chat_messages_by_room(db, chat_room_id)
     
     if message_count == 0:
         raise HTTPException(status_code=400, detail="Chat room has no messages")
@@ -562,40 +1560,18 @@ def get_chat_room_iaa_analysis(db: Session, chat_room_id: int) -> Optional[schem
         .all()
     )
     
-    # Get all annotations for this chat room with annotator information
-    annotations_query = (
-        db.query(models.Annotation, models.User.email, models.ChatMessage.turn_id)
-        .join(models.ChatMessage, models.Annotation.message_id == models.ChatMessage.id)
-        .join(models.User, models.Annotation.annotator_id == models.User.id)
-        .filter(models.ChatMessage.chat_room_id == chat_room_id)
-        .order_by(models.ChatMessage.id, models.Annotation.annotator_id)
-        .all()
-    )
-    
-    # Group annotations by annotator
-    annotator_data = {}
-    for annotation, email, turn_id in annotations_query:
-        annotator_id = annotation.annotator_id
-        if annotator_id not in annotator_data:
-            annotator_data[annotator_id] = {
-                'email': email,
-                'annotations': {}
-            }
-        annotator_data[annotator_id]['annotations'][annotation.message_id] = annotation.thread_id
+    # Load the materialized contingency matrices instead of scanning annotations
+    annotation_counts, overlap_matrices = get_pair_count_matrices(db, chat_room_id)
     
     # Identify completed and pending annotators
     completed_annotators = []
     pending_annotators = []
     
     for user in assigned_users:
-        if user.id in annotator_data:
-            # Check if this annotator has annotated all messages
-            if len(annotator_data[user.id]['annotations']) == message_count:
-                completed_annotators.append(schemas.AnnotatorInfo(id=user.id, email=user.email))
-            else:
-                pending_annotators.append(schemas.AnnotatorInfo(id=user.id, email=user.email))
+        # Check if this annotator has annotated all messages
+        if annotation_counts.get(user.id, 0) == message_count:
+            completed_annotators.append(schemas.AnnotatorInfo(id=user.id, email=user.email))
         else:
-            # User hasn't started annotating
             pending_annotators.append(schemas.AnnotatorInfo(id=user.id, email=user.email))
     
     # Determine analysis status
@@ -604,50 +1580,12 @@ def get_chat_room_iaa_analysis(db: Session, chat_room_id: int) -> Optional[schem
     
     if completed_count < 2:
         # Not enough completed annotators for analysis
-        return schemas.ChatRoomIAA(
-            chat_room_id=chat_room_id,
-            chat_room_name=chat_room.name,
-            message_count=message_count,
-            analysis_status="NotEnoughData",
-            total_annotators_assigned=total_assigned,
-            completed_annotators=completed_annotators,
-            pending_annotators=pending_annotators,
-            pairwise_accuracies=[]
-        )
-    
-    # We have enough completed annotators - calculate IAA for completed subset
-    analysis_status = "Complete" if completed_count == total_assigned else "Partial"
-    
-    # Create ordered annotation lists for completed annotators only
-    message_ids = [msg.id for msg in messages]
-    completed_annotator_lists = {}
-    
-    for completed_annotator in completed_annotators:
-        annotator_id = completed_annotator.id
-        completed_annotator_lists[annotator_id] = {
-            'email': completed_annotator.email,
-            'annotations': [annotator_data[annotator_id]['annotations'][msg_id] for msg_id in message_ids]
-        }
-    
-    # Calculate pairwise accuracies for completed annotators
-    pairwise_accuracies = []
-    completed_annotator_ids = list(completed_annotator_lists.keys())
-    
-    for annotator_1_id, annotator_2_id in combinations(completed_annotator_ids, 2):
-        annot1 = completed_annotator_lists[annotator_1_id]['annotations']
-        annot2 = completed_annotator_lists[annotator_2_id]['annotations']
-        
-        accuracy = _calculate_one_to_one_accuracy(annot1, annot2)
-        
-        pairwise_accuracies.append(schemas.PairwiseAccuracy(
-            annotator_1_id=annotator_1_id,
-            annotator_2_id=annotator_2_id,
-            annotator_1_email=completed_annotator_lists[annotator_1_id]['email'],
-            annotator_2_email=completed_annotator_lists[annotator_2_id]['email'],
-            accuracy=accuracy
-        ))
+        analysis_status = "NotEnoughData"
+    else:
+        # We have enough completed annotators - calculate IAA for completed subset
+        analysis_status = "Complete" if completed_count == total_assigned else "Partial"
     
-    return schemas.ChatRoomIAA(
+    analysis = schemas.ChatRoomIAA(
         chat_room_id=chat_room_id,
         chat_room_name=chat_room.name,
         message_count=message_count,
@@ -655,84 +1593,86 @@ def get_chat_room_iaa_analysis(db: Session, chat_room_id: int) -> Optional[schem
         total_annotators_assigned=total_assigned,
         completed_annotators=completed_annotators,
         pending_annotators=pending_annotators,
-        pairwise_accuracies=pairwise_accuracies
+        pairwise_accuracies=[]
     )
+    if completed_count < 2:
+        return analysis, [], []
+    
+    pairs = []
+    pair_matrices = []
+    for annotator_1, annotator_2 in combinations(completed_annotators, 2):
+        if annotator_1.id < annotator_2.id:
+            overlap_matrix = overlap_matrices.get((annotator_1.id, annotator_2.id))
+        else:
+            overlap_matrix = overlap_matrices.get((annotator_2.id, annotator_1.id))
+            overlap_matrix = overlap_matrix.T if overlap_matrix is not None else None
+        
+        pairs.append((annotator_1, annotator_2))
+        # No shared cells means no overlap at all
+        pair_matrices.append(overlap_matrix if overlap_matrix is not None else np.zeros((0, 0), dtype=np.int64))
+    
+    return analysis, pairs, pair_matrices
 
+def complete_chat_room_iaa_analysis(
+    analysis: schemas.ChatRoomIAA,
+    pairs: List[Tuple[schemas.AnnotatorInfo, schemas.AnnotatorInfo]],
+    accuracies: List[float]
+) -> schemas.ChatRoomIAA:
+    """Fill in the pairwise accuracies computed for the pairs returned by prepare_chat_room_iaa_analysis."""
+    analysis.pairwise_accuracies = [
+        schemas.PairwiseAccuracy(
+            annotator_1_id=annotator_1.id,
+            annotator_2_id=annotator_2.id,
+            annotator_1_email=annotator_1.email,
+            annotator_2_email=annotator_2.email,
+            accuracy=accuracy
+        )
+        for (annotator_1, annotator_2), accuracy in zip(pairs, accuracies)
+    ]
+    return analysis
 
-# EXPORT FUNCTIONALITY
-
-def export_chat_room_data(db: Session, chat_room_id: int) -> dict:
+def _compute_chat_room_iaa_analysis(db: Session, chat_room: models.ChatRoom) -> schemas.ChatRoomIAA:
     """
-    Export all annotated data from a chat room into a structured format.
+    Calculates and returns the Inter-Annotator Agreement (IAA) analysis for a chat room.
     
-    Returns a dictionary containing:
-    - Chat room metadata
-    - All messages with their annotations from all annotators
+    This function now supports partial analysis:
+    1. Identifies annotators who have completed annotating all messages
+    2. If 2+ annotators have completed work, calculates IAA for that subset
+    3. Returns analysis with clear status and annotator information
+    
+    Runs the matching inline; the async API dispatches the same steps to the compute pool.
     
     Args:
         db: Database session
-        chat_room_id: ID of the chat room to export
+        chat_room: The chat room to analyze
         
     Returns:
-        Dictionary with the export data structure
+        ChatRoomIAA schema with analysis (complete, partial, or insufficient data)
     """
-    # Get chat room
-    chat_room = get_chat_room(db, chat_room_id)
-    if not chat_room:
-        raise HTTPException(status_code=404, detail="Chat room not found")
-    
-    # Get all messages in the chat room (ordered by ID for consistency)
-    messages = db.query(models.ChatMessage).filter(
-        models.ChatMessage.chat_room_id == chat_room_id
-    ).order_by(models.ChatMessage.id).all()
-    
-    # Get all annotations for this chat room with annotator information
-    annotations_query = (
-        db.query(models.Annotation, models.User.email)
-        .join(models.ChatMessage, models.Annotation.message_id == models.ChatMessage.id)
-        .join(models.User, models.Annotation.annotator_id == models.User.id)
-        .filter(models.ChatMessage.chat_room_id == chat_room_id)
-        .order_by(models.ChatMessage.id, models.Annotation.annotator_id)
-        .all()
-    )
-    
-    # Group annotations by message ID
-    annotations_by_message = {}
-    for annotation, annotator_email in annotations_query:
-        message_id = annotation.message_id
-        if message_id not in annotations_by_message:
-            annotations_by_message[message_id] = []
-        
-        annotations_by_message[message_id].append({
-            "id": annotation.id,
-            "thread_id": annotation.thread_id,
-            "annotator_email": annotator_email,
-            "created_at": annotation.created_at.isoformat(),
-            "updated_at": annotation.updated_at.isoformat() if annotation.updated_at else None
-        })
+    analysis, pairs, pair_matrices = prepare_chat_room_iaa_analysis(db, chat_room)
+    accuracies = pairwise_one_to_one_accuracies(pair_matrices, analysis.message_count)
+    return complete_chat_room_iaa_analysis(analysis, pairs, accuracies)
+
+
+# EXPORT FUNCTIONALITY
+
+def get_chat_room_export_metadata(db: Session, chat_room: models.ChatRoom) -> dict:
+    """
+    Build the export_metadata block for a chat room using aggregate queries only
+    (message count, per-annotator counts, distinct annotated messages).
+    """
+    total_messages = count_chat_messages_by_room(db, chat_room.id)
     
     # Get project assignment information for completion analysis
-    assigned_users = (
-        db.query(models.User)
-        .join(models.ProjectAssignment, models.User.id == models.ProjectAssignment.user_id)
+    total_annotators = (
+        db.query(func.count(models.ProjectAssignment.id))
         .filter(models.ProjectAssignment.project_id == chat_room.project_id)
-        .all()
+        .scalar()
     )
     
-    # Calculate completion statistics
-    total_messages = len(messages)
-    total_annotators = len(assigned_users)
-    
     # Count completed annotators (those who annotated all messages)
-    annotator_completion = {}
-    for annotation, annotator_email in annotations_query:
-        annotator_id = annotation.annotator_id
-        if annotator_id not in annotator_completion:
-            annotator_completion[annotator_id] = set()
-        annotator_completion[annotator_id].add(annotation.message_id)
-    
-    completed_annotators = sum(1 for message_set in annotator_completion.values() 
-                              if len(message_set) == total_messages)
+    annotation_counts = get_annotation_counts_by_annotator(db, chat_room.id)
+    completed_annotators = sum(1 for count in annotation_counts.values() if count == total_messages)
     
     # Calculate completion percentage
     completion_percentage = (completed_annotators / total_annotators * 100) if total_annotators > 0 else 0
@@ -746,39 +1686,244 @@ def export_chat_room_data(db: Session, chat_room_id: int) -> dict:
         completion_status = "INSUFFICIENT"
     
     # Count annotated messages
-    annotated_messages = len(annotations_by_message)
+    annotated_messages = (
+        db.query(func.count(distinct(models.Annotation.message_id)))
+        .filter(models.Annotation.chat_room_id == chat_room.id)
+        .scalar()
+    )
     
-    # Build the export structure with enhanced metadata
-    export_data = {
-        "export_metadata": {
-            "chat_room_id": chat_room.id,
-            "chat_room_name": chat_room.name,
-            "project_id": chat_room.project_id,
-            "export_timestamp": datetime.now().isoformat(),
-            "completion_status": completion_status,
-            "completion_percentage": round(completion_percentage, 1),
-            "total_annotators": total_annotators,
-            "completed_annotators": completed_annotators,
-            "total_messages": total_messages,
-            "annotated_messages": annotated_messages,
-            "annotation_coverage": round((annotated_messages / total_messages * 100), 1) if total_messages > 0 else 0
-        },
+    return {
+        "chat_room_id": chat_room.id,
+        "chat_room_name": chat_room.name,
+        "project_id": chat_room.project_id,
+        "export_timestamp": datetime.now().isoformat(),
+        "completion_status": completion_status,
+        "completion_percentage": round(completion_percentage, 1),
+        "total_annotators": total_annotators,
+        "completed_annotators": completed_annotators,
+        "total_messages": total_messages,
+        "annotated_messages": annotated_messages,
+        "annotation_coverage": round((annotated_messages / total_messages * 100), 1) if total_messages > 0 else 0
+    }
+
+def iter_chat_room_export_rows(db: Session, chat_room_id: int) -> Iterator[Tuple[List[tuple], List[tuple]]]:
+    """
+    Read a chat room's export data as plain tuples, one message chunk at a time:
+    (message rows, annotation rows of those messages). Messages are read with a
+    keyset scan in id order and annotations per chunk, ordered by message and
+    annotator, so memory is bounded by the chunk size.
+    
+    Message rows are (id, turn_id, user_id, turn_text, reply_to_turn, created_at);
+    annotation rows are (id, message_id, thread_id, created_at, updated_at, annotator_email).
+    """
+    message_chunks = iter_chat_message_chunks(
+        db,
+        chat_room_id,
+        models.ChatMessage.turn_id,
+        models.ChatMessage.user_id,
+        models.ChatMessage.turn_text,
+        models.ChatMessage.reply_to_turn,
+        models.ChatMessage.created_at
+    )
+    
+    for messages in message_chunks:
+        message_ids = [message.id for message in messages]
+        
+        # Get the annotations for this chunk with annotator information
+        annotation_rows = (
+            db.query(
+                models.Annotation.id,
+                models.Annotation.message_id,
+                models.Annotation.thread_id,
+                models.Annotation.created_at,
+                models.Annotation.updated_at,
+                models.User.email
+            )
+            .join(models.User, models.Annotation.annotator_id == models.User.id)
+            .filter(models.Annotation.message_id.in_(message_ids))
+            .order_by(models.Annotation.message_id, models.Annotation.annotator_id)
+        )
+        yield [tuple(message) for message in messages], [tuple(annotation) for annotation in annotation_rows]
+
+def build_chat_room_export_messages(message_rows: List[tuple], annotation_rows: List[tuple]) -> Iterator[dict]:
+    """
+    Turn rows read by iter_chat_room_export_rows into export message records, each
+    with the annotations of all annotators. Pure function: it also runs in the
+    compute pool (see jobs.render_chat_room_export).
+    """
+    # Group annotations by message ID
+    annotations_by_message = {}
+    for annotation_id, message_id, thread_id, created_at, updated_at, annotator_email in annotation_rows:
+        annotations_by_message.setdefault(message_id, []).append({
+            "id": annotation_id,
+            "thread_id": thread_id,
+            "annotator_email": annotator_email,
+            "created_at": created_at.isoformat(),
+            "updated_at": updated_at.isoformat() if updated_at else None
+        })
+    
+    for message_id, turn_id, user_id, turn_text, reply_to_turn, created_at in message_rows:
+        yield {
+            "id": message_id,
+            "turn_id": turn_id,
+            "user_id": user_id,
+            "turn_text": turn_text,
+            "reply_to_turn": reply_to_turn,
+            "created_at": created_at.isoformat(),
+            "annotations": annotations_by_message.get(message_id, [])
+        }
+
+def iter_chat_room_export_messages(db: Session, chat_room_id: int) -> Iterator[dict]:
+    """
+    Yield export records for a chat room's messages in id order, each with the
+    annotations of all annotators. Memory is bounded by the message scan chunk size.
+    """
+    for message_rows, annotation_rows in iter_chat_room_export_rows(db, chat_room_id):
+        yield from build_chat_room_export_messages(message_rows, annotation_rows)
+
+def iter_chat_room_export_json(db: Session, chat_room_id: int, export_metadata: dict) -> Iterator[str]:
+    """
+    Yield the export document as JSON text fragments: the metadata header first,
+    then one message record at a time. Concatenated, the fragments are the same
+    document export_chat_room_data returns, serialized compactly.
+    """
+    def dumps(value) -> str:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    
+    yield '{"export_metadata":' + dumps(export_metadata) + ',"data":{"messages":['
+    for index, message in enumerate(iter_chat_room_export_messages(db, chat_room_id)):
+        yield ("," if index else "") + dumps(message)
+    yield ']}}'
+
+def export_chat_room_data(db: Session, chat_room_id: int) -> dict:
+    """
+    Export all annotated data from a chat room into a structured format.
+    
+    Returns a dictionary containing:
+    - Chat room metadata
+    - All messages with their annotations from all annotators
+    
+    Args:
+        db: Database session
+        chat_room_id: ID of the chat room to export
+        
+    Returns:
+        Dictionary with the export data structure
+    """
+    # Get chat room
+    chat_room = get_chat_room(db, chat_room_id)
+    if not chat_room:
+        raise HTTPException(status_code=404, detail="Chat room not found")
+    
+    return {
+        "export_metadata": get_chat_room_export_metadata(db, chat_room),
         "data": {
-            "messages": []
+            "messages": list(iter_chat_room_export_messages(db, chat_room_id))
         }
     }
+
+def prepare_chat_room_export(db: Session, chat_room_id: int) -> Tuple[dict, List[tuple], List[tuple]]:
+    """
+    Read what jobs.render_chat_room_export needs to build the export_chat_room_data
+    document: the export metadata plus all message and annotation rows as tuples,
+    which pickle far smaller than the finished document.
     
-    # Add messages with their annotations
-    for message in messages:
-        message_data = {
-            "id": message.id,
-            "turn_id": message.turn_id,
-            "user_id": message.user_id,
-            "turn_text": message.turn_text,
-            "reply_to_turn": message.reply_to_turn,
-            "created_at": message.created_at.isoformat(),
-            "annotations": annotations_by_message.get(message.id, [])
-        }
-        export_data["data"]["messages"].append(message_data)
+    Raises:
+        HTTPException: 404 if the chat room does not exist
+    """
+    chat_room = get_chat_room(db, chat_room_id)
+    if not chat_room:
+        raise HTTPException(status_code=404, detail="Chat room not found")
     
-    return export_data
\ No newline at end of file
+    message_rows, annotation_rows = [], []
+    for messages, annotations in iter_chat_room_export_rows(db, chat_room_id):
+        message_rows.extend(messages)
+        annotation_rows.extend(annotations)
+    return get_chat_room_export_metadata(db, chat_room), message_rows, annotation_rows
+
+
+# BACKGROUND JOBS
+JOB_MAX_ERRORS = 1000  # Errors kept on a job row; the full list is in the job result
+
+def create_job(
+    db: Session,
+    kind: str,
+    project_id: Optional[int] = None,
+    created_by_id: Optional[int] = None
+) -> models.Job:
+    db_job = models.Job(
+        kind=kind,
+        status="pending",
+        project_id=project_id,
+        created_by_id=created_by_id,
+        total_items=0,
+        processed_items=0,
+        errors=[]
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def get_job(db: Session, job_id: int) -> Optional[models.Job]:
+    return db.query(models.Job).filter(models.Job.id == job_id).first()
+
+def start_job(db: Session, job: models.Job, total_items: int) -> None:
+    job.status = "running"
+    job.total_items = total_items
+    job.started_at = datetime.utcnow()
+    db.commit()
+
+def _append_job_errors(job: models.Job, errors: List[str]) -> None:
+    room = JOB_MAX_ERRORS - len(job.errors)
+    if room > 0:
+        # Reassign so the JSON column is flagged as changed
+        job.errors = job.errors + list(errors[:room])
+
+def update_job_progress(db: Session, job: models.Job, processed_items: int, errors: Optional[List[str]] = None) -> None:
+    """Record progress so pollers can follow the job. Commits."""
+    job.processed_items = processed_items
+    if errors:
+        _append_job_errors(job, errors)
+    db.commit()
+
+def finish_job(
+    db: Session,
+    job: models.Job,
+    status: str,
+    result_path: Optional[str] = None,
+    errors: Optional[List[str]] = None,
+    result: Optional[dict] = None
+) -> None:
+    job.status = status
+    job.finished_at = datetime.utcnow()
+    if result_path:
+        job.result_path = result_path
+    if errors:
+        _append_job_errors(job, errors)
+    if result is not None:
+        job.result = result
+    db.commit()
+
+# PROJECT EXPORT
+
+def iter_project_export_records(db: Session, chat_room: models.ChatRoom) -> Iterator[dict]:
+    """
+    Yield one flat training record per message of a chat room: the message fields
+    plus every annotator's thread_id keyed by annotator email.
+    """
+    for message in iter_chat_room_export_messages(db, chat_room.id):
+        yield {
+            "chat_room_id": chat_room.id,
+            "chat_room_name": chat_room.name,
+            "message_id": message["id"],
+            "turn_id": message["turn_id"],
+            "user_id": message["user_id"],
+            "turn_text": message["turn_text"],
+            "reply_to_turn": message["reply_to_turn"],
+            "threads": {
+                annotation["annotator_email"]: annotation["thread_id"]
+                for annotation in message["annotations"]
+            }
+        }
+
@@ -1,18 +1,144 @@
-from sqlalchemy import create_engine
+from typing import AsyncGenerator
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from .config import get_settings
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool, StaticPool
+from .config import Settings, get_settings
 
 settings = get_settings()
 
-# Create SQLite engine with proper configuration
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+POOL_CLASSES = {
+    "queue": QueuePool,
+    "null": NullPool,
+    "static": StaticPool,
+}
+
+# Async driver used for each backend by the AsyncSession stack
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def _sqlite_pragmas(settings: Settings) -> list:
+    """PRAGMA statements of the configured SQLite profile, skipping the ones left at the default."""
+    pragmas = []
+    if settings.SQLITE_JOURNAL_MODE:
+        pragmas.append(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    if settings.SQLITE_SYNCHRONOUS:
+        pragmas.append(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    if settings.SQLITE_BUSY_TIMEOUT_MS:
+        pragmas.append(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    if settings.SQLITE_CACHE_SIZE_KB:
+        # Negative cache_size is in KiB rather than pages
+        pragmas.append(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    if settings.SQLITE_MMAP_SIZE:
+        pragmas.append(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    return pragmas
+
+
+def _resolve_pool_class(database_url: str, settings: Settings):
+    if settings.DB_POOL_CLASS != "auto":
+        try:
+            return POOL_CLASSES[settings.DB_POOL_CLASS]
+        except KeyError:
+            raise ValueError(
+                f"Unknown DB_POOL_CLASS '{settings.DB_POOL_CLASS}'. Expected one of: auto, {', '.join(POOL_CLASSES)}"
+            )
+    
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # Every connection to :memory: is a new empty database, so share a single one
+        return StaticPool
+    return QueuePool
+
+
+def _engine_kwargs(database_url: str, settings: Settings) -> dict:
+    """Pool and connection arguments shared by the sync and async engines."""
+    pool_class = _resolve_pool_class(database_url, settings)
+    engine_kwargs = {"poolclass": pool_class}
+    if pool_class is QueuePool:
+        engine_kwargs.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    
+    if make_url(database_url).get_backend_name() == "sqlite":
+        engine_kwargs["connect_args"] = {"check_same_thread": False}
+    else:
+        engine_kwargs.update(
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    return engine_kwargs
+
+
+def _register_sqlite_pragmas(engine: Engine, settings: Settings) -> None:
+    pragmas = _sqlite_pragmas(settings)
+    
+    @event.listens_for(engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Swap the DBAPI driver of a database URL for its async counterpart (e.g. sqlite -> sqlite+aiosqlite)."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def create_db_engine(database_url: str, settings: Settings = settings) -> Engine:
+    """
+    Create the application engine from the engine profile in Settings.
+    
+    For SQLite the configured pragmas are applied on every new DBAPI connection.
+    For server databases (PostgreSQL) pooled connections are pinged on checkout
+    and recycled periodically, so several workers can share one database safely.
+    """
+    engine = create_engine(database_url, **_engine_kwargs(database_url, settings))
+    if make_url(database_url).get_backend_name() == "sqlite":
+        _register_sqlite_pragmas(engine, settings)
+    return engine
+
+
+def create_async_db_engine(database_url: str, settings: Settings = settings) -> AsyncEngine:
+    """
+    Create the async engine (aiosqlite / asyncpg) for the same database and
+    with the same profile as create_db_engine.
+    """
+    engine_kwargs = _engine_kwargs(database_url, settings)
+    if engine_kwargs["poolclass"] is QueuePool:
+        engine_kwargs["poolclass"] = AsyncAdaptedQueuePool
+    
+    engine = create_async_engine(get_async_database_url(database_url), **engine_kwargs)
+    if make_url(database_url).get_backend_name() == "sqlite":
+        # aiosqlite exposes the sqlite3-compatible cursor API to sync engine events
+        _register_sqlite_pragmas(engine.sync_engine, settings)
+    return engine
+
+
+# Create engine with the configured profile
+engine = create_db_engine(settings.SQLALCHEMY_DATABASE_URL)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session factory for handlers that await their queries.
+# expire_on_commit=False: attributes cannot be lazy-loaded after commit in async code
+async_engine = create_async_db_engine(settings.SQLALCHEMY_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Create base class for declarative models
 Base = declarative_base()
 
@@ -22,4 +148,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# Dependency to get an async database session
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,46 +1,11 @@
-from typing import Generator
-
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .database import SessionLocal
-from .config import get_settings
-from .models import User, ProjectAssignment
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
-
-def get_db() -> Generator:
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-async def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(
-            token, get_settings().SECRET_KEY, algorithms=[get_settings().ALGORITHM]
-        )
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
-        raise credentials_exception
-    return user
+from .database import get_db, get_async_db
+from .auth import get_current_user, get_current_user_async
+from .models import User
+from . import crud, async_crud, principal_cache
 
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
@@ -59,7 +24,17 @@ async def get_current_admin_user(
         )
     return current_user
 
-async def verify_project_access(
+def _require_assignment(is_assigned: bool) -> None:
+    if not is_assigned:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this project"
+        )
+
+# Like the current-user dependencies in auth.py, project access has a sync variant
+# for routes on get_db and an async one for routes on get_async_db.
+
+def verify_project_access(
     project_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -70,15 +45,23 @@ async def verify_project_access(
         return
 
     # Check if the user is assigned to the project
-    assignment = db.query(ProjectAssignment).filter(
-        ProjectAssignment.user_id == current_user.id,
-        ProjectAssignment.project_id == project_id
-    ).first()
+    is_assigned = principal_cache.get_cached_assignment(current_user.id, project_id)
+    if is_assigned is None:
+        is_assigned = crud.is_user_assigned_to_project(db, current_user.id, project_id)
+        principal_cache.cache_assignment(current_user.id, project_id, is_assigned)
+    _require_assignment(is_assigned)
 
-    if not assignment:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this project"
-        )
-    # If assignment exists, user has access
-    return 
\ No newline at end of file
+async def verify_project_access_async(
+    project_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """verify_project_access for async routes."""
+    if current_user.is_admin:
+        return
+
+    is_assigned = principal_cache.get_cached_assignment(current_user.id, project_id)
+    if is_assigned is None:
+        is_assigned = await async_crud.is_user_assigned_to_project(db, current_user.id, project_id)
+        principal_cache.cache_assignment(current_user.id, project_id, is_assigned)
+    _require_assignment(is_assigned)
@@ -0,0 +1,233 @@
+"""
+Background job runners and compute pool tasks.
+
+Each runner is started with FastAPI's BackgroundTasks after the request that
+created the Job row has returned. Runners open their own database session and
+report progress on the Job row, which clients poll through GET /admin/jobs/{id}.
+
+Import jobs read an upload spooled to IMPORT_DIR by the request handler and
+commit every chunk together with its progress update, so a failed job keeps the
+chunks processed before the failure (re-running the import skips them).
+
+Compute pool tasks run in worker processes (see compute_pool.py): they take
+plain values and return plain values. They never open a session; the caller
+reads what they need in its own request session first.
+"""
+import json
+import logging
+import os
+import zipfile
+from datetime import datetime
+from typing import Callable
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from . import crud, models, schemas
+from .config import get_settings
+from .database import SessionLocal
+from .utils.csv_utils import iter_chat_message_batches, iter_annotation_batches
+
+logger = logging.getLogger(__name__)
+
+
+def run_project_export_job(job_id: int) -> None:
+    """
+    Export every chat room of a project into a single zip archive:
+    - chat_rooms/<chat_room_id>.ndjson: one record per message with all annotators' thread_ids
+    - manifest.json: project info and per-room export metadata
+    
+    Rooms are streamed one after another, so memory stays bounded by the
+    message scan chunk size regardless of project size.
+    """
+    db = SessionLocal()
+    job = None
+    partial_path = None
+    try:
+        job = crud.get_job(db, job_id)
+        if not job:
+            logger.error(f"Export job {job_id} not found")
+            return
+        
+        project = crud.get_project(db, job.project_id)
+        if not project:
+            crud.finish_job(db, job, "failed", errors=[f"Project {job.project_id} not found"])
+            return
+        
+        chat_rooms = (
+            db.query(models.ChatRoom)
+            .filter(models.ChatRoom.project_id == project.id)
+            .order_by(models.ChatRoom.id)
+            .all()
+        )
+        crud.start_job(db, job, total_items=len(chat_rooms))
+        
+        export_dir = get_settings().EXPORT_DIR
+        os.makedirs(export_dir, exist_ok=True)
+        archive_path = os.path.join(export_dir, f"project_{project.id}_export_job_{job.id}.zip")
+        partial_path = archive_path + ".partial"
+        
+        manifest = {
+            "project_id": project.id,
+            "project_name": project.name,
+            "export_timestamp": datetime.now().isoformat(),
+            "format": "ndjson",
+            "chat_rooms": []
+        }
+        
+        with zipfile.ZipFile(partial_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for processed, chat_room in enumerate(chat_rooms, start=1):
+                shard_name = f"chat_rooms/{chat_room.id}.ndjson"
+                with archive.open(shard_name, "w") as shard:
+                    for record in crud.iter_project_export_records(db, chat_room):
+                        shard.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+                
+                room_metadata = crud.get_chat_room_export_metadata(db, chat_room)
+                room_metadata["file"] = shard_name
+                manifest["chat_rooms"].append(room_metadata)
+                
+                crud.update_job_progress(db, job, processed_items=processed)
+            
+            archive.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+        
+        os.replace(partial_path, archive_path)
+        crud.finish_job(db, job, "completed", result_path=archive_path)
+        
+    except Exception as e:
+        logger.exception(f"Export job {job_id} failed")
+        db.rollback()
+        if partial_path is not None and os.path.exists(partial_path):
+            os.remove(partial_path)
+        if job is not None:
+            crud.finish_job(db, job, "failed", errors=[str(e)])
+    finally:
+        db.close()
+
+
+# IMPORT JOBS
+
+def _run_import_job(
+    job_id: int,
+    upload_path: str,
+    work: Callable[[Session, models.Job, crud.ProgressCallback], BaseModel]
+) -> None:
+    """
+    Run an import job: work(db, job, progress) sets the job's total_items,
+    processes the spooled upload calling progress after every chunk, and returns
+    the import response that is stored as the job result. The upload is deleted
+    afterwards, whatever the outcome.
+    """
+    db = SessionLocal()
+    job = None
+    try:
+        job = crud.get_job(db, job_id)
+        if not job:
+            logger.error(f"Import job {job_id} not found")
+            return
+        
+        # Running from here on; work() sets total_items once it has read the upload
+        crud.start_job(db, job, total_items=0)
+        
+        def progress(processed_items: int, errors: list) -> None:
+            crud.update_job_progress(db, job, processed_items=processed_items, errors=errors)
+        
+        response = work(db, job, progress)
+        crud.finish_job(db, job, "completed", result=response.model_dump(mode="json"))
+        
+    except Exception as e:
+        logger.exception(f"Import job {job_id} failed")
+        db.rollback()
+        if job is not None:
+            crud.finish_job(db, job, "failed", errors=[str(e)])
+    finally:
+        db.close()
+        if os.path.exists(upload_path):
+            os.remove(upload_path)
+
+def _count_upload_rows(upload_path: str, iter_batches: Callable) -> int:
+    """
+    Rows an import of the spooled CSV will process, counted in a first pass with
+    the same batch parser, so total_items is exact before the first chunk is imported.
+    """
+    with open(upload_path, "rb") as upload:
+        return sum(len(batch) for batch in iter_batches(upload))
+
+def run_chat_room_csv_import_job(job_id: int, chat_room_id: int, upload_path: str) -> None:
+    """Import chat messages from a spooled CSV upload into an existing chat room."""
+    def work(db: Session, job: models.Job, progress: crud.ProgressCallback) -> schemas.ChatRoomImportResponse:
+        chat_room = crud.get_chat_room(db, chat_room_id)
+        if not chat_room:
+            raise ValueError(f"Chat room {chat_room_id} no longer exists")
+        
+        crud.start_job(db, job, total_items=_count_upload_rows(upload_path, iter_chat_message_batches))
+        with open(upload_path, "rb") as upload:
+            import_details = crud.import_chat_message_batches(
+                db, chat_room_id=chat_room_id, batches=iter_chat_message_batches(upload), progress=progress
+            )
+        return schemas.ChatRoomImportResponse(chat_room=chat_room, import_details=import_details)
+    
+    _run_import_job(job_id, upload_path, work)
+
+def run_annotation_csv_import_job(job_id: int, chat_room_id: int, user_id: int, upload_path: str) -> None:
+    """Import one annotator's annotations from a spooled CSV upload."""
+    def work(db: Session, job: models.Job, progress: crud.ProgressCallback) -> schemas.AnnotationImportResponse:
+        chat_room = crud.get_chat_room(db, chat_room_id)
+        user = crud.get_user(db, user_id)
+        if not chat_room or not user:
+            raise ValueError("Chat room or user no longer exists")
+        
+        crud.start_job(db, job, total_items=_count_upload_rows(upload_path, iter_annotation_batches))
+        with open(upload_path, "rb") as upload:
+            return crud.import_annotation_batches(
+                db, chat_room=chat_room, annotator=user, batches=iter_annotation_batches(upload), progress=progress
+            )
+    
+    _run_import_job(job_id, upload_path, work)
+
+def run_batch_annotation_import_job(job_id: int, chat_room_id: int, upload_path: str) -> None:
+    """Import a spooled batch annotation JSON file (several annotators) into a chat room."""
+    def work(db: Session, job: models.Job, progress: crud.ProgressCallback) -> schemas.BatchAnnotationImportResponse:
+        chat_room = crud.get_chat_room(db, chat_room_id)
+        if not chat_room:
+            raise ValueError(f"Chat room {chat_room_id} no longer exists")
+        
+        with open(upload_path, "rb") as upload:
+            batch_data = schemas.BatchAnnotationImport(**json.load(upload))
+        
+        if batch_data.batch_metadata.chat_room_id != chat_room_id:
+            raise ValueError(
+                f"Chat room ID mismatch: JSON contains {batch_data.batch_metadata.chat_room_id}, but the job imports into {chat_room_id}"
+            )
+        if batch_data.batch_metadata.project_id != chat_room.project_id:
+            raise ValueError(
+                f"Project ID mismatch: JSON contains {batch_data.batch_metadata.project_id}, but chat room belongs to project {chat_room.project_id}"
+            )
+        
+        crud.start_job(db, job, total_items=sum(len(a.annotations) for a in batch_data.annotators))
+        return crud.import_batch_annotations_for_chat_room(
+            db, chat_room_id=chat_room_id, project_id=chat_room.project_id, batch_data=batch_data, progress=progress
+        )
+    
+    _run_import_job(job_id, upload_path, work)
+
+
+# COMPUTE POOL TASKS
+
+def render_chat_room_export(export_metadata: dict, message_rows: list, annotation_rows: list) -> bytes:
+    """
+    Build a chat room's export document (see crud.export_chat_room_data) from the
+    rows read by crud.prepare_chat_room_export and encode it the way JSONResponse does.
+    """
+    export_data = {
+        "export_metadata": export_metadata,
+        "data": {
+            "messages": list(crud.build_chat_room_export_messages(message_rows, annotation_rows))
+        }
+    }
+    return json.dumps(
+        export_data,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode("utf-8")
@@ -7,8 +7,9 @@ from sqlalchemy import select
 from .config import get_settings
 from .database import engine, Base, SessionLocal
 from .models import User
-from .api import auth, admin, projects, message_annotation_router, project_annotation_router
+from .api import auth, admin, projects, message_annotation_router, project_annotation_router, chat_room_annotation_router
 from .auth import get_password_hash
+from .compute_pool import compute_pool
 
 # Configure logging
 logging.basicConfig(
@@ -68,6 +69,7 @@ app.include_router(admin.router, prefix="/admin", tags=["admin"])
 app.include_router(projects.router, prefix="/projects", tags=["projects"])
 app.include_router(message_annotation_router, tags=["annotations"])
 app.include_router(project_annotation_router, tags=["annotations"])
+app.include_router(chat_room_annotation_router, tags=["annotations"])
 
 @app.on_event("startup")
 def startup_event():
@@ -75,6 +77,11 @@ def startup_event():
     # init_db()  # Removed: Schema managed by Alembic migrations
     create_first_admin()
 
+@app.on_event("shutdown")
+def shutdown_event():
+    """Stop the compute pool worker processes."""
+    compute_pool.shutdown()
+
 @app.get("/")
 def root():
     """Root endpoint that returns API information."""
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, UniqueConstraint, Index
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, UniqueConstraint, Index, JSON
 from sqlalchemy.orm import relationship, declarative_base, Mapped, mapped_column
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -57,10 +57,14 @@ class ChatRoom(Base):
     project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Watermark bumped by every write that can change the room's IAA analysis
+    annotation_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     project = relationship("Project", back_populates="chat_rooms")
     messages = relationship("ChatMessage", back_populates="chat_room", cascade="all, delete-orphan")
+    iaa_cache = relationship("ChatRoomIAACache", back_populates="chat_room", cascade="all, delete-orphan", uselist=False)
+    pair_counts = relationship("AnnotationPairCount", back_populates="chat_room", cascade="all, delete-orphan")
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
@@ -80,9 +84,10 @@ class ChatMessage(Base):
     
     # Indexes and constraints
     __table_args__ = (
-        Index('ix_chat_messages_chatroom_turn', 'chat_room_id', 'turn_id'),
         Index('ix_chat_messages_chatroom_reply', 'chat_room_id', 'reply_to_turn'),
-        UniqueConstraint('chat_room_id', 'turn_id', name='uix_chatroom_turn'),
+        Index('ix_chat_messages_chatroom_id', 'chat_room_id', 'id'),  # Keyset pagination / room scans
+        Index('ix_chat_messages_chatroom_created', 'chat_room_id', 'created_at', 'id'),  # Room messages in created_at order
+        UniqueConstraint('chat_room_id', 'turn_id', name='uix_chatroom_turn'),  # Also serves (chat_room_id, turn_id) lookups
     )
 
 class Annotation(Base):
@@ -90,6 +95,7 @@ class Annotation(Base):
     
     id: Mapped[int] = mapped_column(primary_key=True)
     message_id: Mapped[int] = mapped_column(ForeignKey("chat_messages.id", ondelete="CASCADE"))
+    chat_room_id: Mapped[int] = mapped_column(ForeignKey("chat_rooms.id", ondelete="CASCADE"))  # Denormalized from the message, for join-free room queries
     annotator_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"))
     thread_id: Mapped[str] = mapped_column(String)  # Thread identifier
@@ -103,7 +109,58 @@ class Annotation(Base):
     
     # Indexes and constraints
     __table_args__ = (
-        Index('ix_annotations_message_annotator', 'message_id', 'annotator_id'),
-        Index('ix_annotations_thread', 'thread_id'),
-        UniqueConstraint('message_id', 'annotator_id', name='uix_message_annotator'),
-    ) 
\ No newline at end of file
+        Index('ix_annotations_chatroom_annotator', 'chat_room_id', 'annotator_id', 'thread_id', 'message_id'),  # Room reads and thread operations
+        Index('ix_annotations_annotator_thread', 'annotator_id', 'thread_id', 'message_id'),  # An annotator's annotations across rooms
+        Index('ix_annotations_project_annotator', 'project_id', 'annotator_id', 'created_at'),  # An annotator's annotations in a project
+        UniqueConstraint('message_id', 'annotator_id', name='uix_message_annotator'),  # Also serves message and (message, annotator) lookups
+    ) 
+
+class ChatRoomIAACache(Base):
+    __tablename__ = "chat_room_iaa_cache"
+    
+    chat_room_id: Mapped[int] = mapped_column(ForeignKey("chat_rooms.id", ondelete="CASCADE"), primary_key=True)
+    annotation_version: Mapped[int] = mapped_column(Integer, nullable=False)  # ChatRoom.annotation_version the result was computed at
+    result_json: Mapped[str] = mapped_column(Text, nullable=False)  # Serialized schemas.ChatRoomIAA
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    chat_room = relationship("ChatRoom", back_populates="iaa_cache")
+
+class AnnotationPairCount(Base):
+    """
+    Materialized contingency counts between annotators of a chat room.
+    
+    Each row counts the messages that annotator_1 labelled thread_1 and annotator_2
+    labelled thread_2 (annotator_1_id <= annotator_2_id). Self pairs
+    (annotator_1_id == annotator_2_id) hold each annotator's own label histogram.
+    Kept up to date by crud.update_pair_counts on every annotation write.
+    """
+    __tablename__ = "annotation_pair_counts"
+    
+    chat_room_id: Mapped[int] = mapped_column(ForeignKey("chat_rooms.id", ondelete="CASCADE"), primary_key=True)
+    annotator_1_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    annotator_2_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    thread_1: Mapped[str] = mapped_column(String, primary_key=True)
+    thread_2: Mapped[str] = mapped_column(String, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    
+    # Relationships
+    chat_room = relationship("ChatRoom", back_populates="pair_counts")
+
+class Job(Base):
+    """A long-running admin task (e.g. a project export or an import) processed by a background worker."""
+    __tablename__ = "jobs"
+    
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    kind: Mapped[str] = mapped_column(String, nullable=False)  # e.g. "project_export"
+    status: Mapped[str] = mapped_column(String, nullable=False, default="pending")  # pending, running, completed, failed
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"), nullable=True)
+    created_by_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    total_items: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    processed_items: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    errors: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+    result_path: Mapped[str] = mapped_column(String, nullable=True)  # Output file for jobs that produce one
+    result: Mapped[dict] = mapped_column(JSON, nullable=True)  # Final summary for jobs that return one (e.g. imports)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,129 @@
+"""
+In-process caches for request authentication.
+
+get_current_user and verify_project_access run on every authenticated request.
+These caches turn their database lookups into dict lookups:
+- principals: token subject (email) -> Principal, the column values of the User row
+- assignments: (user_id, project_id) -> whether the user is assigned to the project
+
+Entries expire after AUTH_CACHE_TTL_SECONDS and the least recently used ones are
+evicted beyond AUTH_CACHE_MAX_ENTRIES. Writes that change a principal or an
+assignment invalidate the affected entries explicitly; the TTL bounds how stale
+another worker process can be, since invalidation is per process.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Hashable, Optional
+
+from .config import get_settings
+from .models import User
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries expire after a fixed time-to-live."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return  # Caching disabled
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_where(self, predicate) -> None:
+        """Remove every entry whose key matches the predicate."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_settings = get_settings()
+principal_cache = TTLCache(_settings.AUTH_CACHE_TTL_SECONDS, _settings.AUTH_CACHE_MAX_ENTRIES)
+assignment_cache = TTLCache(_settings.AUTH_CACHE_TTL_SECONDS, _settings.AUTH_CACHE_MAX_ENTRIES)
+
+
+# PRINCIPALS
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Column values of a User row, as returned by the current-user dependencies.
+    A plain immutable value rather than an ORM instance, so a cached principal is
+    never tied to (or lazy-loads through) the session that loaded it.
+    """
+    id: int
+    email: str
+    hashed_password: str
+    is_admin: bool
+    created_at: datetime
+
+def get_cached_user(email: str) -> Optional[Principal]:
+    return principal_cache.get(email)
+
+def cache_user(user: User) -> Principal:
+    """Cache the user's column values under their email and return them."""
+    principal = Principal(
+        id=user.id,
+        email=user.email,
+        hashed_password=user.hashed_password,
+        is_admin=user.is_admin,
+        created_at=user.created_at
+    )
+    principal_cache.set(user.email, principal)
+    return principal
+
+
+# PROJECT ASSIGNMENTS
+
+def get_cached_assignment(user_id: int, project_id: int) -> Optional[bool]:
+    return assignment_cache.get((user_id, project_id))
+
+def cache_assignment(user_id: int, project_id: int, is_assigned: bool) -> None:
+    assignment_cache.set((user_id, project_id), is_assigned)
+
+
+# INVALIDATION
+
+def invalidate_user(user_id: int, email: str) -> None:
+    """Drop a user's principal and all of their assignment entries."""
+    principal_cache.pop(email)
+    assignment_cache.discard_where(lambda key: key[0] == user_id)
+
+def invalidate_assignment(user_id: int, project_id: int) -> None:
+    assignment_cache.pop((user_id, project_id))
+
+def invalidate_project(project_id: int) -> None:
+    """Drop every assignment entry of a project (e.g. when it is deleted)."""
+    assignment_cache.discard_where(lambda key: key[1] == project_id)
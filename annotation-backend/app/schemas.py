@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Any, Dict, Literal, Optional, List
 from datetime import datetime
 
 # User Schemas
@@ -79,6 +79,29 @@ class ChatMessage(ChatMessageBase):
 class MessageList(BaseModel):
     messages: List[ChatMessage]
 
+class ChatMessagePage(BaseModel):
+    """One keyset page of a chat room's messages, ordered by id"""
+    messages: List[ChatMessage]
+    next_cursor: Optional[int] = None  # Pass as ?cursor= to get the next page; None on the last page
+    # Room totals: only on the first page (no cursor) or with include_totals=true, so deeper pages stay constant-cost
+    total_messages: Optional[int] = None
+    annotated_by_me: Optional[int] = None  # Messages in the room the caller has annotated
+
+class ChatRoomSnapshot(BaseModel):
+    """
+    All messages of a chat room plus the caller's annotations, as parallel arrays:
+    index i of every list describes the i-th message (messages ordered by id).
+    """
+    chat_room_id: int
+    version: int  # ChatRoom.annotation_version the snapshot was taken at (also in the ETag)
+    message_ids: List[int]
+    turn_ids: List[str]
+    user_ids: List[str]
+    turn_texts: List[str]
+    reply_to_turns: List[Optional[str]]
+    thread_ids: List[Optional[str]]  # Caller's thread for the message; None if not annotated
+    annotation_ids: List[Optional[int]]  # Caller's annotation id (for deletes); None if not annotated
+
 # Annotation Schemas
 class AnnotationBase(BaseModel):
     message_id: int
@@ -101,6 +124,46 @@ class Annotation(AnnotationBase):
 class AnnotationList(BaseModel):
     annotations: List[Annotation]
 
+# Batch annotation writes (one room, one request)
+ANNOTATION_BATCH_MAX_ITEMS = 1000
+
+class AnnotationBatchCreate(BaseModel):
+    annotations: List[AnnotationBase] = Field(..., min_length=1, max_length=ANNOTATION_BATCH_MAX_ITEMS)
+
+class AnnotationBatchItemResult(BaseModel):
+    message_id: int
+    thread_id: str
+    status: Literal["created", "updated", "unchanged", "error"]
+    annotation_id: Optional[int] = None
+    error: Optional[str] = None
+
+class AnnotationBatchResponse(BaseModel):
+    chat_room_id: int
+    created: int
+    updated: int
+    unchanged: int
+    failed: int
+    results: List[AnnotationBatchItemResult]  # Same order as the request
+
+# Thread operations (one annotator's thread within one room)
+class ThreadRename(BaseModel):
+    thread_id: str
+    new_thread_id: str = Field(..., min_length=1, max_length=50)
+
+class ThreadMerge(BaseModel):
+    thread_id: str  # Merged away
+    target_thread_id: str  # Receives the messages
+
+class ThreadSplit(BaseModel):
+    thread_id: str
+    message_id: int  # First message of the new thread; later messages of the thread follow it
+    new_thread_id: str = Field(..., min_length=1, max_length=50)
+
+class ThreadOperationResponse(BaseModel):
+    chat_room_id: int
+    thread_id: str  # Thread the messages were moved to
+    updated_count: int
+
 # Authentication Schemas
 class Token(BaseModel):
     access_token: str
@@ -205,6 +268,35 @@ class BatchAnnotationImportResponse(BaseModel):
     results: List[BatchAnnotationResult]
     global_errors: List[str] = []
 
+# WORKBOOK IMPORT SCHEMAS (EXCEL IMPORT TOOL)
+
+class WorkbookChatRoom(BaseModel):
+    name: str
+    description: Optional[str] = None
+
+class WorkbookAnnotator(BaseModel):
+    annotator_email: EmailStr
+    annotator_name: str
+    password: Optional[str] = None  # Only used if the user has to be created
+    annotations: List[BatchAnnotationItem]  # The annotator's thread column
+
+class WorkbookImport(BaseModel):
+    """A whole Excel workbook: room metadata, messages and one entry per annotator sheet"""
+    chat_room: WorkbookChatRoom
+    messages: List[ChatMessageCreate]
+    annotators: List[WorkbookAnnotator]
+
+class WorkbookImportResponse(BaseModel):
+    message: str = "Workbook import completed"
+    chat_room: ChatRoom
+    import_details: CSVImportResponse
+    users_created: List[str] = []
+    users_assigned: int
+    total_annotations_processed: int
+    total_imported: int
+    total_skipped: int
+    results: List[BatchAnnotationResult]
+
 # PHASE 5: INTER-ANNOTATOR AGREEMENT (IAA) SCHEMAS
 
 class PairwiseAccuracy(BaseModel):
@@ -234,4 +326,38 @@ class ChatRoomIAA(BaseModel):
     pending_annotators: List[AnnotatorInfo]
     
     # Calculation is now based on completed_annotators
-    pairwise_accuracies: List[PairwiseAccuracy] 
\ No newline at end of file
+    pairwise_accuracies: List[PairwiseAccuracy] 
+
+# BACKGROUND JOB SCHEMAS
+
+class Job(BaseModel):
+    """Progress of a background job."""
+    id: int
+    kind: str
+    status: str  # "pending", "running", "completed", "failed"
+    project_id: Optional[int] = None
+    total_items: int
+    processed_items: int
+    errors: List[str] = []
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    items_per_second: Optional[float] = None
+    download_url: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None  # Import response once an import job has completed
+
+    class Config:
+        from_attributes = True
+
+# COMPUTE POOL SCHEMAS
+
+class ComputePoolMetrics(BaseModel):
+    """Concurrency limits and load of the process pool running IAA and export work"""
+    max_workers: int
+    max_queue: int
+    running: int
+    queued: int
+    completed: int
+    failed: int
+    rejected: int
+
@@ -1,212 +1,163 @@
 import csv
-import pandas as pd
-from typing import List, Dict, Any
+import io
+from typing import List, Dict, Any, BinaryIO, Callable, Iterator, Optional, Tuple
 
-def import_chat_messages(file_path: str) -> List[Dict[str, Any]]:
-    """
-    Import chat messages from a CSV file, only caring about specific required columns.
-    Returns a list of dictionaries with the required fields.
+# STREAMING CSV INGESTION
+# Uploads (e.g. UploadFile.file) are read incrementally with the csv module, so a
+# file is never written to disk, parsed twice, or held in memory as a whole. Rows
+# are yielded in bounded batches.
+
+CSV_BATCH_SIZE = 5000
+
+MESSAGE_REQUIRED_COLUMNS = ['turn_id', 'user_id', 'turn_text']
+ANNOTATION_THREAD_COLUMNS = ['thread_id', 'thread_column', 'thread']
+
+def _read_csv_header(rows: Iterator[List[str]]) -> List[str]:
+    """Read the header row and return the lowercased column names."""
+    try:
+        header = next(rows)
+    except StopIteration:
+        raise ValueError("CSV file is empty")
+    except (csv.Error, UnicodeDecodeError):
+        raise ValueError("File is not a valid CSV format")
     
-    Required columns (case insensitive):
-    - turn_id: Unique identifier for the message
-    - user_id: ID of the user who sent the message
-    - turn_text: The message content
-    - reply_to_turn (optional): ID of the message this is replying to
-    """
+    header = [column.strip().lower() for column in header]
+    if not any(header):
+        raise ValueError("CSV file is empty")
+    return header
+
+def _clean_cell(value: Optional[str]) -> Optional[str]:
+    """Strip a cell and map empty/NaN-like values to None."""
+    if value is None:
+        return None
+    value = value.strip()
+    if value in ('', 'nan', 'NaN', 'None'):
+        return None
+    return value
+
+def _clean_user_id(value: Optional[str]) -> Optional[str]:
+    """Normalize numeric user ids (e.g. '12.0' -> '12'); keep other ids as-is."""
+    value = _clean_cell(value)
+    if value is None:
+        return None
     try:
-        # Read CSV with pandas with proper quoting settings
-        df = pd.read_csv(
-            file_path,
-            quoting=csv.QUOTE_MINIMAL,  # Handle quoted fields
-            escapechar='\\',  # Allow escaping of quotes
-            encoding='utf-8',  # Ensure proper UTF-8 encoding
-            on_bad_lines='skip'  # Skip problematic lines
-        )
-        
-        # Convert column names to lowercase for case-insensitive matching
-        df.columns = df.columns.str.lower()
-        
-        # Check required columns
-        required_columns = ['turn_id', 'user_id', 'turn_text']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
-        
-        # Select only the columns we care about
-        columns_to_use = required_columns + (['reply_to_turn'] if 'reply_to_turn' in df.columns else [])
-        df = df[columns_to_use]
-        
-        # Clean up the data
-        # Handle user_id first - convert to integer then string to remove decimal points
-        df['user_id'] = df['user_id'].apply(lambda x: str(int(float(x))) if pd.notna(x) else None)
-        
-        # Convert other fields to strings and strip whitespace
-        for col in ['turn_id', 'turn_text']:
-            df[col] = df[col].apply(lambda x: str(x).strip() if pd.notna(x) else None)
-        
-        # Handle reply_to_turn separately since it's optional
-        if 'reply_to_turn' in df.columns:
-            df['reply_to_turn'] = df['reply_to_turn'].apply(
-                lambda x: str(x).strip() if pd.notna(x) and str(x).strip() not in ['nan', 'None', ''] else None
-            )
-        
-        # Remove any rows where required fields are None
-        df = df.dropna(subset=required_columns)
-        
-        # Convert to list of dictionaries
-        messages = df.to_dict('records')
-        
-        # Print first few messages for debugging
-        print(f"Successfully parsed {len(messages)} messages")
-        if messages:
-            print("First message:", messages[0])
-        
-        return messages
-        
-    except Exception as e:
-        raise Exception(f"Error importing CSV: {str(e)}")
+        return str(int(float(value)))
+    except ValueError:
+        return value
 
-def validate_csv_format(file_path: str) -> bool:
+def _open_csv_records(binary_file: BinaryIO, header_check: Callable[[List[str]], None]) -> Tuple[List[str], Iterator[Dict[str, str]]]:
     """
-    Validate that a file is a properly formatted CSV with the required columns.
-    Returns True if valid, raises ValueError with description if invalid.
+    Read and validate the header of a binary CSV stream eagerly, then return it
+    together with a lazy iterator of one dict per well-formed row.
+    
+    The text wrapper pulls the underlying file in small buffered chunks, so only
+    the current row is ever decoded in memory.
     """
+    text_stream = io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+    rows = csv.reader(text_stream, quoting=csv.QUOTE_MINIMAL, escapechar='\\')
     try:
-        # Try to read first few rows to validate format
-        df = pd.read_csv(
-            file_path,
-            nrows=5,
-            quoting=csv.QUOTE_MINIMAL,
-            escapechar='\\',
-            encoding='utf-8',
-            on_bad_lines='skip'
-        )
-        
-        # Convert column names to lowercase
-        df.columns = df.columns.str.lower()
-        
-        # Check required columns
-        required_columns = ['turn_id', 'user_id', 'turn_text']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            raise ValueError(f"CSV is missing required columns: {', '.join(missing_columns)}")
-            
-        return True
-        
-    except pd.errors.EmptyDataError:
-        raise ValueError("CSV file is empty")
-    except pd.errors.ParserError:
-        raise ValueError("File is not a valid CSV format")
-    except Exception as e:
-        raise ValueError(f"Error validating CSV: {str(e)}")
+        header = _read_csv_header(rows)
+        header_check(header)
+    except Exception:
+        text_stream.detach()
+        raise
+    
+    def records() -> Iterator[Dict[str, str]]:
+        try:
+            for row in rows:
+                # Mirror pandas on_bad_lines='skip': drop rows with extra fields
+                if len(row) > len(header) or not any(row):
+                    continue
+                yield dict(zip(header, row))
+        except csv.Error as e:
+            raise ValueError(f"File is not a valid CSV format: {str(e)}")
+        except UnicodeDecodeError:
+            raise ValueError("CSV file must be UTF-8 encoded")
+        finally:
+            # Leave the caller's file object open
+            text_stream.detach()
+    
+    return header, records()
+
+def _batched(records: Iterator[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _check_message_header(header: List[str]) -> None:
+    missing_columns = [col for col in MESSAGE_REQUIRED_COLUMNS if col not in header]
+    if missing_columns:
+        raise ValueError(f"CSV is missing required columns: {', '.join(missing_columns)}")
+
+def _find_thread_column(header: List[str]) -> Optional[str]:
+    return next((col for col in ANNOTATION_THREAD_COLUMNS if col in header), None)
 
-# PHASE 2: ANNOTATION IMPORT UTILITIES
+def _check_annotation_header(header: List[str]) -> None:
+    if 'turn_id' not in header:
+        raise ValueError("CSV is missing required column: turn_id")
+    if not _find_thread_column(header):
+        raise ValueError(f"CSV is missing a thread column. Expected one of: {', '.join(ANNOTATION_THREAD_COLUMNS)}")
 
-def import_annotations_from_csv(file_path: str) -> List[Dict[str, Any]]:
+def iter_chat_message_batches(binary_file: BinaryIO, batch_size: int = CSV_BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
     """
-    Import annotations from a CSV file containing turn_id and thread_id columns.
-    This is used for importing pre-existing annotation data.
+    Stream chat messages from a CSV upload in batches of at most batch_size rows.
     
-    Required columns (case insensitive):
-    - turn_id: Unique identifier for the message
-    - thread_id (or thread_column): The thread assignment for the message
+    The file must be UTF-8 (a leading BOM is ignored). Header names are stripped
+    and lowercased; turn_id, user_id and turn_text are required, reply_to_turn is
+    optional and other columns are ignored. The header is validated immediately
+    (raising ValueError for missing columns), before any row is read.
     
-    Returns a list of dictionaries with 'turn_id' and 'thread_id'.
+    Rows:
+    - Rows with more fields than the header, and blank rows, are skipped.
+    - Short rows are padded with None for the missing columns.
+    - Cells are stripped, and '', 'nan', 'NaN' and 'None' read as missing.
+    - Numeric user_ids are normalized ('12.0' -> '12'); turn_ids are kept as text.
+    - Rows missing turn_id, user_id or turn_text are skipped.
     """
-    try:
-        # Read CSV with pandas
-        df = pd.read_csv(
-            file_path,
-            quoting=csv.QUOTE_MINIMAL,
-            escapechar='\\',
-            encoding='utf-8',
-            on_bad_lines='skip'
-        )
-        
-        # Convert column names to lowercase for case-insensitive matching
-        df.columns = df.columns.str.lower()
-        
-        # Check for thread column (could be named 'thread_id' or 'thread_column')
-        thread_column = None
-        if 'thread_id' in df.columns:
-            thread_column = 'thread_id'
-        elif 'thread_column' in df.columns:
-            thread_column = 'thread_column'
-        elif 'thread' in df.columns:
-            thread_column = 'thread'
-        
-        if not thread_column:
-            raise ValueError("CSV must contain a thread column (thread_id, thread_column, or thread)")
-        
-        # Check for turn_id column
-        if 'turn_id' not in df.columns:
-            raise ValueError("CSV must contain a turn_id column")
-        
-        # Select only the columns we need
-        df = df[['turn_id', thread_column]]
-        
-        # Clean up the data
-        df['turn_id'] = df['turn_id'].apply(lambda x: str(x).strip() if pd.notna(x) else None)
-        df['thread_id'] = df[thread_column].apply(lambda x: str(x).strip() if pd.notna(x) else None)
-        
-        # Remove any rows where required fields are None or empty
-        df = df.dropna(subset=['turn_id', 'thread_id'])
-        df = df[df['thread_id'] != '']
-        
-        # Convert to list of dictionaries with standardized column names
-        annotations = []
-        for _, row in df.iterrows():
-            annotations.append({
-                'turn_id': row['turn_id'],
-                'thread_id': row['thread_id']
-            })
-        
-        print(f"Successfully parsed {len(annotations)} annotations")
-        if annotations:
-            print("First annotation:", annotations[0])
-        
-        return annotations
-        
-    except Exception as e:
-        raise Exception(f"Error importing annotations from CSV: {str(e)}")
+    _, records = _open_csv_records(binary_file, _check_message_header)
+    
+    def messages() -> Iterator[Dict[str, Any]]:
+        for record in records:
+            message = {
+                'turn_id': _clean_cell(record.get('turn_id')),
+                'user_id': _clean_user_id(record.get('user_id')),
+                'turn_text': _clean_cell(record.get('turn_text')),
+                'reply_to_turn': _clean_cell(record.get('reply_to_turn')),
+            }
+            if any(message[col] is None for col in MESSAGE_REQUIRED_COLUMNS):
+                continue
+            yield message
+    
+    return _batched(messages(), batch_size)
 
-def validate_annotations_csv_format(file_path: str) -> bool:
+def iter_annotation_batches(binary_file: BinaryIO, batch_size: int = CSV_BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
     """
-    Validate that a file is a properly formatted CSV with the required columns for annotations.
-    Returns True if valid, raises ValueError with description if invalid.
+    Stream annotations (turn_id, thread_id) from a CSV upload in batches of at most batch_size rows.
+    
+    The file must be UTF-8 (a leading BOM is ignored). Header names are stripped
+    and lowercased. turn_id is required, and the thread is read from the first of
+    thread_id, thread_column or thread that is present. The header is validated
+    immediately, before any row is read.
+    
+    Rows:
+    - Extra-field rows and blank rows are skipped, as for messages.
+    - Cells are cleaned the same way.
+    - Rows without a turn_id or thread are skipped.
     """
-    try:
-        # Try to read first few rows to validate format
-        df = pd.read_csv(
-            file_path,
-            nrows=5,
-            quoting=csv.QUOTE_MINIMAL,
-            escapechar='\\',
-            encoding='utf-8',
-            on_bad_lines='skip'
-        )
-        
-        # Convert column names to lowercase
-        df.columns = df.columns.str.lower()
-        
-        # Check for required columns
-        if 'turn_id' not in df.columns:
-            raise ValueError("CSV is missing required column: turn_id")
-        
-        # Check for thread column (flexible naming)
-        thread_columns = ['thread_id', 'thread_column', 'thread']
-        has_thread_column = any(col in df.columns for col in thread_columns)
-        
-        if not has_thread_column:
-            raise ValueError(f"CSV is missing a thread column. Expected one of: {', '.join(thread_columns)}")
-            
-        return True
-        
-    except pd.errors.EmptyDataError:
-        raise ValueError("CSV file is empty")
-    except pd.errors.ParserError:
-        raise ValueError("File is not a valid CSV format")
-    except Exception as e:
-        raise ValueError(f"Error validating annotations CSV: {str(e)}") 
\ No newline at end of file
+    header, records = _open_csv_records(binary_file, _check_annotation_header)
+    thread_column = _find_thread_column(header)
+    
+    def annotations() -> Iterator[Dict[str, Any]]:
+        for record in records:
+            turn_id = _clean_cell(record.get('turn_id'))
+            thread_id = _clean_cell(record.get(thread_column))
+            if turn_id is None or thread_id is None:
+                continue
+            yield {'turn_id': turn_id, 'thread_id': thread_id}
+    
+    return _batched(annotations(), batch_size)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+SQLite Engine Profile Benchmark
+
+Measures annotation write throughput under concurrent clients for three engine
+profiles against a fresh temporary database:
+- baseline: the previous engine (no pragmas, rollback journal, default pool)
+- tuned: the profile configured in app.config.Settings (WAL, synchronous=NORMAL, ...)
+- read-heavy: the configured profile with a 10 + 20 connection pool
+
+Each writer thread repeatedly annotates a message the way POST
+/projects/{id}/messages/{id}/annotations/ does (pair-count update, annotation
+upsert, version bump, commit), while reader threads page through the room's
+messages. Results are documented in docs/sqlite_tuning.md.
+
+Usage:
+    python benchmark_sqlite.py [--writers 8] [--readers 4] [--seconds 10] [--messages 2000] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models
+from app.config import Settings
+from app.database import create_db_engine
+
+BASELINE_PROFILE = dict(
+    DB_POOL_CLASS="queue",
+    DB_POOL_SIZE=5,
+    DB_MAX_OVERFLOW=10,
+    SQLITE_JOURNAL_MODE="",
+    SQLITE_SYNCHRONOUS="",
+    SQLITE_BUSY_TIMEOUT_MS=0,
+    SQLITE_CACHE_SIZE_KB=0,
+    SQLITE_MMAP_SIZE=0,
+)
+
+# The configured profile with a pool larger than the number of clients (opt-in for read-heavy deployments)
+READ_HEAVY_PROFILE = dict(
+    DB_POOL_SIZE=10,
+    DB_MAX_OVERFLOW=20,
+)
+
+
+def seed_database(SessionFactory, writers: int, messages: int) -> Dict[str, int]:
+    """Create one project, one chat room with the given number of messages and one annotator per writer."""
+    db = SessionFactory()
+    try:
+        project = models.Project(name="benchmark")
+        db.add(project)
+        db.flush()
+        room = models.ChatRoom(name="benchmark-room", project_id=project.id)
+        db.add(room)
+        db.flush()
+        db.add_all(
+            models.ChatMessage(
+                turn_id=f"t{i}", user_id=f"u{i % 7}", turn_text=f"message {i}", chat_room_id=room.id
+            )
+            for i in range(messages)
+        )
+        annotators = [
+            models.User(email=f"annotator{i}@example.com", hashed_password="x", is_admin=False)
+            for i in range(writers)
+        ]
+        db.add_all(annotators)
+        db.commit()
+        return {"project_id": project.id, "chat_room_id": room.id, "annotator_ids": [a.id for a in annotators]}
+    finally:
+        db.close()
+
+
+def run_profile(name: str, profile: dict, writers: int, readers: int, seconds: float, messages: int) -> dict:
+    settings = Settings(**profile)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+        engine = create_db_engine(database_url, settings)
+        models.Base.metadata.create_all(engine)
+        SessionFactory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        seed = seed_database(SessionFactory, writers, messages)
+        with SessionFactory() as db:
+            message_ids = [message_id for (message_id,) in db.query(models.ChatMessage.id).all()]
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        totals = {"writes": 0, "reads": 0, "locked": 0}
+
+        def writer(annotator_id: int):
+            rng = random.Random(annotator_id)
+            writes = locked = 0
+            while not stop.is_set():
+                db = SessionFactory()
+                try:
+                    message_id = rng.choice(message_ids)
+                    thread_id = f"T{rng.randint(0, 9)}"
+                    crud.update_pair_counts(db, seed["chat_room_id"], {(message_id, annotator_id): thread_id})
+                    crud.upsert_annotations(db, [{
+                        "message_id": message_id,
+                        "chat_room_id": seed["chat_room_id"],
+                        "annotator_id": annotator_id,
+                        "project_id": seed["project_id"],
+                        "thread_id": thread_id,
+                    }])
+                    crud.bump_annotation_version(db, seed["chat_room_id"])
+                    db.commit()
+                    writes += 1
+                except OperationalError:
+                    db.rollback()
+                    locked += 1
+                finally:
+                    db.close()
+            with lock:
+                totals["writes"] += writes
+                totals["locked"] += locked
+
+        def reader():
+            reads = 0
+            while not stop.is_set():
+                db = SessionFactory()
+                try:
+                    cursor = None
+                    for _ in range(5):
+                        _, cursor = crud.get_chat_message_page(db, seed["chat_room_id"], cursor=cursor, limit=100)
+                        if cursor is None:
+                            break
+                    reads += 1
+                except OperationalError:
+                    pass
+                finally:
+                    db.close()
+            with lock:
+                totals["reads"] += reads
+
+        threads = [threading.Thread(target=writer, args=(annotator_id,)) for annotator_id in seed["annotator_ids"]]
+        threads += [threading.Thread(target=reader) for _ in range(readers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        engine.dispose()
+
+    return {
+        "profile": name,
+        "writes_per_second": totals["writes"] / elapsed,
+        "reads_per_second": totals["reads"] / elapsed,
+        "locked_errors": totals["locked"],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=8, help="Concurrent annotators writing")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent clients paging through messages")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of each run")
+    parser.add_argument("--messages", type=int, default=2000, help="Messages in the benchmark chat room")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per profile; the median run is reported")
+    args = parser.parse_args()
+
+    results = []
+    for name, profile in (("baseline", BASELINE_PROFILE), ("tuned", {}), ("read-heavy", READ_HEAVY_PROFILE)):
+        runs = [
+            run_profile(name, profile, args.writers, args.readers, args.seconds, args.messages)
+            for _ in range(args.repeat)
+        ]
+        median_writes = statistics.median_low(run["writes_per_second"] for run in runs)
+        results.append(next(run for run in runs if run["writes_per_second"] == median_writes))
+
+    print(
+        f"{args.writers} writers, {args.readers} readers, {args.seconds:.0f}s per run, "
+        f"{args.messages} messages, median of {args.repeat} runs"
+    )
+    print(f"{'profile':<10} {'writes/s':>10} {'page reads/s':>14} {'locked errors':>15}")
+    for result in results:
+        print(
+            f"{result['profile']:<10} {result['writes_per_second']:>10.1f} "
+            f"{result['reads_per_second']:>14.1f} {result['locked_errors']:>15}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Shared fixtures for the backend test suite.
+
+The suite runs against a temporary SQLite database built by the Alembic
+migrations. Settings and engines are created when the app package is imported,
+so the environment is set up here before any app module is imported.
+"""
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+
+import pytest
+
+_TMP_DIR = tempfile.mkdtemp(prefix="annotation-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}"
+os.environ["EXPORT_DIR"] = os.path.join(_TMP_DIR, "exports")
+os.environ["IMPORT_DIR"] = os.path.join(_TMP_DIR, "imports")
+os.environ["COMPUTE_POOL_WORKERS"] = "0"    # Run pool work inline
+os.environ["AUTH_CACHE_TTL_SECONDS"] = "0"  # Tests change assignments directly in the database
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.database import SessionLocal, async_engine, engine  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def migrate(database_url: str, revision: str = "head") -> None:
+    """Build (or upgrade) a database schema with the Alembic migrations."""
+    config = Config()  # No ini file: keeps alembic.ini's logging setup out of the test output
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    previous_url = os.environ.get("DATABASE_URL")
+    os.environ["DATABASE_URL"] = database_url  # alembic/env.py reads DATABASE_URL first
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):  # env.py echoes the DDL
+            command.upgrade(config, revision)
+    finally:
+        os.environ["DATABASE_URL"] = previous_url
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    migrate(os.environ["DATABASE_URL"])
+    yield
+    engine.dispose()
+    shutil.rmtree(_TMP_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def app_client(database):
+    from app.main import app
+    with TestClient(app) as client:
+        yield client
+    # The async engine's connections belong to the TestClient's event loop
+    async_engine.sync_engine.dispose()
@@ -0,0 +1,83 @@
+"""Helpers that create test data directly through the models and crud functions."""
+import contextlib
+import itertools
+
+from sqlalchemy import event
+
+from app import crud, models
+from app.auth import create_access_token
+from app.database import async_engine, engine
+
+_ids = itertools.count(1)
+
+
+def auth_headers(user: models.User) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.email})}"}
+
+
+def make_user(db, is_admin: bool = False) -> models.User:
+    user = models.User(email=f"user{next(_ids)}@example.com", hashed_password="x", is_admin=is_admin)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def make_project(db, *annotators: models.User) -> models.Project:
+    project = models.Project(name=f"project {next(_ids)}")
+    db.add(project)
+    db.flush()
+    db.add_all(models.ProjectAssignment(project_id=project.id, user_id=user.id) for user in annotators)
+    db.commit()
+    return project
+
+
+def make_chat_room(db, project: models.Project, message_count: int) -> models.ChatRoom:
+    """A chat room whose messages have turn ids t0, t1, ... in id order."""
+    room = models.ChatRoom(name=f"room {next(_ids)}", project_id=project.id)
+    db.add(room)
+    db.flush()
+    db.add_all(
+        models.ChatMessage(
+            turn_id=f"t{i}", user_id=f"u{i % 3}", turn_text=f"message {i}",
+            reply_to_turn=f"t{i - 1}" if i else None, chat_room_id=room.id
+        )
+        for i in range(message_count)
+    )
+    db.commit()
+    return room
+
+
+def message_ids(db, room: models.ChatRoom) -> list:
+    """The room's message ids in id order."""
+    return [message.id for message in crud.get_chat_message_page(db, room.id, limit=1_000_000)[0]]
+
+
+def annotate(db, room: models.ChatRoom, annotator: models.User, threads: dict) -> None:
+    """Write {message_id: thread_id} for one annotator the way the write endpoints do. Commits."""
+    crud.update_pair_counts(db, room.id, {(message_id, annotator.id): thread for message_id, thread in threads.items()})
+    crud.upsert_annotations(db, [
+        {"message_id": message_id, "chat_room_id": room.id, "annotator_id": annotator.id,
+         "project_id": room.project_id, "thread_id": thread}
+        for message_id, thread in threads.items()
+    ])
+    db.commit()
+
+
+@contextlib.contextmanager
+def count_checkouts():
+    """Count connection checkouts from the sync and async pools inside the block."""
+    counts = {"sync": 0, "async": 0}
+
+    def counter(kind):
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            counts[kind] += 1
+        return on_checkout
+
+    listeners = [(engine.pool, counter("sync")), (async_engine.sync_engine.pool, counter("async"))]
+    for pool, listener in listeners:
+        event.listen(pool, "checkout", listener)
+    try:
+        yield counts
+    finally:
+        for pool, listener in listeners:
+            event.remove(pool, "checkout", listener)
@@ -0,0 +1,66 @@
+"""Batch annotation writes: per-item results and all-or-nothing persistence."""
+import pytest
+
+from app import crud, models
+from tests.factories import annotate, auth_headers, make_chat_room, make_project, make_user, message_ids
+from tests.test_pair_counts import assert_matches_rebuild, pair_counts
+
+
+@pytest.fixture
+def batch_setup(db):
+    annotators = [make_user(db) for _ in range(2)]
+    project = make_project(db, *annotators)
+    room = make_chat_room(db, project, 4)
+    ids = message_ids(db, room)
+    annotate(db, room, annotators[0], {ids[0]: "a", ids[1]: "a"})
+    annotate(db, room, annotators[1], dict.fromkeys(ids, "b"))
+    url = f"/projects/{project.id}/chat-rooms/{room.id}/annotations/batch"
+    return room, ids, url, annotators[0]
+
+
+def threads(db, room, annotator):
+    return dict(
+        db.query(models.Annotation.message_id, models.Annotation.thread_id)
+        .filter_by(chat_room_id=room.id, annotator_id=annotator.id)
+    )
+
+
+def test_batch_reports_every_item(app_client, db, batch_setup):
+    room, ids, url, annotator = batch_setup
+    other_room_message = message_ids(db, make_chat_room(db, make_project(db), 1))[0]
+    version = room.annotation_version
+
+    response = app_client.post(url, json={"annotations": [
+        {"message_id": ids[0], "thread_id": "a"},
+        {"message_id": ids[1], "thread_id": "c"},
+        {"message_id": ids[2], "thread_id": "c"},
+        {"message_id": ids[2], "thread_id": "d"},
+        {"message_id": other_room_message, "thread_id": "c"},
+    ]}, headers=auth_headers(annotator))
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [result["status"] for result in body["results"]] == ["unchanged", "updated", "created", "error", "error"]
+    assert (body["created"], body["updated"], body["unchanged"], body["failed"]) == (1, 1, 1, 2)
+    assert body["results"][2]["annotation_id"] is not None
+    assert threads(db, room, annotator) == {ids[0]: "a", ids[1]: "c", ids[2]: "c"}
+    db.refresh(room)
+    assert room.annotation_version == version + 1
+    assert_matches_rebuild(db, room)
+
+
+def test_failed_batch_leaves_no_partial_write(app_client, db, batch_setup, monkeypatch):
+    room, ids, url, annotator = batch_setup
+    before = (threads(db, room, annotator), pair_counts(db, room), room.annotation_version)
+
+    def fail(db, chat_room_id):
+        raise RuntimeError("write failed after the annotations were upserted")
+
+    monkeypatch.setattr(crud, "bump_annotation_version", fail)
+    with pytest.raises(RuntimeError):
+        app_client.post(url, json={"annotations": [
+            {"message_id": message_id, "thread_id": "z"} for message_id in ids
+        ]}, headers=auth_headers(annotator))
+
+    db.expire_all()
+    assert (threads(db, room, annotator), pair_counts(db, room), db.get(models.ChatRoom, room.id).annotation_version) == before
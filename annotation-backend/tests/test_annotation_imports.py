@@ -0,0 +1,67 @@
+"""Set-based annotation import (crud.import_annotation_batches) and its upsert."""
+from app import crud, models
+from tests.factories import make_chat_room, make_project, make_user
+from tests.test_pair_counts import assert_matches_rebuild
+
+
+def threads(db, room, annotator):
+    return dict(
+        db.query(models.ChatMessage.turn_id, models.Annotation.thread_id)
+        .join(models.Annotation, models.Annotation.message_id == models.ChatMessage.id)
+        .filter(models.Annotation.chat_room_id == room.id, models.Annotation.annotator_id == annotator.id)
+    )
+
+
+def test_import_counts_skips_and_errors(db):
+    annotator = make_user(db)
+    room = make_chat_room(db, make_project(db, annotator), 4)
+
+    response = crud.import_annotation_batches(db, room, annotator, [
+        [{"turn_id": "t0", "thread_id": "a"}, {"turn_id": "t1", "thread_id": "a"}, {"turn_id": "t9", "thread_id": "a"}],
+        [{"turn_id": "t2", "thread_id": None}, {"turn_id": "t2", "thread_id": "b"}],
+    ])
+
+    assert (response.total_annotations, response.imported_count, response.skipped_count) == (5, 3, 2)
+    assert response.errors[0] == f"Message with turn_id 't9' not found in chat room {room.id}"
+    assert response.errors[1].startswith("Missing turn_id or thread_id")
+    assert threads(db, room, annotator) == {"t0": "a", "t1": "a", "t2": "b"}
+    assert_matches_rebuild(db, room)
+
+
+def test_turn_repeated_in_a_batch_keeps_its_last_thread(db):
+    annotator = make_user(db)
+    room = make_chat_room(db, make_project(db, annotator), 2)
+
+    response = crud.import_annotation_batches(db, room, annotator, [
+        [{"turn_id": "t0", "thread_id": "a"}, {"turn_id": "t0", "thread_id": "b"}],
+    ])
+
+    assert (response.imported_count, response.skipped_count) == (2, 0)
+    assert threads(db, room, annotator) == {"t0": "b"}
+    assert db.query(models.Annotation).filter_by(chat_room_id=room.id).count() == 1
+
+
+def test_reimport_updates_threads_in_place(db):
+    annotators = [make_user(db) for _ in range(2)]
+    room = make_chat_room(db, make_project(db, *annotators), 3)
+    crud.import_annotation_batches(db, room, annotators[1], [[
+        {"turn_id": f"t{i}", "thread_id": "x"} for i in range(3)
+    ]])
+    crud.import_annotation_batches(db, room, annotators[0], [[
+        {"turn_id": "t0", "thread_id": "a"}, {"turn_id": "t1", "thread_id": "a"}
+    ]])
+    ids_before = {row.message_id: row.id for row in db.query(models.Annotation).filter_by(annotator_id=annotators[0].id)}
+    db.refresh(room)
+    version = room.annotation_version
+
+    response = crud.import_annotation_batches(db, room, annotators[0], [[
+        {"turn_id": "t0", "thread_id": "a"}, {"turn_id": "t1", "thread_id": "b"}, {"turn_id": "t2", "thread_id": "b"}
+    ]])
+
+    assert (response.imported_count, response.skipped_count) == (3, 0)
+    assert threads(db, room, annotators[0]) == {"t0": "a", "t1": "b", "t2": "b"}
+    ids_after = {row.message_id: row.id for row in db.query(models.Annotation).filter_by(annotator_id=annotators[0].id)}
+    assert {message_id: ids_after[message_id] for message_id in ids_before} == ids_before
+    db.refresh(room)
+    assert room.annotation_version > version
+    assert_matches_rebuild(db, room)
@@ -0,0 +1,39 @@
+"""Authentication dependencies share the route's session instead of opening a second pool's connection."""
+import pytest
+
+from tests.factories import auth_headers, count_checkouts, make_chat_room, make_project, make_user
+
+
+@pytest.fixture
+def annotator_setup(db):
+    annotator = make_user(db)
+    project = make_project(db, annotator)
+    room = make_chat_room(db, project, 3)
+    return project, room, auth_headers(annotator)
+
+
+def test_sync_route_uses_one_sync_connection(app_client, annotator_setup):
+    project, room, headers = annotator_setup
+    with count_checkouts() as counts:
+        response = app_client.get(f"/projects/{project.id}/chat-rooms/{room.id}/messages/page", headers=headers)
+    assert response.status_code == 200, response.text
+    assert counts == {"sync": 1, "async": 0}
+
+
+def test_async_route_uses_one_async_connection(app_client, annotator_setup):
+    project, _, headers = annotator_setup
+    with count_checkouts() as counts:
+        response = app_client.get(f"/projects/{project.id}", headers=headers)
+    assert response.status_code == 200, response.text
+    assert counts == {"sync": 0, "async": 1}
+
+
+def test_project_access_is_enforced_on_both_variants(app_client, db, annotator_setup):
+    _, room, _ = annotator_setup
+    outsider = auth_headers(make_user(db))
+    response = app_client.get(f"/projects/{room.project_id}/chat-rooms/{room.id}/messages/page", headers=outsider)
+    assert response.status_code == 403
+    response = app_client.get(f"/projects/{room.project_id}", headers=outsider)
+    assert response.status_code == 403
+    response = app_client.get("/projects/", headers={"Authorization": "Bearer invalid"})
+    assert response.status_code == 401
@@ -0,0 +1,95 @@
+"""Streaming CSV parsing of message and annotation uploads."""
+import io
+
+import pytest
+
+from app.utils.csv_utils import iter_annotation_batches, iter_chat_message_batches
+
+
+def upload(text: str, bom: bool = False) -> io.BytesIO:
+    return io.BytesIO((b"\xef\xbb\xbf" if bom else b"") + text.encode("utf-8"))
+
+
+def rows(batches):
+    return [row for batch in batches for row in batch]
+
+
+@pytest.mark.parametrize("parse, text, missing", [
+    (iter_chat_message_batches, "turn_id,user_id\nt0,u\n", "turn_text"),
+    (iter_chat_message_batches, "user_id,turn_text\nu,x\n", "turn_id"),
+    (iter_annotation_batches, "thread_id\na\n", "turn_id"),
+    (iter_annotation_batches, "turn_id,label\nt0,a\n", "thread column"),
+])
+def test_missing_required_header_fails_before_any_row(parse, text, missing):
+    with pytest.raises(ValueError, match=missing):
+        parse(upload(text))
+
+
+def test_empty_file_is_rejected():
+    with pytest.raises(ValueError, match="empty"):
+        iter_chat_message_batches(upload(""))
+
+
+def test_bom_and_header_case_are_ignored():
+    text = " Turn_ID ,USER_ID,turn_text,reply_to_turn\nt0,u0,hello,\n"
+    assert rows(iter_chat_message_batches(upload(text, bom=True))) == [
+        {"turn_id": "t0", "user_id": "u0", "turn_text": "hello", "reply_to_turn": None}
+    ]
+
+
+def test_extra_short_and_blank_rows():
+    text = (
+        "turn_id,user_id,turn_text,reply_to_turn\n"
+        "t0,u0,kept,\n"
+        "t1,u1,extra field,t0,surplus\n"
+        "\n"
+        ",,,\n"
+        "t2,u2,short row\n"
+        "t3,u3\n"
+    )
+    assert rows(iter_chat_message_batches(upload(text))) == [
+        {"turn_id": "t0", "user_id": "u0", "turn_text": "kept", "reply_to_turn": None},
+        {"turn_id": "t2", "user_id": "u2", "turn_text": "short row", "reply_to_turn": None},
+    ]
+
+
+def test_cells_and_ids_are_normalized():
+    text = (
+        "turn_id,user_id,turn_text,reply_to_turn\n"
+        " 007 , 12.0 , padded text ,nan\n"
+        "t1,alice,x,None\n"
+        "t2,NaN,missing user,\n"
+        '"t3","3","quoted, with comma","007"\n'
+    )
+    assert rows(iter_chat_message_batches(upload(text))) == [
+        {"turn_id": "007", "user_id": "12", "turn_text": "padded text", "reply_to_turn": None},
+        {"turn_id": "t1", "user_id": "alice", "turn_text": "x", "reply_to_turn": None},
+        {"turn_id": "t3", "user_id": "3", "turn_text": "quoted, with comma", "reply_to_turn": "007"},
+    ]
+
+
+def test_annotation_thread_column_and_skipped_rows():
+    text = "turn_id,thread\nt0,a\nt1,\n,b\nt2, c \n"
+    assert rows(iter_annotation_batches(upload(text))) == [
+        {"turn_id": "t0", "thread_id": "a"},
+        {"turn_id": "t2", "thread_id": "c"},
+    ]
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 3, 7])
+def test_rows_split_across_batch_boundaries(batch_size):
+    lines = [f't{i},u{i},"line one\nline two {i}",' for i in range(7)]
+    text = "turn_id,user_id,turn_text,reply_to_turn\n" + "\n".join(lines) + "\n"
+
+    batches = list(iter_chat_message_batches(upload(text), batch_size=batch_size))
+
+    assert all(len(batch) == batch_size for batch in batches[:-1])
+    assert 1 <= len(batches[-1]) <= batch_size
+    assert [row["turn_id"] for row in rows(batches)] == [f"t{i}" for i in range(7)]
+    assert rows(batches)[3]["turn_text"] == "line one\nline two 3"
+
+
+def test_caller_file_stays_open():
+    file = upload("turn_id,thread_id\nt0,a\n")
+    assert rows(iter_annotation_batches(file)) == [{"turn_id": "t0", "thread_id": "a"}]
+    assert not file.closed
@@ -0,0 +1,62 @@
+"""Background project export job."""
+import io
+import json
+import os
+import zipfile
+
+from app import crud, jobs
+from app.config import get_settings
+from tests.factories import annotate, auth_headers, make_chat_room, make_project, make_user, message_ids
+
+
+def test_project_export_writes_one_shard_per_room(app_client, db):
+    annotators = [make_user(db) for _ in range(2)]
+    project = make_project(db, *annotators)
+    rooms = [make_chat_room(db, project, 3), make_chat_room(db, project, 2)]
+    for room in rooms:
+        ids = message_ids(db, room)
+        annotate(db, room, annotators[0], dict.fromkeys(ids, f"a{room.id}"))
+        annotate(db, room, annotators[1], dict.fromkeys(ids, f"b{room.id}"))
+    headers = auth_headers(make_user(db, is_admin=True))
+
+    response = app_client.post(f"/admin/projects/{project.id}/export", headers=headers)
+    assert response.status_code == 202, response.text
+    job = app_client.get(f"/admin/jobs/{response.json()['id']}", headers=headers).json()
+    assert (job["status"], job["total_items"], job["processed_items"]) == ("completed", 2, 2)
+
+    download = app_client.get(job["download_url"], headers=headers)
+    assert download.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(download.content)) as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+        assert manifest["project_id"] == project.id
+        assert [entry["file"] for entry in manifest["chat_rooms"]] == [f"chat_rooms/{room.id}.ndjson" for room in rooms]
+        assert sorted(archive.namelist()) == sorted(["manifest.json"] + [entry["file"] for entry in manifest["chat_rooms"]])
+
+        for room, entry in zip(rooms, manifest["chat_rooms"]):
+            records = [json.loads(line) for line in archive.read(entry["file"]).decode("utf-8").splitlines()]
+            assert [record["message_id"] for record in records] == message_ids(db, room)
+            assert all(record["chat_room_id"] == room.id for record in records)
+            threads = {annotators[0].email: f"a{room.id}", annotators[1].email: f"b{room.id}"}
+            assert all(record["threads"] == threads for record in records)
+
+
+def test_failed_export_leaves_no_partial_archive(db, monkeypatch):
+    project = make_project(db, make_user(db))
+    first_room = make_chat_room(db, project, 3)
+    make_chat_room(db, project, 3)
+    job = crud.create_job(db, kind="project_export", project_id=project.id)
+
+    real_iter_records = crud.iter_project_export_records
+    def fail_on_second_room(db, chat_room):
+        if chat_room.id != first_room.id:
+            raise RuntimeError("disk full")
+        return real_iter_records(db, chat_room)
+    monkeypatch.setattr(crud, "iter_project_export_records", fail_on_second_room)
+
+    jobs.run_project_export_job(job.id)
+
+    db.refresh(job)
+    assert job.status == "failed"
+    assert job.errors == ["disk full"]
+    assert job.result_path is None
+    assert not [name for name in os.listdir(get_settings().EXPORT_DIR) if name.startswith(f"project_{project.id}_")]
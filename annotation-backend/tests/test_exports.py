@@ -0,0 +1,69 @@
+"""Chat room export endpoint."""
+import json
+import zlib
+
+import pytest
+
+from app import crud
+from app.compute_pool import ComputePool
+from app.jobs import render_chat_room_export
+from tests.factories import annotate, auth_headers, count_checkouts, make_chat_room, make_project, make_user, message_ids
+
+
+@pytest.fixture
+def export_setup(db):
+    annotators = [make_user(db) for _ in range(2)]
+    room = make_chat_room(db, make_project(db, *annotators), 5)
+    ids = message_ids(db, room)
+    annotate(db, room, annotators[0], dict.fromkeys(ids, "a"))
+    annotate(db, room, annotators[1], dict.fromkeys(ids[:3], "b"))
+    return room, auth_headers(make_user(db, is_admin=True))
+
+
+def test_export_reads_in_the_request_session(app_client, export_setup):
+    room, headers = export_setup
+    with count_checkouts() as counts:
+        response = app_client.get(f"/admin/chat-rooms/{room.id}/export", headers=headers)
+    assert response.status_code == 200, response.text
+    assert counts == {"sync": 0, "async": 1}
+
+    document = response.json()
+    assert document["export_metadata"]["completion_status"] == "INSUFFICIENT"
+    assert [len(message["annotations"]) for message in document["data"]["messages"]] == [2, 2, 2, 1, 1]
+
+
+def test_streamed_exports_match_the_buffered_one(app_client, export_setup):
+    room, headers = export_setup
+    url = f"/admin/chat-rooms/{room.id}/export"
+
+    def without_timestamp(document):
+        del document["export_metadata"]["export_timestamp"]
+        return document
+
+    buffered = without_timestamp(app_client.get(url, headers=headers).json())
+    streamed = app_client.get(url, params={"stream": True}, headers=headers)
+    gzipped = app_client.get(url, params={"gzip": True}, headers=headers)
+    assert streamed.status_code == gzipped.status_code == 200
+
+    assert without_timestamp(streamed.json()) == buffered
+    assert without_timestamp(json.loads(zlib.decompress(gzipped.content, wbits=31))) == buffered
+
+
+def test_pool_rendering_matches_the_inline_document(db, export_setup):
+    room, _ = export_setup
+    export_metadata, message_rows, annotation_rows = crud.prepare_chat_room_export(db, room.id)
+    pool = ComputePool(max_workers=1, max_queue=0)
+    try:
+        pooled = pool.run(render_chat_room_export, export_metadata, message_rows, annotation_rows)
+    finally:
+        pool.shutdown()
+
+    document = crud.export_chat_room_data(db, room.id)
+    document["export_metadata"]["export_timestamp"] = export_metadata["export_timestamp"]
+    inline = json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    assert pooled == render_chat_room_export(export_metadata, message_rows, annotation_rows) == inline
+
+
+def test_missing_room_is_not_found(app_client, db):
+    response = app_client.get("/admin/chat-rooms/999999/export", headers=auth_headers(make_user(db, is_admin=True)))
+    assert response.status_code == 404
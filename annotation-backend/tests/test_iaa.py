@@ -0,0 +1,124 @@
+"""Inter-annotator agreement: the vectorized one-to-one accuracy kernel and the room analysis."""
+import random
+
+import numpy as np
+import pytest
+from scipy.optimize import linear_sum_assignment
+
+from app import crud, models
+from tests.factories import annotate, make_chat_room, make_project, make_user, message_ids
+
+
+def reference_one_to_one_accuracy(annot1, annot2):
+    """The original per-message loop implementation the kernel replaced."""
+    if len(annot1) == 0:
+        return 0.0
+    label_map1 = {label: i for i, label in enumerate(sorted(set(annot1)))}
+    label_map2 = {label: i for i, label in enumerate(sorted(set(annot2)))}
+    overlap_matrix = np.zeros((len(label_map1), len(label_map2)), dtype=int)
+    for i in range(len(annot1)):
+        overlap_matrix[label_map1[annot1[i]], label_map2[annot2[i]]] += 1
+    row_ind, col_ind = linear_sum_assignment(-overlap_matrix)
+    return (overlap_matrix[row_ind, col_ind].sum() / len(annot1)) * 100
+
+
+def random_labels(rng, count, thread_count):
+    return [f"T{rng.randrange(thread_count)}" for _ in range(count)]
+
+
+@pytest.mark.parametrize("count, threads_1, threads_2", [
+    (1, 1, 1),
+    (10, 1, 5),
+    (50, 3, 3),
+    (200, 12, 4),
+    (1000, 40, 60),
+])
+def test_kernel_matches_reference_loop(count, threads_1, threads_2):
+    rng = random.Random(count)
+    for _ in range(5):
+        annot1 = random_labels(rng, count, threads_1)
+        annot2 = random_labels(rng, count, threads_2)
+        assert crud._calculate_one_to_one_accuracy(annot1, annot2) == pytest.approx(
+            reference_one_to_one_accuracy(annot1, annot2)
+        )
+
+
+def test_kernel_edge_cases():
+    assert crud._calculate_one_to_one_accuracy([], []) == 0.0
+    assert crud._calculate_one_to_one_accuracy(["a", "b", "a"], ["x", "y", "x"]) == 100.0
+    # Relabelling is not disagreement; splitting a thread is
+    assert crud._calculate_one_to_one_accuracy(["a", "a", "a", "a"], ["x", "x", "y", "y"]) == 50.0
+    with pytest.raises(AssertionError):
+        crud._calculate_one_to_one_accuracy(["a"], ["a", "b"])
+
+
+def test_room_analysis_matches_reference_loop(db):
+    rng = random.Random(7)
+    annotators = [make_user(db) for _ in range(3)]
+    pending = make_user(db)
+    project = make_project(db, *annotators, pending)
+    room = make_chat_room(db, project, 120)
+    ids = message_ids(db, room)
+
+    labels = {}
+    for annotator in annotators:
+        labels[annotator.id] = random_labels(rng, len(ids), 6)
+        annotate(db, room, annotator, dict(zip(ids, labels[annotator.id])))
+    annotate(db, room, pending, {ids[0]: "T0"})
+
+    analysis = crud.get_chat_room_iaa_analysis(db, room.id)
+
+    assert analysis.analysis_status == "Partial"
+    assert analysis.message_count == len(ids)
+    assert {a.id for a in analysis.completed_annotators} == {a.id for a in annotators}
+    assert [a.id for a in analysis.pending_annotators] == [pending.id]
+    assert len(analysis.pairwise_accuracies) == 3
+    for pair in analysis.pairwise_accuracies:
+        assert pair.accuracy == pytest.approx(
+            reference_one_to_one_accuracy(labels[pair.annotator_1_id], labels[pair.annotator_2_id])
+        )
+
+
+def test_cached_analysis_follows_the_annotation_watermark(db):
+    annotators = [make_user(db) for _ in range(2)]
+    project = make_project(db, *annotators)
+    room = make_chat_room(db, project, 4)
+    ids = message_ids(db, room)
+    annotate(db, room, annotators[0], dict.fromkeys(ids, "a"))
+    annotate(db, room, annotators[1], dict.fromkeys(ids, "b"))
+
+    first = crud.get_chat_room_iaa_analysis(db, room.id)
+    cache_row = db.get(models.ChatRoomIAACache, room.id)
+    assert cache_row.annotation_version == crud.get_chat_room(db, room.id).annotation_version
+    assert crud.get_cached_iaa_analysis(db, room.id) == first
+    assert first.pairwise_accuracies[0].accuracy == 100.0
+
+    # An annotation write moves the watermark past the cached entry
+    annotate(db, room, annotators[1], {ids[0]: "c", ids[1]: "c"})
+    assert crud.get_cached_iaa_analysis(db, room.id) is None
+    second = crud.get_chat_room_iaa_analysis(db, room.id)
+    assert second.pairwise_accuracies[0].accuracy == 50.0
+    assert crud.get_cached_iaa_analysis(db, room.id) == second
+
+    # So does a change of the project's annotators
+    crud.bump_annotation_versions_for_project(db, project.id)
+    db.commit()
+    assert crud.get_cached_iaa_analysis(db, room.id) is None
+
+
+def test_result_computed_before_a_write_is_not_served(db):
+    annotators = [make_user(db) for _ in range(2)]
+    project = make_project(db, *annotators)
+    room = make_chat_room(db, project, 2)
+    ids = message_ids(db, room)
+    for annotator in annotators:
+        annotate(db, room, annotator, dict.fromkeys(ids, "a"))
+
+    # The analysis read its watermark, then a write landed before it was stored
+    version = crud.get_chat_room(db, room.id).annotation_version
+    stale = crud._compute_chat_room_iaa_analysis(db, crud.get_chat_room(db, room.id))
+    annotate(db, room, annotators[0], {ids[0]: "b"})
+    crud.store_iaa_analysis(db, room.id, version, stale)
+
+    assert crud.get_cached_iaa_analysis(db, room.id) is None
+    assert crud.get_chat_room_iaa_analysis(db, room.id).pairwise_accuracies[0].accuracy == 50.0
@@ -0,0 +1,118 @@
+"""Background CSV import jobs: job rows, per-chunk progress, failures and upload cleanup."""
+import functools
+import os
+
+import pytest
+
+from app import crud, jobs, models
+from app.config import get_settings
+from app.utils import csv_utils
+from tests.factories import auth_headers, make_chat_room, make_project, make_user
+
+MESSAGES_CSV = "turn_id,user_id,turn_text,reply_to_turn\n" + "".join(
+    f"m{i},u{i % 2},message {i},\n" for i in range(5)
+)
+
+
+@pytest.fixture
+def admin_headers(db):
+    return auth_headers(make_user(db, is_admin=True))
+
+
+@pytest.fixture
+def uploads():
+    """Files left in IMPORT_DIR by the test."""
+    import_dir = get_settings().IMPORT_DIR
+    os.makedirs(import_dir, exist_ok=True)
+    before = set(os.listdir(import_dir))
+    return lambda: set(os.listdir(import_dir)) - before
+
+
+@pytest.fixture
+def progress_updates(monkeypatch):
+    """processed_items of every progress update, with CSV batches of two rows."""
+    for name in ("iter_chat_message_batches", "iter_annotation_batches"):
+        monkeypatch.setattr(jobs, name, functools.partial(getattr(csv_utils, name), batch_size=2))
+    updates = []
+    update_job_progress = crud.update_job_progress
+    def record(db, job, processed_items, errors=None):
+        updates.append(processed_items)
+        update_job_progress(db, job, processed_items, errors)
+    monkeypatch.setattr(crud, "update_job_progress", record)
+    return updates
+
+
+def post_messages(app_client, project, headers, content=MESSAGES_CSV):
+    return app_client.post(
+        f"/admin/projects/{project.id}/import-chat-room-csv/job",
+        files={"file": ("room.csv", content.encode("utf-8"), "text/csv")}, headers=headers
+    )
+
+
+def test_chat_room_import_job_runs_to_completion(app_client, db, admin_headers, uploads, progress_updates):
+    project = make_project(db)
+    response = post_messages(app_client, project, admin_headers)
+    assert response.status_code == 202, response.text
+    assert response.json()["status"] == "pending"
+
+    job = db.get(models.Job, response.json()["id"])
+    assert (job.kind, job.project_id, job.status) == ("chat_room_csv_import", project.id, "completed")
+    assert (job.total_items, job.processed_items, job.errors) == (5, 5, [])
+    assert progress_updates == [2, 4, 5]
+    room = db.get(models.ChatRoom, job.result["chat_room"]["id"])
+    assert job.result["import_details"]["imported_count"] == 5
+    assert crud.count_chat_messages_by_room(db, room.id) == 5
+    assert not uploads()
+
+    polled = app_client.get(f"/admin/jobs/{job.id}", headers=admin_headers).json()
+    assert (polled["status"], polled["total_items"], polled["processed_items"]) == ("completed", 5, 5)
+
+
+def test_annotation_import_job_reports_every_chunk(app_client, db, admin_headers, uploads, progress_updates):
+    annotator = make_user(db)
+    room = make_chat_room(db, make_project(db, annotator), 5)
+    content = "turn_id,thread_id\n" + "".join(f"t{i},T{i % 2}\n" for i in range(5))
+
+    response = app_client.post(
+        f"/admin/chat-rooms/{room.id}/import-annotations/job",
+        data={"user_id": str(annotator.id)},
+        files={"file": ("annotations.csv", content.encode("utf-8"), "text/csv")}, headers=admin_headers
+    )
+    assert response.status_code == 202, response.text
+
+    job = db.get(models.Job, response.json()["id"])
+    assert (job.kind, job.status, job.total_items, job.processed_items) == ("annotation_csv_import", "completed", 5, 5)
+    assert progress_updates == [2, 4, 5]
+    assert job.result["imported_count"] == 5
+    assert not uploads()
+
+
+def test_failed_job_keeps_committed_chunks(app_client, db, admin_headers, uploads, progress_updates, monkeypatch):
+    insert_batch = crud._insert_chat_message_batch
+    calls = []
+    def fail_on_second_batch(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError("database went away")
+        return insert_batch(*args)
+    monkeypatch.setattr(crud, "_insert_chat_message_batch", fail_on_second_batch)
+
+    project = make_project(db)
+    response = post_messages(app_client, project, admin_headers)
+    assert response.status_code == 202, response.text
+
+    job = db.get(models.Job, response.json()["id"])
+    assert (job.status, job.total_items, job.processed_items) == ("failed", 5, 2)
+    assert job.errors == ["database went away"]
+    assert job.result is None
+    room = db.query(models.ChatRoom).filter_by(project_id=project.id).one()
+    assert crud.count_chat_messages_by_room(db, room.id) == 2
+    assert not uploads()
+
+
+def test_rejected_header_leaves_no_job_or_upload(app_client, db, admin_headers, uploads):
+    project = make_project(db)
+    response = post_messages(app_client, project, admin_headers, content="turn_id,text\nm0,hello\n")
+    assert response.status_code == 400
+    assert db.query(models.Job).filter_by(project_id=project.id).count() == 0
+    assert not uploads()
@@ -0,0 +1,68 @@
+"""Set-based chat message import (crud.import_chat_message_batches)."""
+from app import crud, models
+from tests.factories import make_chat_room, make_project
+
+BATCHES = [
+    [
+        {"turn_id": "t0", "user_id": "u0", "turn_text": "hello"},
+        {"turn_id": "t1", "user_id": "u1", "turn_text": "hi", "reply_to_turn": "t0"},
+        {"turn_id": "t0", "user_id": "u2", "turn_text": "repeated in the same batch"},
+    ],
+    [
+        {"turn_id": "t1", "user_id": "u1", "turn_text": "repeated across batches"},
+        {"turn_id": "t2", "user_id": None, "turn_text": "invalid user_id"},
+        {"turn_id": "t3", "user_id": "u0", "turn_text": "bye"},
+    ],
+]
+
+
+def stored_messages(db, room):
+    return [
+        (message.turn_id, message.user_id, message.turn_text, message.reply_to_turn)
+        for message in db.query(models.ChatMessage).filter_by(chat_room_id=room.id).order_by(models.ChatMessage.id)
+    ]
+
+
+def test_import_counts_and_skips_duplicate_turn_ids(db):
+    room = make_chat_room(db, make_project(db), 0)
+
+    response = crud.import_chat_message_batches(db, room.id, BATCHES)
+
+    assert (response.total_messages, response.imported_count, response.skipped_count) == (6, 3, 3)
+    assert response.warnings == [
+        "Message with turn_id t0 already exists",
+        "Message with turn_id t1 already exists",
+    ]
+    assert len(response.errors) == 1 and response.errors[0].startswith("Error importing message t2")
+    assert stored_messages(db, room) == [
+        ("t0", "u0", "hello", None),
+        ("t1", "u1", "hi", "t0"),
+        ("t3", "u0", "bye", None),
+    ]
+
+
+def test_reimporting_the_same_file_adds_nothing(db):
+    room = make_chat_room(db, make_project(db), 0)
+    crud.import_chat_message_batches(db, room.id, BATCHES)
+    db.refresh(room)
+    version = room.annotation_version
+
+    response = crud.import_chat_message_batches(db, room.id, BATCHES)
+
+    assert (response.imported_count, response.skipped_count) == (0, 6)
+    assert len(response.warnings) == 5
+    assert len(stored_messages(db, room)) == 3
+    db.refresh(room)
+    assert room.annotation_version == version
+
+
+def test_turn_ids_of_other_rooms_do_not_clash(db):
+    project = make_project(db)
+    room, other_room = make_chat_room(db, project, 2), make_chat_room(db, project, 0)
+
+    response = crud.import_chat_message_batches(db, other_room.id, [[
+        {"turn_id": "t0", "user_id": "u", "turn_text": "same turn_id, other room"}
+    ]])
+
+    assert (response.imported_count, response.skipped_count, response.warnings) == (1, 0, [])
+    assert len(stored_messages(db, room)) == 2
@@ -0,0 +1,69 @@
+"""Keyset-paginated chat room messages endpoint."""
+import pytest
+
+from tests.factories import annotate, auth_headers, make_chat_room, make_project, make_user, message_ids
+
+
+@pytest.fixture
+def room_setup(db):
+    annotator = make_user(db)
+    project = make_project(db, annotator)
+    room = make_chat_room(db, project, 10)
+    ids = message_ids(db, room)
+    annotate(db, room, annotator, dict.fromkeys(ids[:4], "a"))
+    return project, room, ids, auth_headers(annotator)
+
+
+def get_page(app_client, project, room, headers, **params):
+    response = app_client.get(
+        f"/projects/{project.id}/chat-rooms/{room.id}/messages/page", params=params, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.mark.parametrize("limit, page_sizes", [(3, [3, 3, 3, 1]), (5, [5, 5]), (10, [10]), (11, [10])])
+def test_pages_cover_the_room_once(app_client, room_setup, limit, page_sizes):
+    project, room, ids, headers = room_setup
+
+    seen, sizes, cursor = [], [], None
+    while True:
+        params = {"limit": limit} if cursor is None else {"limit": limit, "cursor": cursor}
+        page = get_page(app_client, project, room, headers, **params)
+        sizes.append(len(page["messages"]))
+        seen.extend(message["id"] for message in page["messages"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+        assert cursor == seen[-1]
+
+    assert seen == ids
+    assert sizes == page_sizes
+
+
+def test_cursor_past_the_last_message_returns_an_empty_page(app_client, room_setup):
+    project, room, ids, headers = room_setup
+    page = get_page(app_client, project, room, headers, cursor=ids[-1])
+    assert page["messages"] == [] and page["next_cursor"] is None
+
+
+def test_totals_only_on_the_first_page_unless_requested(app_client, room_setup):
+    project, room, ids, headers = room_setup
+
+    first = get_page(app_client, project, room, headers, limit=3)
+    assert (first["total_messages"], first["annotated_by_me"]) == (10, 4)
+
+    later = get_page(app_client, project, room, headers, limit=3, cursor=first["next_cursor"])
+    assert (later["total_messages"], later["annotated_by_me"]) == (None, None)
+
+    requested = get_page(app_client, project, room, headers, limit=3, cursor=first["next_cursor"], include_totals=True)
+    assert (requested["total_messages"], requested["annotated_by_me"]) == (10, 4)
+
+
+def test_room_of_another_project_is_not_found(app_client, db, room_setup):
+    project, _, _, headers = room_setup
+    other_room = make_chat_room(db, make_project(db), 1)
+    response = app_client.get(
+        f"/projects/{project.id}/chat-rooms/{other_room.id}/messages/page", headers=headers
+    )
+    assert response.status_code == 404
@@ -0,0 +1,56 @@
+"""Keyset scans over a chat room's messages."""
+import functools
+
+import pytest
+
+from app import crud, models
+from tests.factories import annotate, make_chat_room, make_project, make_user, message_ids
+
+
+@pytest.fixture
+def interleaved_rooms(db):
+    """Two rooms whose messages alternate in id order, so a scan that leaks across rooms shows up."""
+    project = make_project(db)
+    rooms = [models.ChatRoom(name=f"interleaved {i}", project_id=project.id) for i in range(2)]
+    db.add_all(rooms)
+    db.flush()
+    for i in range(25):
+        for room in rooms:
+            db.add(models.ChatMessage(turn_id=f"t{i}", user_id="u", turn_text="x", chat_room_id=room.id))
+            db.flush()
+    db.commit()
+    return rooms
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 5, 24, 25, 26, 1000])
+def test_chunks_cover_the_room_once_in_order(db, interleaved_rooms, chunk_size):
+    room, other_room = interleaved_rooms
+    expected = [
+        message.id for message in
+        db.query(models.ChatMessage).filter_by(chat_room_id=room.id).order_by(models.ChatMessage.id)
+    ]
+
+    chunks = list(crud.iter_chat_message_chunks(db, room.id, models.ChatMessage.turn_id, chunk_size=chunk_size))
+
+    assert [row.id for chunk in chunks for row in chunk] == expected
+    assert all(1 <= len(chunk) <= chunk_size for chunk in chunks)
+    assert len(chunks) == -(-len(expected) // chunk_size)
+    assert [row.turn_id for row in chunks[0]][:2] == ["t0", "t1"][:chunk_size]
+
+
+def test_empty_room_yields_no_chunks(db):
+    room = make_chat_room(db, make_project(db), 0)
+    assert list(crud.iter_chat_message_chunks(db, room.id)) == []
+
+
+def test_export_records_span_chunk_boundaries(db, monkeypatch):
+    monkeypatch.setattr(crud, "iter_chat_message_chunks", functools.partial(crud.iter_chat_message_chunks, chunk_size=3))
+    annotator = make_user(db)
+    room = make_chat_room(db, make_project(db, annotator), 10)
+    ids = message_ids(db, room)
+    annotate(db, room, annotator, {message_id: f"T{i % 2}" for i, message_id in enumerate(ids)})
+
+    records = list(crud.iter_chat_room_export_messages(db, room.id))
+
+    assert [record["turn_id"] for record in records] == [f"t{i}" for i in range(10)]
+    assert [record["annotations"][0]["thread_id"] for record in records] == [f"T{i % 2}" for i in range(10)]
@@ -0,0 +1,66 @@
+"""Data migrations that rewrite existing rows."""
+import logging
+import os
+import sqlite3
+
+import pytest
+
+from tests.conftest import migrate
+
+
+@pytest.fixture
+def orphaned_database(tmp_path):
+    """A database at the revision before the chat_room_id backfill, with two orphaned annotations."""
+    database_path = os.path.join(tmp_path, "upgrade.db")
+    migrate(f"sqlite:///{database_path}", "0b9e5d7c3a21")
+
+    connection = sqlite3.connect(database_path)  # Foreign keys off, as in a database that accumulated orphans
+    with connection:
+        connection.execute("INSERT INTO users (id, email, hashed_password, is_admin) VALUES (1, 'a@example.com', 'x', 0)")
+        connection.execute("INSERT INTO projects (id, name) VALUES (1, 'project')")
+        connection.execute("INSERT INTO chat_rooms (id, name, project_id) VALUES (7, 'room', 1)")
+        connection.execute(
+            "INSERT INTO chat_messages (id, turn_id, user_id, turn_text, chat_room_id) VALUES (1, 't0', 'u', 'x', 7)"
+        )
+        connection.executemany(
+            "INSERT INTO annotations (message_id, annotator_id, project_id, thread_id) VALUES (?, 1, 1, 'a')",
+            [(1,), (404,), (405,)]
+        )
+    connection.close()
+    return database_path
+
+
+def query(database_path, sql):
+    connection = sqlite3.connect(database_path)
+    try:
+        return connection.execute(sql).fetchall()
+    finally:
+        connection.close()
+
+
+def test_chat_room_backfill_refuses_to_delete_orphaned_annotations(orphaned_database, monkeypatch):
+    monkeypatch.delenv("DELETE_ORPHAN_ANNOTATIONS", raising=False)
+
+    with pytest.raises(RuntimeError, match=r"2 annotation\(s\) belong to a chat message that no longer exists"):
+        migrate(f"sqlite:///{orphaned_database}", "5d2e8f4a1c69")
+
+    assert query(orphaned_database, "SELECT version_num FROM alembic_version") == [("0b9e5d7c3a21",)]
+    assert query(orphaned_database, "SELECT message_id FROM annotations ORDER BY message_id") == [(1,), (404,), (405,)]
+    columns = [row[1] for row in query(orphaned_database, "PRAGMA table_info(annotations)")]
+    assert "chat_room_id" not in columns
+
+
+def test_chat_room_backfill_deletes_orphans_when_asked(orphaned_database, monkeypatch, caplog):
+    monkeypatch.setenv("DELETE_ORPHAN_ANNOTATIONS", "1")
+
+    with caplog.at_level(logging.WARNING, logger="alembic.runtime.migration"):
+        migrate(f"sqlite:///{orphaned_database}", "5d2e8f4a1c69")
+
+    assert "Deleting 2 annotation(s) whose message no longer exists" in caplog.text
+    assert query(orphaned_database, "SELECT message_id, chat_room_id FROM annotations") == [(1, 7)]
+
+
+def test_chat_room_backfill_without_orphans_logs_nothing(tmp_path, caplog):
+    with caplog.at_level(logging.WARNING, logger="alembic.runtime.migration"):
+        migrate(f"sqlite:///{os.path.join(tmp_path, 'clean.db')}")
+    assert "Deleting" not in caplog.text
@@ -0,0 +1,24 @@
+"""The caller's annotations across a project, with room and message context."""
+from tests.factories import annotate, auth_headers, make_chat_room, make_project, make_user, message_ids
+
+
+def test_my_annotations_include_room_and_message_context(app_client, db):
+    caller, other = make_user(db), make_user(db)
+    project = make_project(db, caller, other)
+    room = make_chat_room(db, project, 2)
+    ids = message_ids(db, room)
+    annotate(db, room, caller, {ids[1]: "a"})
+    annotate(db, room, other, dict.fromkeys(ids, "b"))
+    other_project_room = make_chat_room(db, make_project(db, caller), 1)
+    annotate(db, other_project_room, caller, dict.fromkeys(message_ids(db, other_project_room), "a"))
+
+    response = app_client.get(f"/projects/{project.id}/annotations/my", headers=auth_headers(caller))
+
+    assert response.status_code == 200, response.text
+    (annotation,) = response.json()
+    assert annotation["message_id"] == ids[1]
+    assert annotation["thread_id"] == "a"
+    assert annotation["annotator_email"] == caller.email
+    assert annotation["chat_room_id"] == room.id
+    assert annotation["chat_room_name"] == room.name
+    assert (annotation["message_turn_id"], annotation["message_text"]) == ("t1", "message 1")
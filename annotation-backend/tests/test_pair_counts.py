@@ -0,0 +1,90 @@
+"""The incrementally maintained pair counts must always equal a rebuild from the annotations."""
+import random
+
+from sqlalchemy import delete, event
+
+from app import crud, models
+from tests.factories import annotate, auth_headers, make_chat_room, make_project, make_user, message_ids
+
+
+def pair_counts(db, room):
+    return {
+        (row.annotator_1_id, row.annotator_2_id, row.thread_1, row.thread_2): row.count
+        for row in db.query(models.AnnotationPairCount).filter_by(chat_room_id=room.id)
+    }
+
+
+def assert_matches_rebuild(db, room):
+    incremental = pair_counts(db, room)
+    crud.rebuild_pair_counts(db, room.id)
+    assert incremental == pair_counts(db, room)
+    assert all(count > 0 for count in incremental.values())
+
+
+def test_random_writes_match_rebuild(db):
+    rng = random.Random(3)
+    annotators = [make_user(db) for _ in range(4)]
+    project = make_project(db, *annotators)
+    room = make_chat_room(db, project, 40)
+    ids = message_ids(db, room)
+
+    for _ in range(30):
+        annotator = rng.choice(annotators)
+        chosen = rng.sample(ids, rng.randint(1, 10))
+        if rng.random() < 0.25:
+            crud.update_pair_counts(db, room.id, {(message_id, annotator.id): None for message_id in chosen})
+            db.execute(delete(models.Annotation).where(
+                models.Annotation.annotator_id == annotator.id,
+                models.Annotation.message_id.in_(chosen)
+            ))
+            db.commit()
+        else:
+            annotate(db, room, annotator, {message_id: f"T{rng.randint(0, 3)}" for message_id in chosen})
+
+    assert_matches_rebuild(db, room)
+
+
+def test_endpoint_writes_match_rebuild(db, app_client):
+    annotators = [make_user(db) for _ in range(2)]
+    project = make_project(db, *annotators)
+    room = make_chat_room(db, project, 3)
+    ids = message_ids(db, room)
+    annotate(db, room, annotators[1], dict.fromkeys(ids, "b"))
+
+    headers = auth_headers(annotators[0])
+    created = []
+    for message_id in ids:
+        response = app_client.post(
+            f"/projects/{project.id}/messages/{message_id}/annotations/",
+            json={"message_id": message_id, "thread_id": "a"}, headers=headers
+        )
+        assert response.status_code == 200, response.text
+        created.append(response.json()["id"])
+    response = app_client.delete(
+        f"/projects/{project.id}/messages/{ids[0]}/annotations/{created[0]}", headers=headers
+    )
+    assert response.status_code == 204, response.text
+
+    assert pair_counts(db, room)[(annotators[0].id, annotators[1].id, "a", "b")] == 2
+    assert_matches_rebuild(db, room)
+
+
+def test_room_is_locked_before_the_before_state_is_read(db):
+    annotator = make_user(db)
+    project = make_project(db, annotator)
+    room = make_chat_room(db, project, 2)
+    changes = {(message_ids(db, room)[0], annotator.id): "a"}
+
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split(None, 2)[:2])
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        crud.update_pair_counts(db, room.id, changes)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    db.rollback()
+
+    assert statements[0] == ["UPDATE", "chat_rooms"]
+    assert statements[1][0] == "SELECT"
@@ -0,0 +1,105 @@
+"""Authentication caches: hits skip the database, writes evict, entries expire."""
+import contextlib
+import types
+
+import pytest
+from sqlalchemy import event, update
+
+from app import models, principal_cache
+from app.database import async_engine, engine
+from tests.factories import auth_headers, make_project, make_user
+
+
+@pytest.fixture
+def caching(monkeypatch):
+    """Enable both caches (the test settings disable them with a zero TTL)."""
+    caches = (principal_cache.principal_cache, principal_cache.assignment_cache)
+    for cache in caches:
+        monkeypatch.setattr(cache, "ttl_seconds", 60)
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
+
+
+@contextlib.contextmanager
+def count_queries(table):
+    """Count SELECTs reading the given table on either engine inside the block."""
+    counts = {"selects": 0}
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT") and f"FROM {table}" in statement:
+            counts["selects"] += 1
+
+    engines = [engine, async_engine.sync_engine]
+    for target in engines:
+        event.listen(target, "before_cursor_execute", on_execute)
+    try:
+        yield counts
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", on_execute)
+
+
+def test_second_request_is_served_from_the_cache(app_client, db, caching):
+    user = make_user(db)
+    headers = auth_headers(user)
+
+    with count_queries("users") as counts:
+        first = app_client.get("/auth/me", headers=headers)
+        second = app_client.get("/auth/me", headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert counts == {"selects": 1}
+    assert isinstance(principal_cache.get_cached_user(user.email), principal_cache.Principal)
+
+
+def test_deleting_a_user_evicts_their_principal(app_client, db, caching):
+    user = make_user(db)
+    headers = auth_headers(user)
+    assert app_client.get("/auth/me", headers=headers).status_code == 200
+
+    admin_headers = auth_headers(make_user(db, is_admin=True))
+    assert app_client.delete(f"/admin/users/{user.id}", headers=admin_headers).status_code == 204
+
+    assert principal_cache.get_cached_user(user.email) is None
+    assert app_client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_assignment_changes_evict_project_access(app_client, db, caching):
+    user = make_user(db)
+    project = make_project(db, user)
+    headers = auth_headers(user)
+    admin_headers = auth_headers(make_user(db, is_admin=True))
+    url = f"/projects/{project.id}/annotations/my"
+    assign_url = f"/projects/{project.id}/assign/{user.id}"
+
+    assert app_client.get(url, headers=headers).status_code == 200
+    assert principal_cache.get_cached_assignment(user.id, project.id) is True
+
+    assert app_client.delete(assign_url, headers=admin_headers).status_code == 204
+    assert principal_cache.get_cached_assignment(user.id, project.id) is None
+    assert app_client.get(url, headers=headers).status_code == 403
+    assert principal_cache.get_cached_assignment(user.id, project.id) is False
+
+    assert app_client.post(assign_url, headers=admin_headers).status_code == 204
+    assert principal_cache.get_cached_assignment(user.id, project.id) is None
+    assert app_client.get(url, headers=headers).status_code == 200
+
+
+def test_entries_expire_after_the_ttl(app_client, db, caching, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(principal_cache, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    user = make_user(db)
+    headers = auth_headers(user)
+    assert app_client.get("/auth/me", headers=headers).json()["is_admin"] is False
+
+    # Not an invalidating write, so only the TTL ends the stale entry
+    db.execute(update(models.User).where(models.User.id == user.id).values(is_admin=True))
+    db.commit()
+    now[0] += 59
+    assert app_client.get("/auth/me", headers=headers).json()["is_admin"] is False
+
+    now[0] += 2
+    assert principal_cache.get_cached_user(user.email) is None
+    assert app_client.get("/auth/me", headers=headers).json()["is_admin"] is True
@@ -0,0 +1,227 @@
+"""
+Query plans of the hot annotation read/write paths.
+
+Each path runs through the real crud and router functions against its own
+seeded and ANALYZEd SQLite database built by the Alembic migrations. Every
+SELECT/UPDATE/DELETE it issues is checked with EXPLAIN QUERY PLAN: it must
+search an index instead of scanning a large table, must not sort in a temp
+b-tree unless the path declares it, and must use the path's expected indexes.
+See docs/query_plans.md.
+"""
+import os
+import random
+import re
+from types import SimpleNamespace
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models, schemas
+from app.api import annotations as annotations_api
+from app.api import projects as projects_api
+from app.database import create_db_engine
+from tests.conftest import migrate
+
+# Tables that grow with the data set; scanning one of them is a regression
+LARGE_TABLES = ("annotations", "chat_messages", "annotation_pair_counts")
+SCAN_PATTERN = re.compile(r"^SCAN (\w+)")
+SORT_DETAIL = "USE TEMP B-TREE FOR ORDER BY"
+
+ROOMS_PER_PROJECT = 2
+MESSAGES_PER_ROOM = 2000
+ANNOTATORS = 6
+
+
+class HotPath(NamedTuple):
+    name: str
+    run: Callable  # fn(db, seed) exercising the path
+    uses: Tuple[str, ...] = ()  # Indexes that must appear in the plans
+    sorts: bool = False  # Whether sorting in a temp b-tree is expected (ORDER BY across a join)
+
+
+def seed_database(SessionFactory, rooms: int, messages: int, annotators: int) -> SimpleNamespace:
+    """
+    Two projects with the given number of rooms each. Every annotator is assigned
+    to both projects and annotates every message of half of the rooms.
+    """
+    rng = random.Random(0)
+    db = SessionFactory()
+    try:
+        users = [
+            models.User(email=f"annotator{i}@example.com", hashed_password="x", is_admin=False)
+            for i in range(annotators)
+        ]
+        db.add_all(users)
+        db.flush()
+        room_ids = []
+        for p in range(2):
+            project = models.Project(name=f"project {p}")
+            db.add(project)
+            db.flush()
+            db.add_all(models.ProjectAssignment(project_id=project.id, user_id=user.id) for user in users)
+            for r in range(rooms):
+                room = models.ChatRoom(name=f"room {p}.{r}", project_id=project.id)
+                db.add(room)
+                db.flush()
+                room_ids.append((project.id, room.id))
+                db.add_all(
+                    models.ChatMessage(
+                        turn_id=f"t{i}", user_id=f"u{i % 7}", turn_text=f"message {i}",
+                        reply_to_turn=f"t{i - 1}" if i else None, chat_room_id=room.id
+                    )
+                    for i in range(messages)
+                )
+                db.flush()
+                message_ids = crud.get_message_id_map_by_room(db, room.id)
+                crud.upsert_annotations(db, [
+                    {"message_id": message_id, "chat_room_id": room.id, "annotator_id": user.id,
+                     "project_id": project.id, "thread_id": f"T{rng.randint(0, 20)}"}
+                    for message_id in message_ids.values()
+                    for i, user in enumerate(users)
+                    if (i + len(room_ids)) % 2
+                ])
+                crud.rebuild_pair_counts(db, room.id)
+        db.commit()
+        db.connection().exec_driver_sql("ANALYZE")
+        db.commit()
+        project_id, room_id = room_ids[0]
+        return SimpleNamespace(
+            project_id=project_id,
+            room_id=room_id,
+            annotator_id=users[0].id,
+            annotator=SimpleNamespace(id=users[0].id, email=users[0].email, is_admin=False),
+        )
+    finally:
+        db.close()
+
+
+def first_message_id(db, seed) -> int:
+    return crud.get_chat_message_page(db, seed.room_id, limit=1)[0][0].id
+
+
+def thread_of(db, seed, message_id: int) -> str:
+    return db.query(models.Annotation.thread_id).filter_by(
+        message_id=message_id, annotator_id=seed.annotator_id
+    ).scalar()
+
+
+HOT_PATHS = [
+    HotPath("my annotations (project, annotator)",
+            lambda db, s: annotations_api.get_my_annotations(s.project_id, db, s.annotator, None),
+            uses=("ix_annotations_project_annotator",), sorts=True),
+    HotPath("annotations of a message",
+            lambda db, s: annotations_api.get_message_annotations(
+                s.project_id, first_message_id(db, s), db, s.annotator, None)),
+    HotPath("room annotations of one annotator",
+            lambda db, s: crud.get_annotations_for_chat_room_by_annotator(db, s.room_id, s.annotator_id),
+            uses=("ix_annotations_chatroom_annotator",)),
+    HotPath("room annotations of all annotators",
+            lambda db, s: crud.get_all_annotations_for_chat_room_admin(db, s.room_id),
+            uses=("ix_annotations_chatroom_annotator",)),
+    HotPath("annotations of an annotator",
+            lambda db, s: crud.get_annotations_by_annotator(db, s.annotator_id)),
+    HotPath("room messages (created_at order, skip/limit)",
+            lambda db, s: projects_api.get_chat_messages(s.project_id, s.room_id, 500, 100, db, s.annotator),
+            uses=("ix_chat_messages_chatroom_created",)),
+    HotPath("room message page (keyset)",
+            lambda db, s: crud.get_chat_message_page(db, s.room_id, cursor=500, limit=100),
+            uses=("ix_chat_messages_chatroom_id",)),
+    HotPath("room snapshot",
+            lambda db, s: crud.get_chat_room_snapshot(db, s.room_id, s.annotator_id)),
+    HotPath("aggregated room annotations",
+            lambda db, s: crud.get_aggregated_annotations_for_chat_room(db, s.room_id)),
+    HotPath("room export",
+            lambda db, s: (crud.get_chat_room_export_metadata(db, db.get(models.ChatRoom, s.room_id)),
+                           list(crud.iter_chat_room_export_messages(db, s.room_id)))),
+    HotPath("pair counts read",
+            lambda db, s: crud.get_pair_count_matrices(db, s.room_id)),
+    HotPath("annotation batch write",
+            lambda db, s: crud.write_annotation_batch(db, db.get(models.ChatRoom, s.room_id), s.annotator_id, [
+                schemas.AnnotationBase(message_id=first_message_id(db, s), thread_id="batch")
+            ])),
+    HotPath("thread rename",
+            lambda db, s: crud.rename_thread(
+                db, s.room_id, s.annotator_id, thread_of(db, s, first_message_id(db, s)), "renamed"),
+            uses=("ix_annotations_chatroom_annotator",)),
+    HotPath("version bump for a user",
+            lambda db, s: crud.bump_annotation_versions_for_user(db, s.annotator_id)),
+]
+
+
+def plan_problems(plan: List[str], sorts: bool) -> List[str]:
+    """Plan lines that scan a large table, or sort when the path should read in index order."""
+    problems = []
+    for detail in plan:
+        match = SCAN_PATTERN.match(detail)
+        if match and any(match.group(1).startswith(table) for table in LARGE_TABLES):
+            problems.append(detail)
+        elif detail == SORT_DETAIL and not sorts:
+            problems.append(detail)
+    return problems
+
+
+@pytest.fixture(scope="module")
+def plan_database(tmp_path_factory):
+    """Seeded database plus a list that collects the statements its engine issues."""
+    database_url = f"sqlite:///{os.path.join(tmp_path_factory.mktemp('plans'), 'plans.db')}"
+    migrate(database_url)
+    engine = create_db_engine(database_url)
+    SessionFactory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    seed = seed_database(SessionFactory, ROOMS_PER_PROJECT, MESSAGES_PER_ROOM, ANNOTATORS)
+
+    captured = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE"):
+            captured.append((statement, parameters))
+
+    yield SessionFactory, captured, seed
+    engine.dispose()
+
+
+def explain_path(plan_database, path: HotPath) -> List[Tuple[str, List[str]]]:
+    """Run one hot path and return (statement, plan) for every statement it issued."""
+    SessionFactory, captured, seed = plan_database
+    with SessionFactory() as db:
+        captured.clear()
+        path.run(db, seed)
+        statements = list(captured)
+        db.rollback()
+        connection = db.connection()
+        return [
+            (statement, [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)])
+            for statement, parameters in statements
+        ]
+
+
+def describe(statement: str, plan: List[str]) -> str:
+    return " ".join(statement.split())[:300] + "\n" + "\n".join(f"  {detail}" for detail in plan)
+
+
+@pytest.mark.parametrize("path", HOT_PATHS, ids=[path.name for path in HOT_PATHS])
+def test_hot_path_searches_indexes(plan_database, path):
+    explained = explain_path(plan_database, path)
+    assert explained, "the path issued no statements"
+
+    for statement, plan in explained:
+        assert not plan_problems(plan, path.sorts), describe(statement, plan)
+
+    used = " ".join(detail for _, plan in explained for detail in plan) + " "
+    for index in path.uses:
+        assert f"INDEX {index} " in used, f"expected index not used: {index}\n" + "\n".join(
+            describe(statement, plan) for statement, plan in explained
+        )
+
+
+def test_plan_problems_flags_scans_and_unexpected_sorts():
+    plan = [
+        "SCAN annotations",
+        "SEARCH chat_messages USING INDEX ix_chat_messages_chatroom_id (chat_room_id=?)",
+        "SCAN projects",
+        SORT_DETAIL,
+    ]
+    assert plan_problems(plan, sorts=False) == ["SCAN annotations", SORT_DETAIL]
+    assert plan_problems(plan, sorts=True) == ["SCAN annotations"]
@@ -0,0 +1,72 @@
+"""Chat room snapshot endpoint and its ETag / 304 revalidation."""
+import pytest
+
+from tests.factories import auth_headers, make_chat_room, make_project, make_user, message_ids
+
+
+@pytest.fixture
+def snapshot_setup(db):
+    annotators = [make_user(db) for _ in range(2)]
+    project = make_project(db, *annotators)
+    room = make_chat_room(db, project, 3)
+    url = f"/projects/{project.id}/chat-rooms/{room.id}/snapshot"
+    return project, room, url, [auth_headers(annotator) for annotator in annotators]
+
+
+def annotate_through_api(app_client, project, message_id, thread_id, headers):
+    response = app_client.post(
+        f"/projects/{project.id}/messages/{message_id}/annotations/",
+        json={"message_id": message_id, "thread_id": thread_id}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def test_unchanged_snapshot_revalidates_with_304(app_client, snapshot_setup):
+    _, _, url, (headers, _) = snapshot_setup
+
+    first = app_client.get(url, headers=headers)
+    assert first.status_code == 200, first.text
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    for if_none_match in [etag, f'W/"stale", {etag}', "*"]:
+        revalidated = app_client.get(url, headers={**headers, "If-None-Match": if_none_match})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["ETag"] == etag
+
+    unrelated = app_client.get(url, headers={**headers, "If-None-Match": 'W/"stale"'})
+    assert unrelated.status_code == 200
+
+
+def test_annotation_writes_change_the_etag(app_client, db, snapshot_setup):
+    project, room, url, (headers, other_headers) = snapshot_setup
+    ids = message_ids(db, room)
+
+    first = app_client.get(url, headers=headers)
+    etag = first.headers["ETag"]
+    assert first.json()["thread_ids"] == [None, None, None]
+
+    annotation_id = annotate_through_api(app_client, project, ids[1], "a", headers)
+    changed = app_client.get(url, headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["version"] > first.json()["version"]
+    assert changed.json()["thread_ids"] == [None, "a", None]
+    assert changed.json()["annotation_ids"] == [None, annotation_id, None]
+
+    # Another annotator's write bumps the room version too
+    etag = changed.headers["ETag"]
+    annotate_through_api(app_client, project, ids[0], "b", other_headers)
+    assert app_client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 200
+
+
+def test_etag_is_per_user(app_client, snapshot_setup):
+    _, _, url, (headers, other_headers) = snapshot_setup
+    etag = app_client.get(url, headers=headers).headers["ETag"]
+
+    other = app_client.get(url, headers={**other_headers, "If-None-Match": etag})
+    assert other.status_code == 200
+    assert other.headers["ETag"] != etag
+    assert other.headers["Vary"] == "Authorization"
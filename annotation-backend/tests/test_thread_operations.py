@@ -0,0 +1,84 @@
+"""Thread rename, merge and split relabel only the caller's thread in one room."""
+import pytest
+
+from app import models
+from tests.factories import annotate, auth_headers, make_chat_room, make_project, make_user, message_ids
+from tests.test_pair_counts import assert_matches_rebuild
+
+CALLER_THREADS = ["a", "a", "b", "a", "b", "a"]
+
+
+@pytest.fixture
+def thread_setup(db):
+    caller, other = make_user(db), make_user(db)
+    project = make_project(db, caller, other)
+    room, other_room = make_chat_room(db, project, 6), make_chat_room(db, project, 2)
+    ids = message_ids(db, room)
+    annotate(db, room, caller, dict(zip(ids, CALLER_THREADS)))
+    annotate(db, room, other, dict.fromkeys(ids, "a"))
+    annotate(db, other_room, caller, dict.fromkeys(message_ids(db, other_room), "a"))
+    return project, room, other_room, ids, caller, other
+
+
+def threads_by_annotator(db, room):
+    threads = {}
+    for annotator_id, thread_id in (
+        db.query(models.Annotation.annotator_id, models.Annotation.thread_id)
+        .filter_by(chat_room_id=room.id)
+        .order_by(models.Annotation.message_id)
+    ):
+        threads.setdefault(annotator_id, []).append(thread_id)
+    return threads
+
+
+def run_operation(app_client, project, room, caller, operation, **body):
+    return app_client.post(
+        f"/projects/{project.id}/chat-rooms/{room.id}/threads/{operation}", json=body, headers=auth_headers(caller)
+    )
+
+
+@pytest.mark.parametrize("operation, body, updated_count, expected", [
+    ("merge", {"thread_id": "b", "target_thread_id": "a"}, 2, ["a"] * 6),
+    ("rename", {"thread_id": "a", "new_thread_id": "c"}, 4, ["c", "c", "b", "c", "b", "c"]),
+    ("split", {"thread_id": "a", "message_index": 3, "new_thread_id": "c"}, 2, ["a", "a", "b", "c", "b", "c"]),
+    ("split", {"thread_id": "a", "message_index": 0, "new_thread_id": "c"}, 4, ["c", "c", "b", "c", "b", "c"]),
+    ("split", {"thread_id": "b", "message_index": 4, "new_thread_id": "c"}, 1, ["a", "a", "b", "a", "c", "a"]),
+])
+def test_relabels_only_the_callers_thread(app_client, db, thread_setup, operation, body, updated_count, expected):
+    project, room, other_room, ids, caller, other = thread_setup
+    if "message_index" in body:
+        body["message_id"] = ids[body.pop("message_index")]
+    version = room.annotation_version
+    other_room_threads = threads_by_annotator(db, other_room)
+
+    response = run_operation(app_client, project, room, caller, operation, **body)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["updated_count"] == updated_count
+    db.expire_all()
+    assert threads_by_annotator(db, room) == {caller.id: expected, other.id: ["a"] * 6}
+    assert threads_by_annotator(db, other_room) == other_room_threads
+    assert db.get(models.ChatRoom, room.id).annotation_version == version + 1
+    assert_matches_rebuild(db, room)
+
+
+@pytest.mark.parametrize("operation, body, status_code", [
+    ("rename", {"thread_id": "a", "new_thread_id": "b"}, 409),
+    ("rename", {"thread_id": "a", "new_thread_id": "a"}, 400),
+    ("rename", {"thread_id": "missing", "new_thread_id": "c"}, 404),
+    ("merge", {"thread_id": "a", "target_thread_id": "a"}, 400),
+    ("merge", {"thread_id": "a", "target_thread_id": "missing"}, 404),
+    ("split", {"thread_id": "a", "message_index": 2, "new_thread_id": "c"}, 404),
+    ("split", {"thread_id": "a", "message_index": 3, "new_thread_id": "b"}, 409),
+])
+def test_rejected_operations_change_nothing(app_client, db, thread_setup, operation, body, status_code):
+    project, room, _, ids, caller, _ = thread_setup
+    if "message_index" in body:
+        body["message_id"] = ids[body.pop("message_index")]
+    before = threads_by_annotator(db, room), room.annotation_version
+
+    response = run_operation(app_client, project, room, caller, operation, **body)
+
+    assert response.status_code == status_code, response.text
+    db.expire_all()
+    assert (threads_by_annotator(db, room), db.get(models.ChatRoom, room.id).annotation_version) == before
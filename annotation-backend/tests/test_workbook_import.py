@@ -0,0 +1,50 @@
+"""Single-transaction workbook import."""
+from app import crud, models, schemas
+from tests.factories import make_chat_room, make_project, make_user
+
+
+def workbook(*emails: str) -> schemas.WorkbookImport:
+    return schemas.WorkbookImport(
+        chat_room={"name": "workbook room"},
+        messages=[{"turn_id": f"t{i}", "user_id": "u", "turn_text": f"message {i}"} for i in range(3)],
+        annotators=[
+            {"annotator_email": email, "annotator_name": email, "password": "secret",
+             "annotations": [{"turn_id": f"t{i}", "thread_id": "a"} for i in range(3)]}
+            for email in emails
+        ]
+    )
+
+
+def test_only_missing_assignments_are_added(db):
+    assigned = make_user(db)
+    unassigned = make_user(db)
+    project = make_project(db, assigned)
+    other_room = make_chat_room(db, project, 1)
+    version = other_room.annotation_version
+
+    response = crud.import_chat_room_workbook(
+        db, project.id, workbook(assigned.email, unassigned.email, "new.annotator@example.com")
+    )
+
+    assert response.users_created == ["new.annotator@example.com"]
+    assert response.users_assigned == 2
+    assert response.total_imported == 9
+    assigned_ids = {assignment.user_id for assignment in crud.get_project_assignments_by_project(db, project.id)}
+    assert assigned_ids == {assigned.id, unassigned.id, crud.get_user_by_email(db, "new.annotator@example.com").id}
+    # New assignments change the annotator set of every room in the project
+    db.refresh(other_room)
+    assert other_room.annotation_version > version
+
+
+def test_reimport_with_everyone_assigned_adds_nothing(db):
+    annotator = make_user(db)
+    project = make_project(db, annotator)
+    other_room = make_chat_room(db, project, 1)
+    version = other_room.annotation_version
+
+    response = crud.import_chat_room_workbook(db, project.id, workbook(annotator.email))
+
+    assert response.users_assigned == 0
+    assert db.query(models.ProjectAssignment).filter_by(project_id=project.id).count() == 1
+    db.refresh(other_room)
+    assert other_room.annotation_version == version
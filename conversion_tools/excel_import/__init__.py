@@ -8,6 +8,7 @@ chat room annotations into the annotation system.
 from .excel_parser import ExcelChatRoomParser
 from .data_transformer import ChatRoomDataTransformer
 from .api_client import AnnotationAPIClient
+from .async_api_client import AsyncAnnotationAPIClient
 from .batch_import_manager import BatchExcelImportManager
 
 __version__ = "1.0.0"
@@ -15,5 +16,6 @@ __all__ = [
     "ExcelChatRoomParser",
     "ChatRoomDataTransformer", 
     "AnnotationAPIClient",
+    "AsyncAnnotationAPIClient",
     "BatchExcelImportManager"
 ] 
\ No newline at end of file
@@ -7,8 +7,6 @@ handling authentication, user management, and data import operations.
 
 import requests
 import time
-import tempfile
-import os
 from typing import Dict, List, Any, Optional, Tuple
 from urllib.parse import urljoin
 import logging
@@ -86,6 +84,20 @@ class AnnotationAPIClient:
         
         return response
     
+    def _upload_csv(self, endpoint: str, filename: str, csv_data: str,
+                    data: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        POST CSV data as a multipart file upload built in memory.
+        
+        Goes through the session so the upload reuses its pooled keep-alive
+        connection. The session's JSON Content-Type is dropped for this request
+        (a None header value removes it) so requests sets the multipart boundary.
+        """
+        files = {'file': (filename, csv_data.encode('utf-8'), 'text/csv')}
+        return self._make_request(
+            'POST', f'{self.base_url}{endpoint}', files=files, data=data, headers={'Content-Type': None}
+        )
+    
     def check_health(self) -> bool:
         """
         Check if the API is healthy and reachable.
@@ -250,48 +262,23 @@ class AnnotationAPIClient:
         Raises:
             APIError: If operation fails
         """
-        # Create temporary file in binary mode to avoid encoding issues
-        with tempfile.NamedTemporaryFile(mode='w+b', suffix='.csv', delete=False) as f:
-            f.write(messages_csv.encode('utf-8'))
-            temp_file_path = f.name
-        
         try:
-            # Re-open the file to be sent
-            with open(temp_file_path, 'rb') as f_to_send:
-                files = {'file': (f'{name}.csv', f_to_send, 'text/csv')}
-                
-                # Create completely fresh headers with only Authorization
-                # DO NOT use session headers which contain Content-Type: application/json
-                headers = {
-                    'Authorization': self.session.headers.get('Authorization')
-                }
-                
-                url = f"{self.base_url}/admin/projects/{project_id}/import-chat-room-csv"
-                
-                # Use requests.post directly instead of session.post to avoid header pollution
-                response = requests.post(
-                    url,
-                    files=files,
-                    headers=headers,
-                    timeout=self.timeout
-                )
+            response = self._upload_csv(
+                f'/admin/projects/{project_id}/import-chat-room-csv', f'{name}.csv', messages_csv
+            )
+            
+            if response.status_code in [200, 201]:
+                result = response.json()
+                chat_room_id = result['chat_room']['id']
+                logger.info(f"Created chat room and imported messages: {name} (ID: {chat_room_id})")
+                return result
+            else:
+                raise APIError(f"Failed to create chat room and import messages for {name}: {response.text}")
                 
-                if response.status_code in [200, 201]:
-                    result = response.json()
-                    chat_room_id = result['chat_room']['id']
-                    logger.info(f"Created chat room and imported messages: {name} (ID: {chat_room_id})")
-                    return result
-                else:
-                    raise APIError(f"Failed to create chat room and import messages for {name}: {response.text}")
-                    
         except APIError:
             raise
         except Exception as e:
             raise APIError(f"Error creating chat room and importing messages for {name}: {str(e)}")
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
     
     def import_chat_messages(self, chat_room_id: int, messages_csv: str) -> Dict[str, Any]:
         """
@@ -307,43 +294,22 @@ class AnnotationAPIClient:
         Raises:
             APIError: If import fails
         """
-        # Create temporary file in binary mode to avoid encoding issues
-        with tempfile.NamedTemporaryFile(mode='w+b', suffix='.csv', delete=False) as f:
-            f.write(messages_csv.encode('utf-8'))
-            temp_file_path = f.name
-        
         try:
-            with open(temp_file_path, 'rb') as f_to_send:
-                files = {'file': ('messages.csv', f_to_send, 'text/csv')}
-                
-                # Create completely fresh headers with only Authorization
-                headers = {
-                    'Authorization': self.session.headers.get('Authorization')
-                }
-
-                # Use requests.post directly to avoid header pollution
-                response = requests.post(
-                    f'{self.base_url}/admin/chat-rooms/{chat_room_id}/import-csv',
-                    files=files,
-                    headers=headers,
-                    timeout=self.timeout
-                )
+            response = self._upload_csv(
+                f'/admin/chat-rooms/{chat_room_id}/import-csv', 'messages.csv', messages_csv
+            )
+            
+            if response.status_code in [200, 201]:
+                result = response.json()
+                logger.info(f"Imported {result.get('imported_count', 0)} messages to chat room {chat_room_id}")
+                return result
+            else:
+                raise APIError(f"Failed to import messages: {response.text}")
                 
-                if response.status_code in [200, 201]:
-                    result = response.json()
-                    logger.info(f"Imported {result.get('imported_count', 0)} messages to chat room {chat_room_id}")
-                    return result
-                else:
-                    raise APIError(f"Failed to import messages: {response.text}")
-                    
         except APIError:
             raise
         except Exception as e:
             raise APIError(f"Error importing messages: {str(e)}")
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
     
     def import_annotations(self, chat_room_id: int, user_id: int, annotations_csv: str) -> Dict[str, Any]:
         """
@@ -360,45 +326,54 @@ class AnnotationAPIClient:
         Raises:
             APIError: If import fails
         """
-        # Create temporary file in binary mode to avoid encoding issues
-        with tempfile.NamedTemporaryFile(mode='w+b', suffix='.csv', delete=False) as f:
-            f.write(annotations_csv.encode('utf-8'))
-            temp_file_path = f.name
-        
         try:
-            with open(temp_file_path, 'rb') as f_to_send:
-                files = {'file': ('annotations.csv', f_to_send, 'text/csv')}
-                data = {'user_id': str(user_id)}
-                
-                # Create completely fresh headers with only Authorization
-                headers = {
-                    'Authorization': self.session.headers.get('Authorization')
-                }
-                
-                # Use requests.post directly to avoid header pollution
-                response = requests.post(
-                    f'{self.base_url}/admin/chat-rooms/{chat_room_id}/import-annotations',
-                    files=files,
-                    data=data,
-                    headers=headers,
-                    timeout=self.timeout
-                )
+            response = self._upload_csv(
+                f'/admin/chat-rooms/{chat_room_id}/import-annotations', 'annotations.csv', annotations_csv,
+                data={'user_id': str(user_id)}
+            )
+            
+            if response.status_code in [200, 201]:
+                result = response.json()
+                logger.info(f"Imported {result.get('imported_count', 0)} annotations for user {user_id}")
+                return result
+            else:
+                raise APIError(f"Failed to import annotations: {response.text}")
                 
-                if response.status_code in [200, 201]:
-                    result = response.json()
-                    logger.info(f"Imported {result.get('imported_count', 0)} annotations for user {user_id}")
-                    return result
-                else:
-                    raise APIError(f"Failed to import annotations: {response.text}")
-                    
         except APIError:
             raise
         except Exception as e:
             raise APIError(f"Error importing annotations: {str(e)}")
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+    
+    def import_workbook(self, project_id: int, workbook: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Import a whole workbook (chat room, messages, annotators and their annotations)
+        in a single request. The server applies it in one transaction.
+        
+        Args:
+            project_id: Project ID
+            workbook: Payload built by ChatRoomDataTransformer.prepare_workbook_payload
+            
+        Returns:
+            Import result with the created chat room and per-annotator statistics
+            
+        Raises:
+            APIError: If the import fails (nothing is stored in that case)
+        """
+        name = workbook['chat_room']['name']
+        try:
+            response = self._make_request('POST', f'/admin/projects/{project_id}/import-workbook', json=workbook)
+            
+            if response.status_code in [200, 201]:
+                result = response.json()
+                logger.info(f"Imported workbook: {name} (chat room ID: {result['chat_room']['id']})")
+                return result
+            else:
+                raise APIError(f"Failed to import workbook {name}: {response.text}")
+                
+        except APIError:
+            raise
+        except Exception as e:
+            raise APIError(f"Error importing workbook {name}: {str(e)}")
     
     def get_projects(self) -> List[Dict[str, Any]]:
         """
@@ -0,0 +1,461 @@
+"""
+Async API Client for Annotation System
+
+Asynchronous variant of AnnotationAPIClient built on httpx. All requests go
+through one pooled keep-alive connection pool, multipart uploads are sent from
+memory, at most `concurrency` requests are in flight at once, and transient
+failures are retried with exponential backoff. Use it to push many workbooks
+concurrently so bulk imports are bound by the backend instead of the client.
+
+Example:
+    async with AsyncAnnotationAPIClient(url, email, password, concurrency=8) as client:
+        await client.authenticate()
+        results = await client.import_workbooks(project_id, workbooks)
+"""
+
+import asyncio
+import logging
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from .api_client import APIError
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean the server did not process the request (rejected or overloaded)
+RETRYABLE_STATUSES = {429, 503}
+# Gateway errors may come after the backend processed the request; only retried for idempotent methods
+RETRYABLE_GATEWAY_STATUSES = {502, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+
+class AsyncAnnotationAPIClient:
+    """
+    Async client for the annotation API.
+
+    Mirrors the methods of AnnotationAPIClient as coroutines. Must be closed
+    with `aclose()` or used as an async context manager.
+    """
+
+    def __init__(self,
+                 base_url: str,
+                 admin_email: str,
+                 admin_password: str,
+                 timeout: int = 30,
+                 concurrency: int = 4,
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 max_backoff: float = 30.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Initialize the async API client.
+
+        Args:
+            base_url: Base URL of the API
+            admin_email: Admin email for authentication
+            admin_password: Admin password for authentication
+            timeout: Request timeout in seconds
+            concurrency: Maximum number of requests in flight (and pooled connections)
+            max_retries: Retries after the first attempt for transient failures
+            backoff_factor: Base delay in seconds; attempt n waits backoff_factor * 2**n (with jitter)
+            max_backoff: Upper bound for a single backoff delay
+            transport: Optional custom transport (e.g. httpx.MockTransport for a local stub server)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.admin_email = admin_email
+        self.admin_password = admin_password
+        self.timeout = timeout
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max(0, max_retries)
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.access_token = None
+        self.current_project_id = None
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        limits = httpx.Limits(
+            max_connections=self.concurrency,
+            max_keepalive_connections=self.concurrency
+        )
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={'Accept': 'application/json'},
+            timeout=httpx.Timeout(timeout),
+            limits=limits,
+            transport=transport
+        )
+
+    async def __aenter__(self) -> 'AsyncAnnotationAPIClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        await self.client.aclose()
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Delay before retry number `attempt` (0-based), honouring a Retry-After header in seconds."""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        delay = self.backoff_factor * (2 ** attempt)
+        return min(delay * random.uniform(0.5, 1.5), self.max_backoff)
+
+    async def _make_request(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
+        """
+        Make an HTTP request with concurrency limiting, retries and error handling.
+
+        Connection failures (nothing was sent) and 429/503 responses are retried for
+        every method. Read timeouts and 502/504 responses are only retried for
+        idempotent methods, since the backend may already have applied the request.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint
+            **kwargs: Additional arguments for httpx
+
+        Returns:
+            Response object (of the last attempt)
+
+        Raises:
+            APIError: If the request fails after all retries
+        """
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS
+
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                async with self._semaphore:
+                    response = await self.client.request(method, endpoint, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                if last_attempt:
+                    raise APIError(f"Cannot connect to API at {self.base_url}: {str(e)}")
+                delay = self._backoff_delay(attempt)
+            except httpx.TimeoutException:
+                if last_attempt or not idempotent:
+                    raise APIError(f"Request timed out after {self.timeout} seconds")
+                delay = self._backoff_delay(attempt)
+            except httpx.TransportError as e:
+                if last_attempt or not idempotent:
+                    raise APIError(f"Request failed: {str(e)}")
+                delay = self._backoff_delay(attempt)
+            else:
+                retryable = (
+                    response.status_code in RETRYABLE_STATUSES
+                    or (idempotent and response.status_code in RETRYABLE_GATEWAY_STATUSES)
+                )
+                if not retryable or last_attempt:
+                    return response
+                delay = self._backoff_delay(attempt, response.headers.get('Retry-After'))
+
+            logger.debug(f"{method} {endpoint} failed (attempt {attempt + 1}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        raise APIError(f"Request failed: {method} {endpoint}")  # Unreachable
+
+    async def _upload_csv(self, endpoint: str, filename: str, csv_data: str,
+                          data: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """POST CSV data as a multipart file upload built in memory."""
+        files = {'file': (filename, csv_data.encode('utf-8'), 'text/csv')}
+        return await self._make_request('POST', endpoint, files=files, data=data)
+
+    async def check_health(self) -> bool:
+        """
+        Check if the API is healthy and reachable.
+
+        Returns:
+            True if API is healthy
+
+        Raises:
+            APIError: If API is not reachable
+        """
+        response = await self._make_request('GET', '/')
+        if response.status_code == 200:
+            logger.info(f"API is healthy at {self.base_url}")
+            return True
+        raise APIError(f"API health check failed with status {response.status_code}")
+
+    async def wait_for_api(self, max_attempts: int = 10, wait_time: int = 5) -> bool:
+        """
+        Wait for API to become available.
+
+        Args:
+            max_attempts: Maximum number of attempts
+            wait_time: Time to wait between attempts
+
+        Returns:
+            True if API becomes available
+
+        Raises:
+            APIError: If API doesn't become available
+        """
+        for attempt in range(max_attempts):
+            try:
+                return await self.check_health()
+            except APIError:
+                if attempt < max_attempts - 1:
+                    logger.info(f"API not available, waiting {wait_time}s... (attempt {attempt + 1}/{max_attempts})")
+                    await asyncio.sleep(wait_time)
+        raise APIError(f"API not available after {max_attempts} attempts")
+
+    async def authenticate(self) -> str:
+        """
+        Authenticate with the API and store the access token on the client.
+
+        Returns:
+            Access token
+
+        Raises:
+            APIError: If authentication fails
+        """
+        login_data = {
+            "username": self.admin_email,
+            "password": self.admin_password
+        }
+        # Form data (not JSON) for OAuth2PasswordRequestForm
+        response = await self._make_request('POST', '/auth/token', data=login_data)
+        if response.status_code != 200:
+            raise APIError(f"Authentication failed: {response.text}")
+
+        self.access_token = response.json()['access_token']
+        self.client.headers['Authorization'] = f'Bearer {self.access_token}'
+        logger.info(f"Successfully authenticated as {self.admin_email}")
+        return self.access_token
+
+    async def get_projects(self) -> List[Dict[str, Any]]:
+        """
+        Get list of all projects.
+
+        Returns:
+            List of projects
+
+        Raises:
+            APIError: If operation fails
+        """
+        response = await self._make_request('GET', '/admin/projects')
+        if response.status_code != 200:
+            raise APIError(f"Failed to get projects: {response.text}")
+        projects = response.json()
+        logger.info(f"Retrieved {len(projects)} projects")
+        return projects
+
+    async def get_project(self, project_id: int) -> Dict[str, Any]:
+        """
+        Get project details.
+
+        Args:
+            project_id: Project ID
+
+        Returns:
+            Project details
+
+        Raises:
+            APIError: If operation fails
+        """
+        response = await self._make_request('GET', f'/admin/projects/{project_id}')
+        if response.status_code == 404:
+            raise APIError(f"Project {project_id} not found")
+        if response.status_code != 200:
+            raise APIError(f"Failed to get project {project_id}: {response.text}")
+        return response.json()
+
+    async def create_project(self, name: str, description: str = "") -> Dict[str, Any]:
+        """
+        Create a new project.
+
+        Args:
+            name: Project name
+            description: Project description
+
+        Returns:
+            Created project details
+
+        Raises:
+            APIError: If project creation fails
+        """
+        response = await self._make_request(
+            'POST', '/admin/projects', json={"name": name, "description": description}
+        )
+        if response.status_code not in [200, 201]:
+            raise APIError(f"Failed to create project: Status {response.status_code}: {response.text}")
+        project = response.json()
+        self.current_project_id = project['id']
+        logger.info(f"Created project: {project['name']} (ID: {project['id']})")
+        return project
+
+    async def create_or_get_user(self, email: str, name: str, password: str = "ChangeMe123!") -> int:
+        """
+        Create a new user or get existing user ID.
+
+        Args:
+            email: User email
+            name: User display name
+            password: User password (default temporary password)
+
+        Returns:
+            User ID
+
+        Raises:
+            APIError: If operation fails
+        """
+        response = await self._make_request('GET', '/admin/users')
+        if response.status_code == 200:
+            for user in response.json():
+                if user['email'] == email:
+                    logger.info(f"User already exists: {email} (ID: {user['id']})")
+                    return user['id']
+
+        user_data = {"email": email, "password": password, "is_admin": False}
+        response = await self._make_request('POST', '/admin/users', json=user_data)
+        if response.status_code not in [200, 201]:
+            raise APIError(f"Failed to create user {email}: {response.text}")
+        user_id = response.json()['id']
+        logger.info(f"Created user: {email} (ID: {user_id})")
+        return user_id
+
+    async def assign_user_to_project(self, project_id: int, user_id: int) -> bool:
+        """
+        Assign a user to a project.
+
+        Args:
+            project_id: Project ID
+            user_id: User ID
+
+        Returns:
+            True if successful (or already assigned)
+
+        Raises:
+            APIError: If operation fails
+        """
+        response = await self._make_request('POST', f'/projects/{project_id}/assign/{user_id}')
+        if response.status_code in [200, 201, 204]:
+            logger.info(f"Assigned user {user_id} to project {project_id}")
+            return True
+        if response.status_code == 400 and "already assigned" in response.text.lower():
+            logger.info(f"User {user_id} already assigned to project {project_id}")
+            return True
+        raise APIError(f"Failed to assign user to project: {response.text}")
+
+    async def create_chat_room_and_import_messages(self, project_id: int, name: str,
+                                                   messages_csv: str) -> Dict[str, Any]:
+        """
+        Create a chat room and import messages in one operation.
+
+        Args:
+            project_id: Project ID
+            name: Chat room name
+            messages_csv: CSV data containing messages
+
+        Returns:
+            Combined result with chat room info and import details
+
+        Raises:
+            APIError: If operation fails
+        """
+        response = await self._upload_csv(
+            f'/admin/projects/{project_id}/import-chat-room-csv', f'{name}.csv', messages_csv
+        )
+        if response.status_code not in [200, 201]:
+            raise APIError(f"Failed to create chat room and import messages for {name}: {response.text}")
+        result = response.json()
+        logger.info(f"Created chat room and imported messages: {name} (ID: {result['chat_room']['id']})")
+        return result
+
+    async def import_chat_messages(self, chat_room_id: int, messages_csv: str) -> Dict[str, Any]:
+        """
+        Import chat messages from CSV data.
+
+        Args:
+            chat_room_id: Chat room ID
+            messages_csv: CSV data containing messages
+
+        Returns:
+            Import result
+
+        Raises:
+            APIError: If import fails
+        """
+        response = await self._upload_csv(
+            f'/admin/chat-rooms/{chat_room_id}/import-csv', 'messages.csv', messages_csv
+        )
+        if response.status_code not in [200, 201]:
+            raise APIError(f"Failed to import messages: {response.text}")
+        result = response.json()
+        logger.info(f"Imported {result.get('imported_count', 0)} messages to chat room {chat_room_id}")
+        return result
+
+    async def import_annotations(self, chat_room_id: int, user_id: int, annotations_csv: str) -> Dict[str, Any]:
+        """
+        Import annotations from CSV data.
+
+        Args:
+            chat_room_id: Chat room ID
+            user_id: User ID of the annotator
+            annotations_csv: CSV data containing annotations
+
+        Returns:
+            Import result
+
+        Raises:
+            APIError: If import fails
+        """
+        response = await self._upload_csv(
+            f'/admin/chat-rooms/{chat_room_id}/import-annotations', 'annotations.csv', annotations_csv,
+            data={'user_id': str(user_id)}
+        )
+        if response.status_code not in [200, 201]:
+            raise APIError(f"Failed to import annotations: {response.text}")
+        result = response.json()
+        logger.info(f"Imported {result.get('imported_count', 0)} annotations for user {user_id}")
+        return result
+
+    async def import_workbook(self, project_id: int, workbook: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Import a whole workbook (chat room, messages, annotators and their annotations)
+        in a single request. The server applies it in one transaction.
+
+        Args:
+            project_id: Project ID
+            workbook: Payload built by ChatRoomDataTransformer.prepare_workbook_payload
+
+        Returns:
+            Import result with the created chat room and per-annotator statistics
+
+        Raises:
+            APIError: If the import fails (nothing is stored in that case)
+        """
+        name = workbook['chat_room']['name']
+        response = await self._make_request('POST', f'/admin/projects/{project_id}/import-workbook', json=workbook)
+        if response.status_code not in [200, 201]:
+            raise APIError(f"Failed to import workbook {name}: {response.text}")
+        result = response.json()
+        logger.info(f"Imported workbook: {name} (chat room ID: {result['chat_room']['id']})")
+        return result
+
+    async def import_workbooks(self, project_id: int,
+                               workbooks: List[Dict[str, Any]]) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+        """
+        Import several workbooks concurrently (bounded by `concurrency`).
+
+        Args:
+            project_id: Project ID
+            workbooks: Payloads built by ChatRoomDataTransformer.prepare_workbook_payload
+
+        Returns:
+            One (result, error) pair per workbook, in input order; exactly one of them is None
+        """
+        async def import_one(workbook: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+            try:
+                return await self.import_workbook(project_id, workbook), None
+            except APIError as e:
+                logger.error(str(e))
+                return None, str(e)
+
+        return list(await asyncio.gather(*(import_one(workbook) for workbook in workbooks)))
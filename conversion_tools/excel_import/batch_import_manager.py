@@ -7,16 +7,20 @@ and manages the complete import workflow.
 
 import os
 import glob
+import time
+import asyncio
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import logging
 from tqdm import tqdm
 
 from .excel_parser import ExcelChatRoomParser
 from .data_transformer import ChatRoomDataTransformer
 from .api_client import AnnotationAPIClient, APIError
+from .async_api_client import AsyncAnnotationAPIClient
 
 logger = logging.getLogger(__name__)
 
@@ -37,9 +41,24 @@ class ImportResult:
     details: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class ParsedWorkbook:
+    """
+    Output of the parse stage for one Excel file.
+    
+    Holds only plain data so it can be returned from a parse worker process.
+    """
+    file_path: str
+    base_name: str
+    import_data: Optional[Dict[str, Any]] = None
+    sheets_processed: int = 0
+    error_message: Optional[str] = None
+    parse_time: float = 0.0
+
+
 @dataclass
 class BatchImportResults:
-    """Results of batch import operation."""
+    """Results of batch import operation (results are in input file order)."""
     total_files: int
     successful_imports: int
     failed_imports: int
@@ -50,6 +69,62 @@ class BatchImportResults:
     end_time: Optional[datetime] = None
 
 
+def parse_workbook(file_path: str,
+                   transformer: ChatRoomDataTransformer,
+                   project_id: int) -> ParsedWorkbook:
+    """
+    Parse, validate and transform one Excel file without calling the API.
+    
+    Defined at module level so it can run in a worker process of the parse pool.
+    
+    Args:
+        file_path: Path to the Excel file
+        transformer: Data transformer used to build the import data
+        project_id: Project ID the chat room will be created in
+        
+    Returns:
+        ParsedWorkbook with the import data, or with error_message set
+    """
+    start_time = time.perf_counter()
+    parsed = ParsedWorkbook(file_path=file_path, base_name=Path(file_path).stem)
+    
+    try:
+        # Step 1: Parse Excel file
+        parser = ExcelChatRoomParser(file_path)
+        sheets_data = parser.get_all_sheets_data()
+        
+        if not sheets_data:
+            parsed.error_message = "No valid sheets found in Excel file"
+            return parsed
+        
+        # Step 2: Validate consistency
+        is_consistent, consistency_errors = parser.validate_consistency()
+        if not is_consistent:
+            parsed.error_message = f"Inconsistent data: {'; '.join(consistency_errors)}"
+            return parsed
+        
+        # Step 3: Transform data
+        import_data = transformer.prepare_chat_room_import_data(sheets_data, project_id)
+        
+        # Step 4: Validate import data
+        validation_errors = transformer.validate_import_data(import_data)
+        if validation_errors:
+            parsed.error_message = f"Data validation failed: {'; '.join(validation_errors)}"
+            return parsed
+        
+        parsed.import_data = import_data
+        parsed.sheets_processed = len(sheets_data)
+        
+    except Exception as e:
+        parsed.error_message = str(e)
+        logger.error(f"Failed to parse {file_path}: {e}")
+    
+    finally:
+        parsed.parse_time = time.perf_counter() - start_time
+    
+    return parsed
+
+
 class BatchExcelImportManager:
     """
     Manages batch processing of Excel files for chat room import.
@@ -61,7 +136,9 @@ class BatchExcelImportManager:
                  api_client: AnnotationAPIClient,
                  transformer: Optional[ChatRoomDataTransformer] = None,
                  project_id: int = 1,
-                 skip_existing: bool = True):
+                 skip_existing: bool = True,
+                 workers: int = 1,
+                 upload_workers: Optional[int] = None):
         """
         Initialize the batch import manager.
         
@@ -70,11 +147,18 @@ class BatchExcelImportManager:
             transformer: Data transformer (will create default if None)
             project_id: Project ID to import chat rooms into
             skip_existing: Whether to skip files that might already be imported
+            workers: Parse worker processes; above 1, files are parsed in a process
+                pool while parsed files are uploaded concurrently (pipelined mode)
+            upload_workers: Concurrent uploads in pipelined mode (defaults to workers).
+                Uploads go through an AsyncAnnotationAPIClient with this concurrency,
+                created from the API client's URL, credentials and token.
         """
         self.api_client = api_client
         self.transformer = transformer or ChatRoomDataTransformer()
         self.project_id = project_id
         self.skip_existing = skip_existing
+        self.workers = max(1, workers)
+        self.upload_workers = max(1, upload_workers or self.workers)
         
         # Statistics tracking
         self.total_files_processed = 0
@@ -147,6 +231,30 @@ class BatchExcelImportManager:
         
         return False, ""
     
+    def _resolve_project_id(self) -> int:
+        """Project to import into: the API client's current project if set, else the configured one."""
+        # Always use the API client's current project ID if available
+        # This ensures we use the correct project even if it was created dynamically
+        if hasattr(self.api_client, 'current_project_id') and self.api_client.current_project_id:
+            logger.info(f"Using API client's current project ID: {self.api_client.current_project_id}")
+            return self.api_client.current_project_id
+        
+        logger.info(f"Using configured project ID: {self.project_id}")
+        return self.project_id
+    
+    def _skipped_result(self, file_path: str) -> Optional[ImportResult]:
+        """Return a 'skipped' ImportResult if the file should be skipped, else None."""
+        should_skip, skip_reason = self.should_skip_file(file_path)
+        if not should_skip:
+            return None
+        
+        return ImportResult(
+            file_path=file_path,
+            base_name=Path(file_path).stem,
+            status="skipped",
+            error_message=skip_reason
+        )
+    
     def process_single_file(self, file_path: str, show_progress: bool = True) -> ImportResult:
         """
         Process a single Excel file.
@@ -158,157 +266,261 @@ class BatchExcelImportManager:
         Returns:
             ImportResult object
         """
-        start_time = datetime.now()
         file_path = str(Path(file_path).resolve())
-        base_name = Path(file_path).stem
+        
+        try:
+            # Check if file should be skipped
+            skipped = self._skipped_result(file_path)
+            if skipped:
+                return skipped
+        except Exception as e:
+            logger.error(f"Failed to process {file_path}: {e}")
+            return ImportResult(file_path=file_path, base_name=Path(file_path).stem,
+                                status="error", error_message=str(e))
+        
+        logger.info(f"Processing file: {file_path}")
+        
+        if show_progress:
+            print(f"📖 Parsing Excel file: {Path(file_path).name}")
+        
+        parsed = parse_workbook(file_path, self.transformer, self._resolve_project_id())
+        return self.import_parsed_workbook(parsed, show_progress=show_progress)
+    
+    def import_parsed_workbook(self, parsed: ParsedWorkbook, show_progress: bool = True) -> ImportResult:
+        """
+        Upload a parsed Excel file to the API (the I/O-bound half of process_single_file).
+        
+        Args:
+            parsed: Output of parse_workbook
+            show_progress: Whether to show progress information
+            
+        Returns:
+            ImportResult object
+        """
+        start_time = time.perf_counter()
         
         result = ImportResult(
-            file_path=file_path,
-            base_name=base_name,
+            file_path=parsed.file_path,
+            base_name=parsed.base_name,
             status="processing"
         )
         
         try:
-            # Check if file should be skipped
-            should_skip, skip_reason = self.should_skip_file(file_path)
-            if should_skip:
-                result.status = "skipped"
-                result.error_message = skip_reason
-                return result
-            
-            logger.info(f"Processing file: {file_path}")
-            
-            # Step 1: Parse Excel file
-            if show_progress:
-                print(f"📖 Parsing Excel file: {Path(file_path).name}")
-            
-            parser = ExcelChatRoomParser(file_path)
-            sheets_data = parser.get_all_sheets_data()
-            
-            if not sheets_data:
+            if parsed.error_message:
                 result.status = "error"
-                result.error_message = "No valid sheets found in Excel file"
+                result.error_message = parsed.error_message
                 return result
             
-            # Step 2: Validate consistency
-            is_consistent, consistency_errors = parser.validate_consistency()
-            if not is_consistent:
-                result.status = "error"
-                result.error_message = f"Inconsistent data: {'; '.join(consistency_errors)}"
-                return result
+            import_data = parsed.import_data
             
-            # Step 3: Transform data
+            # Step 5: Import chat room, messages, users and annotations in one request
             if show_progress:
-                print(f"🔄 Transforming data for API import")
-            
-            # Always use the API client's current project ID if available
-            # This ensures we use the correct project even if it was created dynamically
-            if hasattr(self.api_client, 'current_project_id') and self.api_client.current_project_id:
-                actual_project_id = self.api_client.current_project_id
-                logger.info(f"Using API client's current project ID: {actual_project_id}")
-            else:
-                actual_project_id = self.project_id
-                logger.info(f"Using configured project ID: {actual_project_id}")
-            
-            import_data = self.transformer.prepare_chat_room_import_data(sheets_data, actual_project_id)
-            
-            # Step 4: Validate import data
-            validation_errors = self.transformer.validate_import_data(import_data)
-            if validation_errors:
-                result.status = "error"
-                result.error_message = f"Data validation failed: {'; '.join(validation_errors)}"
-                return result
+                print(f"📦 Importing {len(import_data['messages'])} messages and "
+                      f"{len(import_data['annotations_by_user'])} annotators in one transaction")
             
-            # Step 5: Create users
-            if show_progress:
-                print(f"👥 Creating {len(import_data['users'])} users")
+            workbook = self.transformer.prepare_workbook_payload(import_data)
+            workbook_result = self.api_client.import_workbook(import_data['chat_room'].project_id, workbook)
+            self._record_imported_workbook(result, parsed, workbook_result)
             
-            users_data = [self.transformer.convert_to_api_format(user) for user in import_data['users']]
-            user_email_to_id = self.api_client.batch_create_users(users_data)
+        except Exception as e:
+            result.status = "error"
+            result.error_message = str(e)
+            logger.error(f"Failed to process {parsed.file_path}: {e}")
+        
+        finally:
+            # Calculate processing time
+            result.processing_time = parsed.parse_time + (time.perf_counter() - start_time)
+        
+        return result
+    
+    async def import_parsed_workbook_async(self, parsed: ParsedWorkbook,
+                                           client: AsyncAnnotationAPIClient) -> ImportResult:
+        """
+        import_parsed_workbook through an AsyncAnnotationAPIClient (used by the pipelined mode).
+        
+        Args:
+            parsed: Output of parse_workbook
+            client: Authenticated async API client
             
-            if not user_email_to_id:
+        Returns:
+            ImportResult object
+        """
+        start_time = time.perf_counter()
+        
+        result = ImportResult(
+            file_path=parsed.file_path,
+            base_name=parsed.base_name,
+            status="processing"
+        )
+        
+        try:
+            if parsed.error_message:
                 result.status = "error"
-                result.error_message = "Failed to create any users"
+                result.error_message = parsed.error_message
                 return result
             
-            result.users_created = list(user_email_to_id.keys())
-            
-            # Step 6: Assign users to project
-            if show_progress:
-                print(f"🔗 Assigning users to project {actual_project_id}")
-            
-            user_ids = list(user_email_to_id.values())
-            assigned_users = self.api_client.batch_assign_users_to_project(actual_project_id, user_ids)
-            
-            # Step 7: Create chat room and import messages in one operation
-            if show_progress:
-                print(f"🏠 Creating chat room and importing {len(import_data['messages'])} messages")
-            
-            chat_room_data = self.transformer.convert_to_api_format(import_data['chat_room'])
-            messages_csv = self.transformer.prepare_csv_import_data(import_data['messages'])
-            
-            combined_result = self.api_client.create_chat_room_and_import_messages(
-                project_id=actual_project_id,
-                name=chat_room_data['name'],
-                messages_csv=messages_csv
-            )
-            
-            result.chat_room_id = combined_result['chat_room']['id']
-            result.chat_room_name = combined_result['chat_room']['name']
-            result.total_messages = combined_result['import_details']['imported_count']
-            
-            # Step 8: Import annotations for each user
-            total_annotations = 0
-            annotations_by_user = import_data['annotations_by_user']
-            
-            if show_progress:
-                print(f"📝 Importing annotations for {len(annotations_by_user)} users")
-                pbar = tqdm(annotations_by_user.items(), desc="Importing annotations")
-            else:
-                pbar = annotations_by_user.items()
-            
-            for user_email, annotations in pbar:
-                if user_email not in user_email_to_id:
-                    logger.warning(f"User {user_email} not found in created users")
-                    continue
-                
-                user_id = user_email_to_id[user_email]
-                
-                if annotations:  # Only import if there are annotations
-                    annotations_csv = self.transformer.prepare_annotations_import_data(annotations)
-                    annotations_result = self.api_client.import_annotations(
-                        result.chat_room_id, user_id, annotations_csv
-                    )
-                    total_annotations += annotations_result.get('imported_count', 0)
-            
-            result.total_annotations = total_annotations
-            
-            # Step 9: Finalize result
-            result.status = "success"
-            result.details = {
-                "sheets_processed": len(sheets_data),
-                "annotators": import_data['annotators'],
-                "users_assigned": len(assigned_users),
-                "import_summary": self.transformer.generate_import_summary(import_data)
-            }
-            
-            logger.info(f"Successfully processed {file_path}: "
-                       f"Chat room {result.chat_room_id}, "
-                       f"{result.total_messages} messages, "
-                       f"{result.total_annotations} annotations")
+            import_data = parsed.import_data
+            workbook = self.transformer.prepare_workbook_payload(import_data)
+            workbook_result = await client.import_workbook(import_data['chat_room'].project_id, workbook)
+            self._record_imported_workbook(result, parsed, workbook_result)
             
         except Exception as e:
             result.status = "error"
             result.error_message = str(e)
-            logger.error(f"Failed to process {file_path}: {e}")
+            logger.error(f"Failed to process {parsed.file_path}: {e}")
         
         finally:
-            # Calculate processing time
-            end_time = datetime.now()
-            result.processing_time = (end_time - start_time).total_seconds()
+            result.processing_time = parsed.parse_time + (time.perf_counter() - start_time)
         
         return result
     
+    def _record_imported_workbook(self, result: ImportResult, parsed: ParsedWorkbook,
+                                  workbook_result: Dict[str, Any]) -> None:
+        """Fill a successful ImportResult from the workbook import response."""
+        import_data = parsed.import_data
+        
+        result.chat_room_id = workbook_result['chat_room']['id']
+        result.chat_room_name = workbook_result['chat_room']['name']
+        result.users_created = workbook_result['users_created']
+        result.total_messages = workbook_result['import_details']['imported_count']
+        result.total_annotations = workbook_result['total_imported']
+        
+        # Step 6: Finalize result
+        result.status = "success"
+        result.details = {
+            "sheets_processed": parsed.sheets_processed,
+            "annotators": import_data['annotators'],
+            "users_assigned": workbook_result['users_assigned'],
+            "import_summary": self.transformer.generate_import_summary(import_data)
+        }
+        
+        logger.info(f"Successfully processed {parsed.file_path}: "
+                   f"Chat room {result.chat_room_id}, "
+                   f"{result.total_messages} messages, "
+                   f"{result.total_annotations} annotations")
+    
+    def _process_files_sequentially(self, file_paths: List[str], show_progress: bool) -> List[ImportResult]:
+        """Process files one after another in the calling thread."""
+        results = []
+        
+        if show_progress:
+            files_pbar = tqdm(file_paths, desc="Processing files")
+        else:
+            files_pbar = file_paths
+        
+        for file_path in files_pbar:
+            if show_progress:
+                files_pbar.set_description(f"Processing {Path(file_path).name}")
+            
+            results.append(self.process_single_file(file_path, show_progress=False))
+        
+        return results
+    
+    def _create_async_client(self) -> AsyncAnnotationAPIClient:
+        """Async client for the upload stage, sharing the API client's URL, credentials and token."""
+        client = AsyncAnnotationAPIClient(
+            base_url=self.api_client.base_url,
+            admin_email=self.api_client.admin_email,
+            admin_password=self.api_client.admin_password,
+            timeout=self.api_client.timeout,
+            concurrency=self.upload_workers
+        )
+        if self.api_client.access_token:
+            client.access_token = self.api_client.access_token
+            client.client.headers['Authorization'] = f'Bearer {client.access_token}'
+        return client
+    
+    def _process_files_concurrently(self, file_paths: List[str], show_progress: bool) -> List[ImportResult]:
+        """
+        Pipelined mode: workbooks are parsed in a process pool (CPU-bound) and each
+        parsed workbook is uploaded as soon as it is ready through an async client
+        that keeps at most upload_workers requests in flight over pooled connections
+        and retries overloaded (429/503) responses. Results are returned in input
+        order whatever the completion order.
+        
+        At most workers + upload_workers files are in flight (parsing, parsed or
+        uploading) at once, so parsed workbooks never pile up in memory while the
+        uploads lag behind the parse pool.
+        """
+        return asyncio.run(self._run_pipeline(file_paths, show_progress))
+    
+    async def _run_pipeline(self, file_paths: List[str], show_progress: bool) -> List[ImportResult]:
+        """Event loop side of _process_files_concurrently."""
+        project_id = self._resolve_project_id()
+        results: List[Optional[ImportResult]] = [None] * len(file_paths)
+        
+        files_pbar = tqdm(total=len(file_paths), desc=f"Processing files ({self.workers} workers)") if show_progress else None
+        
+        in_flight = asyncio.Semaphore(self.workers + self.upload_workers)
+        
+        async def parse_and_upload(index: int, file_path: str, client: AsyncAnnotationAPIClient) -> None:
+            async with in_flight:
+                try:
+                    parsed = await asyncio.wrap_future(
+                        parse_pool.submit(parse_workbook, file_path, self.transformer, project_id)
+                    )
+                except Exception as e:
+                    # parse_workbook handles its own errors; this is a crashed worker
+                    parsed = ParsedWorkbook(file_path=file_path, base_name=Path(file_path).stem,
+                                            error_message=f"Parse worker failed: {e}")
+                results[index] = await self.import_parsed_workbook_async(parsed, client)
+            if files_pbar:
+                files_pbar.update(1)
+        
+        # The process pool is created first so its workers are not forked from a process with open connections
+        with ProcessPoolExecutor(max_workers=self.workers) as parse_pool:
+            async with self._create_async_client() as client:
+                tasks = []
+                for index, file_path in enumerate(file_paths):
+                    file_path = str(Path(file_path).resolve())
+                    try:
+                        skipped = self._skipped_result(file_path)
+                    except Exception as e:
+                        skipped = ImportResult(file_path=file_path, base_name=Path(file_path).stem,
+                                               status="error", error_message=str(e))
+                    if skipped:
+                        results[index] = skipped
+                        if files_pbar:
+                            files_pbar.update(1)
+                        continue
+                    
+                    logger.info(f"Processing file: {file_path}")
+                    tasks.append(parse_and_upload(index, file_path, client))
+                
+                await asyncio.gather(*tasks)
+        
+        if files_pbar:
+            files_pbar.close()
+        
+        return results
+    
+    def _process_files(self, file_paths: List[str], batch_results: BatchImportResults, show_progress: bool) -> None:
+        """Process the files (pipelined if workers > 1) and record the results in input order."""
+        if show_progress:
+            print(f"🚀 Starting batch import of {len(file_paths)} Excel files")
+        
+        if self.workers > 1 and len(file_paths) > 1:
+            results = self._process_files_concurrently(file_paths, show_progress)
+        else:
+            results = self._process_files_sequentially(file_paths, show_progress)
+        
+        for result in results:
+            batch_results.results.append(result)
+            
+            # Update counters
+            if result.status == "success":
+                batch_results.successful_imports += 1
+                self.total_chat_rooms_created += 1
+                self.total_users_created += len(result.users_created)
+                self.total_messages_imported += result.total_messages
+                self.total_annotations_imported += result.total_annotations
+            elif result.status == "error":
+                batch_results.failed_imports += 1
+            elif result.status == "skipped":
+                batch_results.skipped_imports += 1
+            
+            self.total_files_processed += 1
+    
     def process_directory(self, 
                          directory: str,
                          pattern: str = "*.xlsx",
@@ -350,32 +562,7 @@ class BatchExcelImportManager:
         )
         
         # Process files
-        if show_progress:
-            print(f"🚀 Starting batch import of {len(excel_files)} Excel files")
-            files_pbar = tqdm(excel_files, desc="Processing files")
-        else:
-            files_pbar = excel_files
-        
-        for file_path in files_pbar:
-            if show_progress:
-                files_pbar.set_description(f"Processing {Path(file_path).name}")
-            
-            result = self.process_single_file(file_path, show_progress=False)
-            batch_results.results.append(result)
-            
-            # Update counters
-            if result.status == "success":
-                batch_results.successful_imports += 1
-                self.total_chat_rooms_created += 1
-                self.total_users_created += len(result.users_created)
-                self.total_messages_imported += result.total_messages
-                self.total_annotations_imported += result.total_annotations
-            elif result.status == "error":
-                batch_results.failed_imports += 1
-            elif result.status == "skipped":
-                batch_results.skipped_imports += 1
-            
-            self.total_files_processed += 1
+        self._process_files(excel_files, batch_results, show_progress)
         
         # Finalize results
         batch_results.end_time = datetime.now()
@@ -430,32 +617,7 @@ class BatchExcelImportManager:
         )
         
         # Process files
-        if show_progress:
-            print(f"🚀 Starting batch import of {len(valid_files)} Excel files")
-            files_pbar = tqdm(valid_files, desc="Processing files")
-        else:
-            files_pbar = valid_files
-        
-        for file_path in files_pbar:
-            if show_progress:
-                files_pbar.set_description(f"Processing {Path(file_path).name}")
-            
-            result = self.process_single_file(file_path, show_progress=False)
-            batch_results.results.append(result)
-            
-            # Update counters
-            if result.status == "success":
-                batch_results.successful_imports += 1
-                self.total_chat_rooms_created += 1
-                self.total_users_created += len(result.users_created)
-                self.total_messages_imported += result.total_messages
-                self.total_annotations_imported += result.total_annotations
-            elif result.status == "error":
-                batch_results.failed_imports += 1
-            elif result.status == "skipped":
-                batch_results.skipped_imports += 1
-            
-            self.total_files_processed += 1
+        self._process_files(valid_files, batch_results, show_progress)
         
         # Finalize results
         batch_results.end_time = datetime.now()
@@ -332,6 +332,47 @@ class ChatRoomDataTransformer:
         
         return output.getvalue()
     
+    def prepare_workbook_payload(self, import_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert prepared import data into the JSON body of the workbook import endpoint.
+        
+        Args:
+            import_data: Output of prepare_chat_room_import_data
+            
+        Returns:
+            Dictionary with chat_room, messages and annotators
+        """
+        chat_room = import_data['chat_room']
+        users_by_email = {user.email: user for user in import_data['users']}
+        
+        return {
+            "chat_room": {
+                "name": chat_room.name,
+                "description": chat_room.description
+            },
+            "messages": [
+                {
+                    "turn_id": message.turn_id,
+                    "user_id": message.user_id,
+                    "turn_text": message.turn_text,
+                    "reply_to_turn": message.reply_to_turn
+                }
+                for message in import_data['messages']
+            ],
+            "annotators": [
+                {
+                    "annotator_email": email,
+                    "annotator_name": users_by_email[email].name,
+                    "password": users_by_email[email].password,
+                    "annotations": [
+                        {"turn_id": annotation.turn_id, "thread_id": annotation.thread_id}
+                        for annotation in annotations
+                    ]
+                }
+                for email, annotations in import_data['annotations_by_user'].items()
+            ]
+        }
+    
     def validate_import_data(self, import_data: Dict[str, Any]) -> List[str]:
         """
         Validate the prepared import data.
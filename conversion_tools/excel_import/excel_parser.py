@@ -3,12 +3,19 @@ Excel Chat Room Parser
 
 This module provides functionality for parsing Excel files containing 
 chat room annotations with multiple tabs representing different annotators.
+
+Two parsing modes produce the same sheet data:
+- streaming (default for .xlsx): read-only openpyxl row iteration. The messages are
+  built once from the first valid sheet (the reference sheet); the other sheets
+  only contribute their turn_ids and thread column.
+- pandas: every sheet is loaded as a DataFrame (also used for .xls files).
 """
 
 import re
 import pandas as pd
+from openpyxl import load_workbook
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterator
 import logging
 
 logger = logging.getLogger(__name__)
@@ -44,17 +51,27 @@ class ExcelChatRoomParser:
         r".*annotation.*"
     ]
     
-    def __init__(self, excel_file_path: str):
+    # Cell strings read as missing, as pandas' default na_values do in pandas mode
+    NA_STRINGS = frozenset([
+        "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+        "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+    ])
+    
+    def __init__(self, excel_file_path: str, streaming: bool = True):
         """
         Initialize the Excel parser.
         
         Args:
             excel_file_path: Path to the Excel file
+            streaming: Use the read-only openpyxl parser (ignored for .xls files,
+                which openpyxl cannot read)
         """
         self.excel_file_path = Path(excel_file_path)
         self.base_name = self._extract_base_name()
         self._sheets_data = None
+        self._parsed_sheets = None
         self._validate_file()
+        self.streaming = streaming and self.excel_file_path.suffix.lower() == '.xlsx'
     
     def _validate_file(self) -> None:
         """Validate that the Excel file exists and is readable."""
@@ -109,6 +126,15 @@ class ExcelChatRoomParser:
         Returns:
             Dictionary containing parsed data
         """
+        if self.streaming:
+            workbook = load_workbook(self.excel_file_path, read_only=True, data_only=True)
+            try:
+                if sheet_name not in workbook.sheetnames:
+                    raise ValueError(f"Sheet '{sheet_name}' not found in Excel file")
+                return self._stream_sheet(workbook[sheet_name], sheet_name)
+            finally:
+                workbook.close()
+        
         sheets_data = self._load_all_sheets()
         
         if sheet_name not in sheets_data:
@@ -123,18 +149,134 @@ class ExcelChatRoomParser:
         self.validate_sheet_format(df)
         
         # Extract data
+        messages_data = self._extract_messages_data(df)
         return {
             "sheet_name": sheet_name,
             "annotator_name": self.extract_annotator_from_sheet_name(sheet_name),
             "chat_room_data": self._extract_chat_room_data(df),
-            "messages_data": self._extract_messages_data(df),
+            "messages_data": messages_data,
+            "turn_ids": [message["turn_id"] for message in messages_data],
             "annotations_data": self._extract_annotations_data(df),
             "thread_column": self._detect_thread_column(df),
             "total_rows": len(df)
         }
     
+    def _stream_sheet(self, worksheet, sheet_name: str,
+                      reference_sheet: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Parse one worksheet of a read-only workbook row by row.
+        
+        Rows are cleaned and validated exactly as in pandas mode. When a reference
+        sheet is given, only the turn_id and thread cells are converted and the
+        reference sheet's messages are shared instead of being rebuilt; whether the
+        turn_ids really match is checked by validate_consistency.
+        
+        Args:
+            worksheet: openpyxl worksheet (read-only)
+            sheet_name: Name of the sheet
+            reference_sheet: Already parsed sheet whose messages this sheet repeats
+            
+        Returns:
+            Dictionary containing parsed data (same keys as in pandas mode)
+        """
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        columns = [
+            str(value).strip().lower() if value is not None else f"unnamed: {index}"
+            for index, value in enumerate(header)
+        ]
+        thread_col = self._find_thread_column(columns)
+        
+        # The row count is only known after the scan, so emptiness is checked afterwards
+        self._validate_columns(columns, thread_col)
+        
+        build_messages = reference_sheet is None
+        messages = []
+        turn_ids = []
+        annotations = []
+        total_rows = 0
+        
+        keep_columns = None if build_messages else {'turn_id', thread_col}
+        for record in self._iter_clean_records(rows, columns, keep_columns):
+            total_rows += 1
+            turn_id = record.get('turn_id')
+            if turn_id is None or turn_id.strip() == '':
+                continue
+            turn_id = turn_id.strip()
+            turn_ids.append(turn_id)
+            
+            if build_messages:
+                reply_to_turn = record.get('reply_to_turn')
+                messages.append({
+                    "turn_id": turn_id,
+                    "user_id": record['user_id'].strip() if record.get('user_id') is not None else '',
+                    "turn_text": record['turn_text'].strip() if record.get('turn_text') is not None else '',
+                    "reply_to_turn": reply_to_turn.strip() if reply_to_turn is not None and reply_to_turn.strip() != '' else None
+                })
+            
+            thread_id = record.get(thread_col)
+            if thread_id is not None and thread_id.strip() != '':
+                annotations.append({
+                    "turn_id": turn_id,
+                    "thread_id": thread_id.strip()
+                })
+        
+        if total_rows == 0:
+            raise ValueError("Sheet is empty")
+        
+        logger.info(f"Sheet format validation passed: {total_rows} rows")
+        return {
+            "sheet_name": sheet_name,
+            "annotator_name": self.extract_annotator_from_sheet_name(sheet_name),
+            "chat_room_data": self._chat_room_data(total_rows),
+            "messages_data": messages if build_messages else reference_sheet['messages_data'],
+            "turn_ids": turn_ids,
+            "annotations_data": annotations,
+            "thread_column": thread_col,
+            "total_rows": total_rows
+        }
+    
+    def _cell_to_str(self, value: Any) -> Optional[str]:
+        """Convert a cell value the way read_excel(dtype=str) does; None for missing cells."""
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return None if value in self.NA_STRINGS else value
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return str(value)
+    
+    def _is_missing(self, value: Any) -> bool:
+        """Whether _cell_to_str would read the cell as missing, without converting it."""
+        return value is None or (isinstance(value, str) and value in self.NA_STRINGS)
+    
+    def _iter_clean_records(self, rows: Iterator[tuple], columns: List[str],
+                            keep_columns: Optional[set] = None) -> Iterator[Dict[str, Optional[str]]]:
+        """
+        Yield one dict per row, dropping the same rows as _clean_dataframe.
+        
+        With keep_columns, records only hold (and only convert) those columns;
+        the rows dropped are the same either way.
+        """
+        required_indexes = [index for index, col in enumerate(columns) if col in self.REQUIRED_COLUMNS]
+        kept = [(index, col) for index, col in enumerate(columns) if keep_columns is None or col in keep_columns]
+        
+        for row in rows:
+            row = row[:len(columns)]
+            # Remove completely empty rows
+            if all(self._is_missing(value) for value in row):
+                continue
+            # Remove rows where all required columns are empty
+            if required_indexes and all(index >= len(row) or self._is_missing(row[index]) for index in required_indexes):
+                continue
+            yield {col: self._cell_to_str(row[index]) if index < len(row) else None for index, col in kept}
+    
     def _clean_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean and prepare the dataframe."""
+        # Clean column names (strip whitespace, lowercase) first, so the
+        # required-column check below also matches headers like " Turn_ID"
+        df.columns = df.columns.astype(str).str.strip().str.lower()
+        
         # Remove completely empty rows
         df = df.dropna(how='all')
         
@@ -146,9 +288,6 @@ class ExcelChatRoomParser:
         # Reset index
         df = df.reset_index(drop=True)
         
-        # Clean column names (strip whitespace, lowercase)
-        df.columns = df.columns.str.strip().str.lower()
-        
         return df
     
     def validate_sheet_format(self, df: pd.DataFrame) -> bool:
@@ -164,30 +303,37 @@ class ExcelChatRoomParser:
         Raises:
             ValueError if invalid format
         """
+        self._validate_columns(list(df.columns), self._detect_thread_column(df))
+        
+        # Check if we have data
+        if len(df) == 0:
+            raise ValueError("Sheet is empty")
+        
+        logger.info(f"Sheet format validation passed: {len(df)} rows")
+        return True
+    
+    def _validate_columns(self, columns: List[str], thread_col: Optional[str]) -> None:
+        """Raise ValueError if required columns or the thread column are missing."""
         # Check for required columns
         missing_cols = []
         for col in self.REQUIRED_COLUMNS:
-            if col not in df.columns:
+            if col not in columns:
                 missing_cols.append(col)
         
         if missing_cols:
             raise ValueError(f"Missing required columns: {missing_cols}")
         
         # Check for thread/annotation column
-        thread_col = self._detect_thread_column(df)
         if not thread_col:
             raise ValueError("No thread/annotation column found")
-        
-        # Check if we have data
-        if len(df) == 0:
-            raise ValueError("Sheet is empty")
-        
-        logger.info(f"Sheet format validation passed: {len(df)} rows")
-        return True
     
     def _detect_thread_column(self, df: pd.DataFrame) -> Optional[str]:
         """Detect the thread/annotation column."""
-        for col in df.columns:
+        return self._find_thread_column(df.columns)
+    
+    def _find_thread_column(self, columns: List[str]) -> Optional[str]:
+        """Return the first column name matching a thread/annotation pattern."""
+        for col in columns:
             for pattern in self.THREAD_COLUMN_PATTERNS:
                 if re.match(pattern, col, re.IGNORECASE):
                     return col
@@ -219,11 +365,14 @@ class ExcelChatRoomParser:
     
     def _extract_chat_room_data(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Extract chat room metadata from the sheet."""
+        return self._chat_room_data(len(df))
+    
+    def _chat_room_data(self, total_rows: int) -> Dict[str, Any]:
         return {
             "base_name": self.base_name,
             "name": f"{self.base_name} - Multi-Annotator Study",
             "description": f"Chat room imported from {self.excel_file_path.name}",
-            "total_messages": len(df)
+            "total_messages": total_rows
         }
     
     def _extract_messages_data(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
@@ -278,6 +427,13 @@ class ExcelChatRoomParser:
         Returns:
             Dictionary mapping sheet names to parsed data
         """
+        if self._parsed_sheets is not None:
+            return self._parsed_sheets
+        
+        if self.streaming:
+            self._parsed_sheets = self._stream_all_sheets()
+            return self._parsed_sheets
+        
         sheets_data = {}
         sheet_names = self.get_sheet_names()
         
@@ -292,6 +448,35 @@ class ExcelChatRoomParser:
                 # Continue with other sheets
                 continue
         
+        self._parsed_sheets = sheets_data
+        return sheets_data
+    
+    def _stream_all_sheets(self) -> Dict[str, Dict[str, Any]]:
+        """Streaming mode of get_all_sheets_data: one pass over the workbook, messages built once."""
+        sheets_data = {}
+        reference_sheet = None
+        
+        logger.info(f"Streaming Excel file: {self.excel_file_path}")
+        workbook = load_workbook(self.excel_file_path, read_only=True, data_only=True)
+        try:
+            sheet_names = workbook.sheetnames
+            logger.info(f"Processing {len(sheet_names)} sheets: {sheet_names}")
+            
+            for sheet_name in sheet_names:
+                try:
+                    sheet_data = self._stream_sheet(workbook[sheet_name], sheet_name, reference_sheet)
+                    logger.info(f"Successfully parsed sheet: {sheet_name}")
+                except Exception as e:
+                    logger.error(f"Failed to parse sheet '{sheet_name}': {e}")
+                    # Continue with other sheets
+                    continue
+                
+                sheets_data[sheet_name] = sheet_data
+                if reference_sheet is None:
+                    reference_sheet = sheet_data
+        finally:
+            workbook.close()
+        
         return sheets_data
     
     def get_annotators(self) -> List[str]:
@@ -321,13 +506,11 @@ class ExcelChatRoomParser:
         
         # Get reference data from first sheet
         reference_sheet = next(iter(sheets_data.values()))
-        reference_messages = reference_sheet['messages_data']
-        reference_turn_ids = {msg['turn_id'] for msg in reference_messages}
+        reference_turn_ids = set(reference_sheet['turn_ids'])
         
         # Check each sheet against reference
         for sheet_name, sheet_data in sheets_data.items():
-            messages = sheet_data['messages_data']
-            turn_ids = {msg['turn_id'] for msg in messages}
+            turn_ids = set(sheet_data['turn_ids'])
             
             # Check if turn_ids match
             if turn_ids != reference_turn_ids:
@@ -158,7 +158,8 @@ def create_initial_config() -> Dict[str, Any]:
         "import": {
             "email_domain": email_domain,
             "default_user_password": "ChangeMe123!",
-            "auto_confirm": False
+            "auto_confirm": False,
+            "workers": 1
         }
     }
     
@@ -402,7 +403,8 @@ def confirm_import(config: Dict[str, Any]) -> bool:
     return response in ['y', 'yes']
 
 
-def perform_import(api_client: AnnotationAPIClient, excel_files: List[str], project_id: int, config: Dict[str, Any]) -> bool:
+def perform_import(api_client: AnnotationAPIClient, excel_files: List[str], project_id: int, config: Dict[str, Any],
+                   workers: int = 1) -> bool:
     """Perform the actual import."""
     print(f"\n🚀 IMPORTING TO PROJECT {project_id}")
     print("=" * 50)
@@ -418,7 +420,8 @@ def perform_import(api_client: AnnotationAPIClient, excel_files: List[str], proj
             api_client=api_client,
             transformer=transformer,
             project_id=project_id,
-            skip_existing=False  # Don't skip files, user already confirmed
+            skip_existing=False,  # Don't skip files, user already confirmed
+            workers=workers
         )
         
         # Run the import using the correct method
@@ -467,6 +470,7 @@ Examples:
   python import_excel.py                          # Use default search paths
   python import_excel.py --folder ../uploads/Archive  # Import from specific folder
   python import_excel.py --folder /path/to/excel/files  # Use absolute path
+  python import_excel.py --workers 4              # Parse 4 files at a time while uploading
         """
     )
     
@@ -476,6 +480,14 @@ Examples:
         help="Specify a custom folder path containing Excel files to import"
     )
     
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=None,
+        help="Parallel workers: files are parsed in separate processes while parsed files "
+             "are uploaded concurrently (default: import.workers in config.yaml, or 1)"
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -561,7 +573,8 @@ def main():
         return 1
     
     # Perform the import
-    success = perform_import(api_client, excel_files, project_id, config)
+    workers = args.workers or config.get("import", {}).get("workers", 1)
+    success = perform_import(api_client, excel_files, project_id, config, workers=workers)
     
     if success:
         print("\n🎉 Import completed successfully!")
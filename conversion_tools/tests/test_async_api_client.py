@@ -0,0 +1,165 @@
+"""AsyncAnnotationAPIClient against an httpx.MockTransport stub server."""
+import asyncio
+import tempfile
+
+import httpx
+import pytest
+
+from excel_import.api_client import APIError
+from excel_import.async_api_client import AsyncAnnotationAPIClient
+
+
+def workbook_result(name: str, chat_room_id: int = 1) -> dict:
+    return {"chat_room": {"id": chat_room_id, "name": name}, "users_created": [], "users_assigned": 0,
+            "import_details": {"imported_count": 0}, "total_imported": 0}
+
+
+def workbook(name: str) -> dict:
+    return {"chat_room": {"name": name, "description": None}, "messages": [], "annotators": []}
+
+
+def run(handler, scenario, **options):
+    """Run scenario(client) against a client whose requests are answered by handler."""
+    async def main():
+        async with AsyncAnnotationAPIClient(
+            "http://api.test", "admin@example.com", "secret", transport=httpx.MockTransport(handler), **options
+        ) as client:
+            return await scenario(client)
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays instead of sleeping; jitter is fixed at 1.0."""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr("excel_import.async_api_client.asyncio.sleep", fake_sleep)
+    monkeypatch.setattr("excel_import.async_api_client.random.uniform", lambda low, high: 1.0)
+    return delays
+
+
+def test_overloaded_responses_are_retried_with_backoff(sleeps):
+    statuses = iter([503, 429, 503, 200])
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        status = next(statuses)
+        headers = {"Retry-After": "2"} if status == 429 else {}
+        return httpx.Response(status, headers=headers, json=workbook_result("room") if status == 200 else {})
+
+    result = run(handler, lambda client: client.import_workbook(1, workbook("room")), backoff_factor=0.5)
+
+    assert result["chat_room"]["name"] == "room"
+    assert len(requests) == 4
+    # Exponential backoff, except for the attempt answered with Retry-After
+    assert sleeps == [0.5, 2.0, 2.0]
+
+
+def test_backoff_is_capped_and_retries_are_bounded(sleeps):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503, headers={"Retry-After": "120"} if len(calls) == 1 else {})
+
+    with pytest.raises(APIError, match="Failed to import workbook room"):
+        run(handler, lambda client: client.import_workbook(1, workbook("room")),
+            max_retries=3, backoff_factor=4, max_backoff=10)
+
+    assert len(calls) == 4
+    assert sleeps == [10, 8, 10]
+
+
+def test_post_is_not_retried_after_a_read_timeout(sleeps):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    with pytest.raises(APIError, match="timed out"):
+        run(handler, lambda client: client.import_workbook(1, workbook("room")))
+
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_get_is_retried_after_a_read_timeout(sleeps):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ReadTimeout("timed out", request=request)
+        return httpx.Response(200, json=[{"id": 1, "name": "project"}])
+
+    projects = run(handler, lambda client: client.get_projects())
+
+    assert projects == [{"id": 1, "name": "project"}]
+    assert len(calls) == 2
+
+
+def test_post_is_retried_when_nothing_was_sent(sleeps):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json=workbook_result("room"))
+
+    run(handler, lambda client: client.import_workbook(1, workbook("room")))
+    assert len(calls) == 2
+
+
+def test_requests_in_flight_are_bounded_by_concurrency():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        name = request.read().decode()
+        if '"fail"' in name:
+            return httpx.Response(400, text="bad workbook")
+        return httpx.Response(200, json=workbook_result("ok"))
+
+    names = [f"room {i}" for i in range(10)] + ["fail"]
+    results = run(handler, lambda client: client.import_workbooks(1, [workbook(name) for name in names]),
+                  concurrency=3)
+
+    assert peak == 3
+    assert [error is None for _, error in results] == [True] * 10 + [False]
+    assert "bad workbook" in results[-1][1]
+
+
+def test_csv_uploads_are_multipart_built_in_memory(monkeypatch):
+    def no_temp_files(*args, **kwargs):
+        raise AssertionError("uploads must not be spooled to temporary files")
+
+    monkeypatch.setattr(tempfile, "NamedTemporaryFile", no_temp_files)
+    monkeypatch.setattr(tempfile, "mkstemp", no_temp_files)
+    uploads = []
+
+    def handler(request):
+        uploads.append(request)
+        return httpx.Response(200, json={"imported_count": 2})
+
+    csv_data = "turn_id,thread_id\nt0,é\nt1,b\n"
+    run(handler, lambda client: client.import_annotations(7, 42, csv_data))
+
+    (request,) = uploads
+    assert request.url.path == "/admin/chat-rooms/7/import-annotations"
+    assert request.headers["Content-Type"].startswith("multipart/form-data; boundary=")
+    body = request.read()
+    assert b'name="file"; filename="annotations.csv"' in body
+    assert b"Content-Type: text/csv" in body
+    assert csv_data.encode("utf-8") in body
+    assert b'name="user_id"\r\n\r\n42' in body
@@ -0,0 +1,146 @@
+"""Pipelined batch import: parse pool plus async uploads."""
+import asyncio
+import json
+from concurrent.futures import Future
+
+import httpx
+import openpyxl
+import pytest
+
+from excel_import.api_client import AnnotationAPIClient
+from excel_import.async_api_client import AsyncAnnotationAPIClient
+from excel_import import batch_import_manager
+from excel_import.batch_import_manager import BatchExcelImportManager
+
+
+def write_workbook(path, annotators=("joao", "maria"), message_count=4):
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for annotator in annotators:
+        sheet = workbook.create_sheet(f"thread_{annotator}")
+        sheet.append(["user_id", "turn_id", "turn_text", "reply_to_turn", "thread"])
+        for i in range(message_count):
+            sheet.append([f"u{i % 2}", f"t{i}", f"message {i}", f"t{i - 1}" if i else None, f"{annotator}{i % 2}"])
+    workbook.save(path)
+    return str(path)
+
+
+class StubServer:
+    """Answers workbook imports; the first attempt of each room is rejected as overloaded."""
+
+    def __init__(self):
+        self.requests = []
+        self.rejected = set()
+
+    def __call__(self, request):
+        self.requests.append(request)
+        body = json.loads(request.read())
+        name = body["chat_room"]["name"]
+        if name not in self.rejected:
+            self.rejected.add(name)
+            return httpx.Response(503, headers={"Retry-After": "0"})
+        if name.startswith("broken"):
+            return httpx.Response(400, text="Invalid workbook")
+        annotations = sum(len(annotator["annotations"]) for annotator in body["annotators"])
+        return httpx.Response(200, json={
+            "chat_room": {"id": len(self.requests), "name": name},
+            "users_created": [annotator["annotator_email"] for annotator in body["annotators"]],
+            "users_assigned": len(body["annotators"]),
+            "import_details": {"imported_count": len(body["messages"])},
+            "total_imported": annotations
+        })
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    api_client = AnnotationAPIClient("http://api.test", "admin@example.com", "secret")
+    api_client.access_token = "token"
+    manager = BatchExcelImportManager(api_client, project_id=3, skip_existing=False, workers=2, upload_workers=2)
+    server = StubServer()
+    create_async_client = manager._create_async_client
+
+    def create_stub_client():
+        client = create_async_client()
+        stub = AsyncAnnotationAPIClient(
+            client.base_url, client.admin_email, client.admin_password,
+            concurrency=client.concurrency, backoff_factor=0, transport=httpx.MockTransport(server)
+        )
+        stub.client.headers.update(client.client.headers)
+        return stub
+
+    monkeypatch.setattr(manager, "_create_async_client", create_stub_client)
+    return manager, server
+
+
+def test_pipelined_import_uploads_through_the_async_client(manager, tmp_path):
+    manager, server = manager
+    files = [write_workbook(tmp_path / f"room{i}.xlsx") for i in range(3)]
+    files.insert(1, write_workbook(tmp_path / "broken.xlsx", message_count=1))
+    (tmp_path / "empty.xlsx").write_bytes(b"not a workbook")
+    files.append(str(tmp_path / "empty.xlsx"))
+
+    results = manager.process_file_list(files, show_progress=False)
+
+    assert [result.base_name for result in results.results] == ["room0", "broken", "room1", "room2", "empty"]
+    assert [result.status for result in results.results] == ["success", "error", "success", "success", "error"]
+    assert (results.successful_imports, results.failed_imports) == (3, 2)
+    assert "Invalid workbook" in results.results[1].error_message
+
+    room = results.results[0]
+    assert (room.total_messages, room.total_annotations) == (4, 8)
+    assert room.details["users_assigned"] == 2
+
+    # Every room was rejected once with 503 and retried; unparseable files never reach the API
+    uploads = [request for request in server.requests if request.url.path == "/admin/projects/3/import-workbook"]
+    assert len(uploads) == len(server.requests) == 8
+    assert all(request.headers["Authorization"] == "Bearer token" for request in uploads)
+
+
+class InlineExecutor:
+    """Stands in for the parse pool: parses on submit, in this process."""
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def test_files_in_flight_are_bounded(manager, tmp_path, monkeypatch):
+    manager, server = manager
+    files = [write_workbook(tmp_path / f"room{i}.xlsx", message_count=2) for i in range(10)]
+    in_flight = []
+    peak = [0]
+
+    class CountingExecutor(InlineExecutor):
+        def submit(self, fn, *args):
+            in_flight.append(args[0])
+            peak[0] = max(peak[0], len(in_flight))
+            return super().submit(fn, *args)
+
+    monkeypatch.setattr(batch_import_manager, "ProcessPoolExecutor", CountingExecutor)
+    import_parsed_workbook_async = manager.import_parsed_workbook_async
+
+    async def slow_upload(parsed, client):
+        # Uploads lag behind parsing, which is what lets parsed workbooks pile up
+        await asyncio.sleep(0.01)
+        try:
+            return await import_parsed_workbook_async(parsed, client)
+        finally:
+            in_flight.remove(parsed.file_path)
+
+    monkeypatch.setattr(manager, "import_parsed_workbook_async", slow_upload)
+
+    results = manager.process_file_list(files, show_progress=False)
+
+    assert results.successful_imports == 10
+    assert peak[0] == manager.workers + manager.upload_workers == 4
+    assert not in_flight
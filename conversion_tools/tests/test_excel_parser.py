@@ -0,0 +1,75 @@
+"""The streaming parser must read workbooks exactly as the pandas parser does."""
+import openpyxl
+import pytest
+
+from excel_import.excel_parser import ExcelChatRoomParser
+
+HEADER = ["user_id", "turn_id", "turn_text", "reply_to_turn", "thread"]
+
+# (user_id, turn_id, turn_text, reply_to_turn); the thread cell is added per sheet
+MESSAGES = [
+    ("u1", 1, "hello", None),              # numeric turn_id
+    None,                                  # blank row
+    ("u2", 2.0, "hi", 1),                  # integral float turn_id, numeric reply
+    ("u1", " t3 ", "  spaced  ", "2"),
+    (None, None, None, None),              # only a thread cell: dropped by the required-columns rule
+    ("NA", "t4", "text", "n/a"),           # NA strings read as missing
+    ("u3", None, "no turn id", None),      # kept as a row, but not a message
+    ("u1", "t5", 3.5, None),               # numeric text
+]
+
+
+def write_workbook(path, threads_by_sheet, header_by_sheet=None):
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for sheet_name, threads in threads_by_sheet.items():
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append((header_by_sheet or {}).get(sheet_name, HEADER))
+        for message, thread in zip(MESSAGES, threads):
+            sheet.append([None] * len(HEADER) if message is None else [*message, thread])
+    workbook.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    return write_workbook(tmp_path / "VAC_R10.xlsx", {
+        "anotação ana": ["A1", None, None, " A2 ", "A9", "NULL", "A3", "A1"],
+        "thread_bruno": [None, None, "B1", "B1", None, "B2", "B3", ""],
+        "carla_thread": ["C1", "C1", "C1", "C1", "C1", "C1", "C1", "C1"],
+    }, header_by_sheet={"carla_thread": [" User_ID", "TURN_ID ", "Turn_Text", "reply_to_turn", "Thread"]})
+
+
+def test_streaming_matches_pandas(workbook):
+    streamed = ExcelChatRoomParser(workbook, streaming=True)
+    loaded = ExcelChatRoomParser(workbook, streaming=False)
+    assert streamed.streaming and not loaded.streaming
+
+    sheets = streamed.get_all_sheets_data()
+    assert sheets == loaded.get_all_sheets_data()
+    assert streamed.validate_consistency() == loaded.validate_consistency() == (True, [])
+
+    ana = sheets["anotação ana"]
+    assert ana["total_rows"] == 6
+    assert ana["turn_ids"] == ["1", "2", "t3", "t4", "t5"]
+    assert ana["messages_data"][1] == {"turn_id": "2", "user_id": "u2", "turn_text": "hi", "reply_to_turn": "1"}
+    assert ana["messages_data"][3] == {"turn_id": "t4", "user_id": "", "turn_text": "text", "reply_to_turn": None}
+    assert ana["annotations_data"] == [
+        {"turn_id": "1", "thread_id": "A1"}, {"turn_id": "t3", "thread_id": "A2"}, {"turn_id": "t5", "thread_id": "A1"}
+    ]
+    assert [a["turn_id"] for a in sheets["thread_bruno"]["annotations_data"]] == ["2", "t3", "t4"]
+    assert sheets["carla_thread"]["thread_column"] == "thread"
+
+
+def test_other_sheets_only_convert_turn_id_and_thread(workbook, monkeypatch):
+    parser = ExcelChatRoomParser(workbook, streaming=True)
+    converted = []
+    cell_to_str = parser._cell_to_str
+    monkeypatch.setattr(parser, "_cell_to_str", lambda value: converted.append(value) or cell_to_str(value))
+
+    sheets = parser.get_all_sheets_data()
+
+    rows = sheets["anotação ana"]["total_rows"]
+    assert len(converted) == rows * len(HEADER) + 2 * rows * (len(sheets) - 1)
+    assert "hello" in converted[:len(HEADER)]
+    assert "hello" not in converted[rows * len(HEADER):]